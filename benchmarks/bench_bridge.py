@@ -0,0 +1,114 @@
+"""Stress the PortAudio -> event loop handoff while injecting loop stalls.
+
+A producer thread plays the PortAudio callback (320-frame blocks at 16 kHz,
+optionally accelerated) while the loop drains on the daemon's batch interval
+and periodically blocks for a random stall. Compares the previous
+call_soon_threadsafe-per-block handoff with AudioBridge.
+
+    python -m benchmarks.bench_bridge [seconds] [speedup]
+"""
+import asyncio
+import random
+import statistics
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+from claude_audio_connector.bridge import AudioBridge
+from claude_audio_connector.metrics import LoopMonitor
+
+BLOCK = b"\x00" * 640
+BLOCK_SEC = 320 / 16000
+BATCH_INTERVAL = 0.15
+STATUS = SimpleNamespace(input_overflow=False, input_underflow=False)
+
+
+def _producer(callback, seconds: float, speedup: float, costs: list[float], stop: threading.Event) -> None:
+    period = BLOCK_SEC / speedup
+    next_at = time.perf_counter()
+    end = next_at + seconds
+    while not stop.is_set() and next_at < end:
+        start = time.perf_counter()
+        callback(BLOCK, 320, None, STATUS)
+        costs.append(time.perf_counter() - start)
+        next_at += period
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+async def _inject_stalls(seconds: float, stop: asyncio.Event) -> int:
+    rng = random.Random(1)
+    injected = 0
+    end = time.monotonic() + seconds
+    while time.monotonic() < end and not stop.is_set():
+        await asyncio.sleep(rng.uniform(0.2, 0.5))
+        time.sleep(rng.uniform(0.05, 0.4))  # e.g. blocking file I/O on the loop
+        injected += 1
+    return injected
+
+
+async def _run(mode: str, seconds: float, speedup: float) -> dict:
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    costs: list[float] = []
+    received = 0
+    monitor = LoopMonitor()
+
+    if mode == "legacy":
+        buf: list[bytes] = []
+
+        def callback(indata, frames, time_info, status):
+            loop.call_soon_threadsafe(buf.append, bytes(indata))
+
+        def drain():
+            frames = buf[:]
+            buf.clear()
+            return frames
+    else:
+        bridge = AudioBridge(max_blocks=int(2.0 / BLOCK_SEC))
+        bridge.resume()
+        callback, drain = bridge.callback, bridge.drain
+
+    async def consumer():
+        nonlocal received
+        while not stop.is_set():
+            await asyncio.sleep(BATCH_INTERVAL)
+            received += len(drain())
+
+    thread_stop = threading.Event()
+    producer = threading.Thread(target=_producer, args=(callback, seconds, speedup, costs, thread_stop))
+    tasks = [asyncio.create_task(consumer()), asyncio.create_task(monitor.run(stop))]
+    producer.start()
+    injected = await _inject_stalls(seconds, stop)
+    await loop.run_in_executor(None, producer.join)
+    await asyncio.sleep(BATCH_INTERVAL * 2)
+    stop.set()
+    await asyncio.gather(*tasks)
+    received += len(drain())
+
+    costs.sort()
+    return {
+        "mode": mode,
+        "blocks": len(costs),
+        "received": received,
+        "cb_p50_us": statistics.median(costs) * 1e6,
+        "cb_p99_us": costs[int(len(costs) * 0.99)] * 1e6,
+        "stalls_injected": injected,
+        "stalls_seen": monitor.stalls if mode == "bridge" else "-",
+        "max_lag_ms": monitor.max_lag * 1e3 if mode == "bridge" else "-",
+        "overruns": bridge.overruns if mode == "bridge" else "-",
+    }
+
+
+def main() -> None:
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    speedup = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    for mode in ("legacy", "bridge"):
+        row = asyncio.run(_run(mode, seconds, speedup))
+        print("  ".join(f"{k}={v:.1f}" if isinstance(v, float) else f"{k}={v}" for k, v in row.items()))
+
+
+if __name__ == "__main__":
+    main()
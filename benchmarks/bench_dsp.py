@@ -0,0 +1,73 @@
+"""End-to-end DSP latency and main-process CPU, inline vs process offload.
+
+Feeds real-time 20 ms blocks (optionally accelerated) through a deliberately
+heavy pure-Python stage chain while an asyncio loop with a lag monitor plays
+the daemon's role.
+
+    python -m benchmarks.bench_dsp [seconds] [speedup] [chain_repeats]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+from array import array
+
+from claude_audio_connector.dsp import DspWorker, InlineDsp, parse_stages
+from claude_audio_connector.metrics import LoopMonitor
+
+BLOCK_SEC = 320 / 16000
+FRAME = array("h", [int(3000 * ((i % 40) / 20 - 1)) for i in range(320)]).tobytes()
+
+
+async def _run(mode: str, seconds: float, speedup: float, repeats: int) -> dict:
+    stages = parse_stages(",".join(["highpass:hz=80", "gain:db=1", "gate:threshold=50"] * repeats))
+    dsp = DspWorker(stages, 16000) if mode == "offload" else InlineDsp(stages, 16000)
+    dsp.start()
+    stop = asyncio.Event()
+    monitor = LoopMonitor(interval=0.01, stall_threshold=BLOCK_SEC)
+    lag_task = asyncio.create_task(monitor.run(stop))
+    await asyncio.sleep(0.5)  # let the worker process come up
+
+    sent: list[float] = []
+    latencies: list[float] = []
+    period = BLOCK_SEC / speedup
+    cpu0, wall0 = time.process_time(), time.monotonic()
+    next_at = wall0
+    while time.monotonic() - wall0 < seconds or len(latencies) < len(sent):
+        if time.monotonic() - wall0 < seconds and time.monotonic() >= next_at:
+            sent.append(time.monotonic())
+            dsp.submit(FRAME)
+            next_at += period
+        for _ in dsp.collect():
+            latencies.append(time.monotonic() - sent[len(latencies)])
+        await asyncio.sleep(0.001)
+    cpu, wall = time.process_time() - cpu0, time.monotonic() - wall0
+
+    stop.set()
+    await lag_task
+    dsp.close()
+    latencies.sort()
+    return {
+        "mode": mode,
+        "blocks": len(sent),
+        "lat_p50_ms": statistics.median(latencies) * 1e3,
+        "lat_p99_ms": latencies[int(len(latencies) * 0.99)] * 1e3,
+        "main_cpu_pct": 100 * cpu / wall,
+        "loop_max_lag_ms": monitor.max_lag * 1e3,
+        "loop_stalls": monitor.stalls,
+    }
+
+
+def main() -> None:
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    speedup = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    repeats = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    print(f"cpus={os.cpu_count()} seconds={seconds} speedup={speedup} chain_stages={3 * repeats}")
+    for mode in ("inline", "offload"):
+        row = asyncio.run(_run(mode, seconds, speedup, repeats))
+        print("  ".join(f"{k}={v:.1f}" if isinstance(v, float) else f"{k}={v}" for k, v in row.items()))
+
+
+if __name__ == "__main__":
+    main()
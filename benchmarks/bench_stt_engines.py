@@ -0,0 +1,114 @@
+"""Compare STT engines head-to-head on a replay corpus.
+
+The corpus is the output of claude-audio-replay (manifest.jsonl plus WAVs).
+Each utterance is streamed through every engine in stt_batch_interval
+batches, followed by a second of silence so the engine's VAD closes the
+utterance. Latency is measured from the last audio batch to the final
+transcript; accuracy is word error rate against the journaled text.
+
+    python -m benchmarks.bench_stt_engines CORPUS [sarvam,local] [speedup]
+
+Engines come from the usual config (SARVAM_API_KEY,
+CLAUDE_AUDIO_LOCAL_STT_MODEL); unconfigured ones are skipped.
+"""
+import asyncio
+import json
+import sys
+import time
+import wave
+from pathlib import Path
+
+from claude_audio_connector.config import load_config
+from claude_audio_connector.stt_engine import TRANSCRIPT, LocalEngine, SarvamEngine
+
+TAIL_SILENCE_SEC = 1.0
+TIMEOUT_SEC = 10.0
+
+
+def _wer(ref: str, hyp: str) -> tuple[int, int]:
+    r, h = ref.lower().split(), hyp.lower().split()
+    prev = list(range(len(h) + 1))
+    for i, rw in enumerate(r, 1):
+        cur = [i] + [0] * len(h)
+        for j, hw in enumerate(h, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (rw != hw))
+        prev = cur
+    return prev[-1], len(r)
+
+
+async def _run_one(engine, cfg, pcm: bytes, speedup: float) -> tuple[str, float]:
+    step = int(cfg.stt_batch_interval * cfg.stt_sample_rate) * 2
+    silence = bytes(int(TAIL_SILENCE_SEC * cfg.stt_sample_rate) * 2)
+    async with engine.connect(cfg) as session:
+        texts: list[str] = []
+        done = asyncio.Event()
+
+        async def receive() -> None:
+            async for event in session:
+                if event.kind == TRANSCRIPT:
+                    texts.append(event.text)
+                    done.set()
+
+        receiver = asyncio.create_task(receive())
+        last_speech = 0.0
+        for audio, is_tail in ((pcm, False), (silence, True)):
+            for i in range(0, len(audio), step):
+                await session.send(audio[i:i + step])
+                if not is_tail:
+                    last_speech = time.monotonic()
+                await asyncio.sleep(cfg.stt_batch_interval / speedup)
+        try:
+            await asyncio.wait_for(done.wait(), TIMEOUT_SEC)
+        except asyncio.TimeoutError:
+            pass
+        latency = time.monotonic() - last_speech
+        receiver.cancel()
+        return " ".join(texts).strip(), latency
+
+
+async def _bench(corpus: Path, names: list[str], speedup: float) -> None:
+    cfg = load_config()
+    engines = {}
+    if "sarvam" in names and cfg.api_key:
+        engines["sarvam"] = SarvamEngine(cfg.api_key)
+    if "local" in names and cfg.stt_local_model:
+        engines["local"] = LocalEngine(cfg.stt_local_model)
+    if not engines:
+        sys.exit("no configured engines to compare")
+
+    items = [json.loads(line) for line in (corpus / "manifest.jsonl").read_text().splitlines() if line]
+    for name, engine in engines.items():
+        errors = words = 0
+        latencies = []
+        audio_sec = 0.0
+        started = time.monotonic()
+        for item in items:
+            with wave.open(str(corpus / item["audio"]), "rb") as wf:
+                pcm = wf.readframes(wf.getnframes())
+            text, latency = await _run_one(engine, cfg, pcm, speedup)
+            e, n = _wer(item["text"], text)
+            errors += e
+            words += n
+            latencies.append(latency)
+            audio_sec += item["duration"]
+        wall = time.monotonic() - started
+        engine.close()
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] if latencies else 0.0
+        p95 = latencies[int(len(latencies) * 0.95)] if latencies else 0.0
+        print(
+            f"engine={name:<7} utts={len(items)}  wer={errors / max(words, 1):.3f}  "
+            f"final_p50_ms={p50 * 1e3:.0f}  final_p95_ms={p95 * 1e3:.0f}  "
+            f"audio_sec_per_wall_sec={audio_sec / wall:.2f}"
+        )
+
+
+def main() -> None:
+    corpus = Path(sys.argv[1])
+    names = sys.argv[2].split(",") if len(sys.argv) > 2 else ["sarvam", "local"]
+    speedup = float(sys.argv[3]) if len(sys.argv) > 3 else 1.0
+    asyncio.run(_bench(corpus, names, speedup))
+
+
+if __name__ == "__main__":
+    main()
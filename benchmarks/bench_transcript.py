@@ -0,0 +1,66 @@
+"""Transcript pipeline throughput against thousands of rules.
+
+Compares the compiled automaton with a per-rule regex loop, which is what
+stacking ad-hoc checks in the message loop degrades to as rules grow.
+
+    python -m benchmarks.bench_transcript
+"""
+import random
+import re
+import time
+
+from claude_audio_connector.transcript import Pipeline, Rules
+
+TEXTS = [
+    "hey claude run tests and then open the readme",
+    "okay cloud refactor the config loader to use the schema please",
+    "stop listening",
+    "we were talking about something else entirely over lunch today",
+    "hey claude explain why word042 keeps failing in word917 word118",
+]
+
+
+def _rules(n: int, rng: random.Random) -> Rules:
+    words = [f"word{i:03d}" for i in range(1000)]
+    corrections = {}
+    while len(corrections) < n:
+        phrase = " ".join(rng.sample(words, rng.randint(1, 3)))
+        corrections[phrase] = phrase.upper()
+    shortcuts = {f"shortcut {i}": f"canned prompt {i}" for i in range(n // 10)}
+    return Rules(shortcuts=shortcuts, corrections=corrections)
+
+
+def _naive(rules: Rules):
+    compiled = [(re.compile(rf"\b{re.escape(k)}\b", re.I), v) for k, v in rules.corrections.items()]
+
+    def run(text: str) -> str:
+        for pattern, repl in compiled:
+            text = pattern.sub(repl, text)
+        return text
+
+    return run
+
+
+def _time(fn, reps: int) -> float:
+    start = time.perf_counter()
+    for _ in range(reps):
+        for text in TEXTS:
+            fn(text)
+    return (time.perf_counter() - start) / (reps * len(TEXTS)) * 1e6
+
+
+def main() -> None:
+    rng = random.Random(0)
+    print(f"{'rules':>7} {'build ms':>9} {'pipeline us':>12} {'regex loop us':>14}")
+    for n in (10, 100, 1000, 5000, 20000):
+        rules = _rules(n, rng)
+        t0 = time.perf_counter()
+        pipeline = Pipeline(rules)
+        build_ms = (time.perf_counter() - t0) * 1e3
+        fast = _time(pipeline.process, 2000)
+        slow = _time(_naive(rules), max(1, 20000 // n))
+        print(f"{n:>7} {build_ms:>9.1f} {fast:>12.1f} {slow:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Time-to-first-audio for a long piped response, read-all vs streaming SPEAK.
+
+Text arrives at a fixed rate (a model still generating); synthesis is a
+stand-in with a fixed first-byte latency plus per-character cost, so the
+numbers isolate the pipeline rather than the TTS provider.
+
+    python -m benchmarks.bench_tts_stream [chars] [chars_per_sec]
+"""
+import sys
+import time
+
+from claude_audio_connector.tts import iter_clauses, play
+
+FIRST_BYTE_SEC = 0.15
+PER_CHAR_SEC = 0.0002
+CHUNK_CHARS = 24
+
+SENTENCE = (
+    "The daemon keeps one websocket open, batches microphone audio every "
+    "hundred and fifty milliseconds, and routes transcripts to the session "
+    "that was addressed. "
+)
+
+
+def _generate(total: int, rate: float):
+    text = (SENTENCE * (total // len(SENTENCE) + 1))[:total]
+    start = time.monotonic()
+    for i in range(0, len(text), CHUNK_CHARS):
+        delay = start + i / rate - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        yield text[i:i + CHUNK_CHARS]
+
+
+def _synth(clause: str):
+    time.sleep(FIRST_BYTE_SEC + PER_CHAR_SEC * len(clause))
+    yield b"\x00" * 4800
+
+
+def _measure(clauses_fn) -> tuple[float, float]:
+    start = time.monotonic()
+    first: list[float] = []
+    play(clauses_fn(), _synth, lambda chunk: None, on_first_audio=lambda: first.append(time.monotonic()))
+    return first[0] - start, time.monotonic() - start
+
+
+def main() -> None:
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 600.0
+
+    ttfa_all, end_all = _measure(lambda: ["".join(_generate(total, rate))])
+    ttfa_stream, end_stream = _measure(lambda: iter_clauses(_generate(total, rate)))
+    print(f"{total} chars at {rate:.0f} chars/s")
+    print(f"read-all   first audio {ttfa_all * 1e3:8.0f} ms   done {end_all * 1e3:8.0f} ms")
+    print(f"streaming  first audio {ttfa_stream * 1e3:8.0f} ms   done {end_stream * 1e3:8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
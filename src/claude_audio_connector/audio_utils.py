@@ -1,12 +1,206 @@
-import sounddevice as sd
+from __future__ import annotations
 
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
 
-def resolve_device(name: str | None) -> int | None:
-    if name is None:
+if TYPE_CHECKING:
+    import sounddevice as sd
+
+
+class DeviceError(OSError):
+    """No usable input device (wraps sounddevice.PortAudioError)."""
+
+
+# Held by output streams while they play and by DeviceRegistry.refresh(), so
+# re-initialising PortAudio never pulls the device out from under TTS.
+PORTAUDIO_LOCK = threading.RLock()
+
+
+def _hotplug_fingerprint() -> tuple | None:
+    # Cheap change detector: ALSA rewrites /proc/asound/cards and adds/removes
+    # /dev/snd nodes whenever a card comes or goes. Other platforms rely on the
+    # stream going inactive instead.
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        cards = Path("/proc/asound/cards").read_text()
+    except OSError:
+        cards = ""
+    try:
+        nodes = tuple(sorted(os.listdir("/dev/snd")))
+    except OSError:
+        nodes = ()
+    return cards, nodes
+
+
+class DeviceRegistry:
+    """Caches the PortAudio device list and re-resolves inputs by stable name."""
+
+    def __init__(self) -> None:
+        self._devices: list[dict] | None = None
+        self._fingerprint = _hotplug_fingerprint()
+        self._stable: dict[str, str] = {}
+
+    def devices(self) -> list[dict]:
+        if self._devices is None:
+            import sounddevice as sd
+
+            self._devices = [dict(d) for d in sd.query_devices()]
+        return self._devices
+
+    def name_of(self, index: int | None) -> str | None:
+        devices = self.devices()
+        if index is None or not 0 <= index < len(devices):
+            return None
+        return devices[index]["name"]
+
+    def resolve(self, name: str | None) -> int | None:
+        if name is None:
+            return None
+        devices = self.devices()
+        inputs = [(i, d) for i, d in enumerate(devices) if d["max_input_channels"] > 0]
+
+        stable = self._stable.get(name)
+        if stable is not None:
+            for i, d in inputs:
+                if d["name"] == stable:
+                    return i
+
+        if name.isdigit():
+            if stable is not None:
+                # The device we pinned by index is gone; indices shift on
+                # hot-plug so fall back to the default rather than guess.
+                return None
+            idx = int(name)
+            if 0 <= idx < len(devices):
+                self._stable[name] = devices[idx]["name"]
+            return idx
+
+        for i, d in inputs:
+            if name.lower() in d["name"].lower():
+                self._stable[name] = d["name"]
+                return i
         return None
-    if name.isdigit():
-        return int(name)
-    for i, d in enumerate(sd.query_devices()):
-        if d["max_input_channels"] > 0 and name.lower() in d["name"].lower():
-            return i
-    return None
+
+    @property
+    def watches_hotplug(self) -> bool:
+        return self._fingerprint is not None
+
+    def changed(self) -> bool:
+        return _hotplug_fingerprint() != self._fingerprint
+
+    def refresh(self) -> None:
+        # PortAudio only enumerates devices at init time. Must not be called
+        # while an input stream is open; output streams hold PORTAUDIO_LOCK.
+        # sounddevice has no public way to re-initialise: _terminate() and
+        # _initialize() are private, present in 0.4.x and 0.5.x (pyproject
+        # requires >= 0.4.6). Re-check them when raising that bound.
+        import sounddevice as sd
+
+        with PORTAUDIO_LOCK:
+            sd._terminate()
+            sd._initialize()
+            self._devices = None
+            self._fingerprint = _hotplug_fingerprint()
+
+
+_registry: DeviceRegistry | None = None
+
+
+def default_registry() -> DeviceRegistry:
+    global _registry
+    if _registry is None:
+        _registry = DeviceRegistry()
+    return _registry
+
+
+def resolve_device(name: str | None) -> int | None:
+    return default_registry().resolve(name)
+
+
+class MicStream:
+    """Raw int16 mono input stream that can be moved to another device in place."""
+
+    def __init__(
+        self,
+        registry: DeviceRegistry,
+        device: str | None,
+        *,
+        samplerate: int,
+        blocksize: int,
+        callback: Callable,
+    ) -> None:
+        self._registry = registry
+        self._device = device
+        self._samplerate = samplerate
+        self._blocksize = blocksize
+        self._callback = callback
+        self._stream: sd.RawInputStream | None = None
+        self.device_name: str | None = None
+
+    @property
+    def active(self) -> bool:
+        return self._stream is not None and self._stream.active
+
+    def open(self) -> None:
+        if self._stream is not None:
+            return
+        # Imported here so headless tools (soak runs) never load PortAudio.
+        import sounddevice as sd
+
+        try:
+            dev_id = self._registry.resolve(self._device)
+            stream = sd.RawInputStream(
+                samplerate=self._samplerate, channels=1, dtype="int16",
+                blocksize=self._blocksize, callback=self._callback, device=dev_id,
+            )
+            stream.start()
+        except sd.PortAudioError as exc:
+            raise DeviceError(str(exc)) from exc
+        self._stream = stream
+        self.device_name = self._registry.name_of(dev_id)
+
+    def close(self) -> None:
+        stream, self._stream = self._stream, None
+        if stream is None:
+            return
+        import sounddevice as sd
+
+        try:
+            stream.stop()
+        except sd.PortAudioError:
+            pass
+        stream.close()
+
+    def needs_migration(self) -> bool:
+        return not self.active or self._registry.changed()
+
+    def devices_changed(self) -> bool:
+        return self._registry.changed()
+
+    def migrate(self) -> None:
+        """Reopen the stream, re-enumerating devices only if the set changed.
+
+        Without a hot-plug fingerprint (non-Linux) a dead stream is the only
+        hint, so every migration re-enumerates there.
+        """
+        registry = self._registry
+        if registry.watches_hotplug and not registry.changed():
+            self.close()
+            self.open()
+            return
+
+        import sounddevice as sd
+
+        # Wait for playback to finish before closing, so the mic is not left
+        # closed for the length of an utterance.
+        with PORTAUDIO_LOCK:
+            self.close()
+            try:
+                registry.refresh()
+            except sd.PortAudioError as exc:
+                raise DeviceError(str(exc)) from exc
+            self.open()
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AudioBridge:
+    """Hands PortAudio blocks to the event loop without waking it per block.
+
+    callback() runs on the PortAudio thread and only appends to a bounded
+    deque; the loop drains it on its own schedule. Counters are written only
+    by the callback thread, so no lock is needed.
+    """
+
+    def __init__(self, max_blocks: int) -> None:
+        self._blocks: deque[bytes] = deque()
+        self._max_blocks = max(1, max_blocks)
+        self.paused = True
+        self.frames = 0
+        self.input_overflows = 0
+        self.input_underflows = 0
+        # Blocks dropped because the loop did not drain in time.
+        self.overruns = 0
+        # Frames thrown away while paused (no STT connection to feed).
+        self.discarded = 0
+
+    def callback(self, indata, frames, time_info, status) -> None:
+        self.frames += frames
+        if status.input_overflow:
+            self.input_overflows += 1
+        if status.input_underflow:
+            self.input_underflows += 1
+        if self.paused:
+            self.discarded += frames
+            return
+        if len(self._blocks) >= self._max_blocks:
+            try:
+                self._blocks.popleft()
+            except IndexError:
+                pass
+            self.overruns += 1
+        self._blocks.append(bytes(indata))
+
+    def drain(self) -> list[bytes]:
+        out = []
+        pop = self._blocks.popleft
+        try:
+            while True:
+                out.append(pop())
+        except IndexError:
+            return out
+
+    def pause(self) -> None:
+        self.paused = True
+        self._blocks.clear()
+
+    def resume(self) -> None:
+        self._blocks.clear()
+        self.paused = False
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+
+class StatusWriter:
+    """Writes the status file on a background thread, coalescing bursts.
+
+    Only the latest status matters to readers, so a set() while a write is
+    queued just replaces the pending value.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._pending: str | None = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="status")
+        self._closed = False
+
+    def set(self, status: str) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            queued = self._pending is not None
+            self._pending = status
+        if not queued:
+            self._executor.submit(self._flush)
+
+    def _flush(self) -> None:
+        with self._lock:
+            status, self._pending = self._pending, None
+        if status is None:
+            return
+        try:
+            with open(self._path, "w") as f:
+                f.write(status)
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        """Finish queued writes; later set() calls are ignored."""
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=True)
@@ -1,39 +1,69 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 import os
 from pathlib import Path
+from typing import Any, Callable
 
+TTS_SPEEDS = {"slowest": -1.0, "slow": -0.5, "normal": 0.0, "fast": 0.25, "fastest": 0.5}
+STT_CODECS = {"pcm_s16le", "wav"}
+STT_ENGINES = {"sarvam", "local"}
 
-def _env_str(name: str, default: str) -> str:
-    return os.getenv(name, default)
+_TRUE = {"1", "true", "yes", "y", "on"}
+_FALSE = {"0", "false", "no", "n", "off", ""}
 
 
-def _env_int(name: str, default: int) -> int:
-    return int(os.getenv(name, str(default)))
+def _parse_bool(raw: str) -> bool:
+    value = raw.strip().lower()
+    if value in _TRUE:
+        return True
+    if value in _FALSE:
+        return False
+    raise ValueError(f"expected a boolean, got {raw!r}")
 
 
-def _env_bool(name: str, default: bool) -> bool:
-    raw = os.getenv(name)
-    if raw is None:
-        return default
-    return raw.strip().lower() in {"1", "true", "yes", "y", "on"}
+# Keys in os.environ that were populated from an env file rather than the real
+# environment. Reloads may overwrite these but never the caller's own exports.
+_file_keys: set[str] = set()
+_env_loaded = False
+_env_source: tuple[str, bool] | None = None
 
 
-def load_env_file(path: str, override: bool = False) -> None:
-    file_path = Path(path).expanduser()
-    if not file_path.exists():
-        return
-    for raw in file_path.read_text().splitlines():
+def parse_env_text(text: str) -> dict[str, str]:
+    values: dict[str, str] = {}
+    for raw in text.splitlines():
         line = raw.strip()
         if not line or line.startswith("#") or "=" not in line:
             continue
         key, value = line.split("=", 1)
         key = key.strip()
         value = value.strip().strip("\"").strip("'")
-        if key and (override or key not in os.environ):
+        if key:
+            values[key] = value
+    return values
+
+
+def read_env_file(path: str) -> dict[str, str]:
+    try:
+        return parse_env_text(Path(path).expanduser().read_text())
+    except OSError:
+        return {}
+
+
+def load_env_file(path: str, override: bool = False) -> list[str]:
+    """Apply an env file to os.environ. Returns the keys whose value changed."""
+    changed = []
+    for key, value in read_env_file(path).items():
+        if override or key not in os.environ or key in _file_keys:
+            if os.environ.get(key) != value:
+                changed.append(key)
             os.environ[key] = value
+            _file_keys.add(key)
+    return changed
 
 
 def load_env_from_args(argv: list[str]) -> None:
+    global _env_loaded, _env_source
+    if _env_loaded:
+        return
     path = None
     override = False
     if "--config" in argv:
@@ -45,6 +75,16 @@ def load_env_from_args(argv: list[str]) -> None:
     if not path:
         path = os.getenv("CLAUDE_AUDIO_ENV") or ".env"
     load_env_file(path, override=override)
+    _env_loaded = True
+    _env_source = (path, override)
+
+
+def reload_env() -> list[str]:
+    """Re-apply the env file chosen by load_env_from_args."""
+    if _env_source is None:
+        return []
+    path, override = _env_source
+    return load_env_file(path, override=override)
 
 
 @dataclass(frozen=True)
@@ -56,33 +96,204 @@ class Config:
     stt_codec: str
     stt_input_device: str | None
     stt_high_vad: bool
+    stt_batch_interval: float
+    stt_streaming_max_wait_ms: int
+    stt_engine: str
+    stt_local_model: str | None
+    stt_failover_after: int
+    stt_health_interval: float
     audio_blocksize: int
+    audio_queue_ms: int
+    audio_device_poll_sec: float
+    local_vad: bool
+    local_vad_mode: int
+    local_vad_threshold: float
+    local_vad_noise_ms: int
+    local_vad_multiplier: float
+    local_vad_preroll_ms: int
+    local_vad_hold_ms: int
+    no_speech_timeout: float
+    max_utterance_sec: float
     socket_path: str
     cartesia_api_key: str
     cartesia_voice_id: str
     tts_speed: str
     tts_sample_rate: int
+    transcript_rules: str | None
+    journal_dir: str | None
+    journal_segment_mb: int
+    journal_max_segments: int
+    metrics_endpoint: str | None
+    dsp_stages: str | None
+    dsp_offload: bool
+
+
+@dataclass(frozen=True)
+class Setting:
+    attr: str
+    env: str
+    parse: Callable[[str], Any]
+    default: Any
+    check: Callable[[Any], bool] | None = None
+    hint: str = ""
+    # Tunables can be swapped into a running daemon without reopening audio.
+    tunable: bool = False
+
+
+def _positive(value) -> bool:
+    return value > 0
+
+
+def _optional_str(raw: str) -> str | None:
+    return raw or None
+
+
+def _metrics_endpoint(raw: str) -> str | None:
+    from .metrics import parse_endpoint
+
+    if raw:
+        parse_endpoint(raw)
+    return raw or None
+
 
+def _dsp_spec(raw: str) -> str | None:
+    from .dsp import parse_stages
 
-def load_config() -> Config:
+    parse_stages(raw)
+    return raw or None
+
+
+def _rules_spec(raw: str) -> str | None:
+    from .transcript import Rules
+
+    if raw:
+        try:
+            Rules.load(raw)
+        except OSError as exc:
+            raise ValueError(f"cannot read {raw}: {exc.strerror or exc}") from None
+    return raw or None
+
+
+SCHEMA: tuple[Setting, ...] = (
+    Setting("stt_model", "SARVAM_STT_MODEL", str, "saaras:v3", tunable=True),
+    Setting("stt_language", "SARVAM_STT_LANGUAGE", str, "en-IN", tunable=True),
+    Setting("stt_sample_rate", "SARVAM_STT_SAMPLE_RATE", int, 16000, _positive, "must be > 0"),
+    Setting("stt_codec", "SARVAM_STT_CODEC", str.lower, "pcm_s16le",
+            STT_CODECS.__contains__, f"one of {sorted(STT_CODECS)}"),
+    Setting("stt_input_device", "SARVAM_INPUT_DEVICE", _optional_str, None),
+    Setting("stt_high_vad", "SARVAM_STT_HIGH_VAD", _parse_bool, False, tunable=True),
+    Setting("stt_batch_interval", "STT_BATCH_INTERVAL", float, 0.15, _positive, "must be > 0",
+            tunable=True),
+    Setting("stt_streaming_max_wait_ms", "STT_STREAMING_MAX_WAIT_MS", int, 1500, _positive,
+            "must be > 0"),
+    Setting("stt_engine", "CLAUDE_AUDIO_STT_ENGINE", str.lower, "sarvam",
+            STT_ENGINES.__contains__, f"one of {sorted(STT_ENGINES)}"),
+    Setting("stt_local_model", "CLAUDE_AUDIO_LOCAL_STT_MODEL", _optional_str, None),
+    Setting("stt_failover_after", "CLAUDE_AUDIO_STT_FAILOVER_AFTER", int, 3, _positive,
+            "must be > 0"),
+    Setting("stt_health_interval", "CLAUDE_AUDIO_STT_HEALTH_SEC", float, 30.0, _positive,
+            "must be > 0", tunable=True),
+    Setting("audio_blocksize", "AUDIO_BLOCKSIZE", int, 320, _positive, "must be > 0"),
+    Setting("audio_queue_ms", "AUDIO_QUEUE_MS", int, 2000, _positive, "must be > 0"),
+    Setting("audio_device_poll_sec", "AUDIO_DEVICE_POLL_SEC", float, 1.0, _positive,
+            "must be > 0"),
+    # Local VAD and utterance limits are read by capture/listen, which load
+    # config per run; the daemon relies on the STT engine's VAD instead.
+    Setting("local_vad", "LOCAL_VAD", _parse_bool, True),
+    Setting("local_vad_mode", "LOCAL_VAD_MODE", int, 2, lambda v: 0 <= v <= 3, "must be 0-3"),
+    Setting("local_vad_threshold", "LOCAL_VAD_THRESHOLD", float, 0.01, lambda v: v >= 0,
+            "must be >= 0"),
+    Setting("local_vad_noise_ms", "LOCAL_VAD_NOISE_MS", int, 300, lambda v: v >= 0,
+            "must be >= 0"),
+    Setting("local_vad_multiplier", "LOCAL_VAD_MULTIPLIER", float, 3.0, _positive,
+            "must be > 0"),
+    Setting("local_vad_preroll_ms", "LOCAL_VAD_PREROLL_MS", int, 300, lambda v: v >= 0,
+            "must be >= 0"),
+    Setting("local_vad_hold_ms", "LOCAL_VAD_HOLD_MS", int, 700, lambda v: v >= 0,
+            "must be >= 0"),
+    Setting("no_speech_timeout", "NO_SPEECH_TIMEOUT", float, 10.0, _positive, "must be > 0"),
+    Setting("max_utterance_sec", "MAX_UTTERANCE_SEC", float, 30.0, _positive, "must be > 0"),
+    Setting("cartesia_api_key", "CARTESIA_API_KEY", str, ""),
+    Setting("cartesia_voice_id", "CARTESIA_VOICE_ID", str, "e07c00bc-4134-4eae-9ea4-1a55fb45746b",
+            tunable=True),
+    Setting("tts_speed", "TTS_SPEED", str.lower, "fast", TTS_SPEEDS.__contains__,
+            f"one of {list(TTS_SPEEDS)}", tunable=True),
+    Setting("tts_sample_rate", "TTS_SAMPLE_RATE", int, 24000, _positive, "must be > 0"),
+    Setting("transcript_rules", "CLAUDE_AUDIO_RULES", _rules_spec, None, tunable=True),
+    Setting("journal_dir", "CLAUDE_AUDIO_JOURNAL", _optional_str, None),
+    Setting("journal_segment_mb", "CLAUDE_AUDIO_JOURNAL_SEGMENT_MB", int, 64, _positive,
+            "must be > 0"),
+    Setting("journal_max_segments", "CLAUDE_AUDIO_JOURNAL_MAX_SEGMENTS", int, 8,
+            lambda v: v >= 2, "must be >= 2"),
+    Setting("metrics_endpoint", "CLAUDE_AUDIO_METRICS", _metrics_endpoint, None),
+    Setting("dsp_stages", "CLAUDE_AUDIO_DSP", _dsp_spec, None),
+    Setting("dsp_offload", "CLAUDE_AUDIO_DSP_OFFLOAD", _parse_bool, True),
+)
+
+TUNABLES = frozenset(s.attr for s in SCHEMA if s.tunable)
+
+
+def _read_setting(setting: Setting) -> Any:
+    raw = os.getenv(setting.env)
+    if raw is None:
+        return setting.default
+    try:
+        value = setting.parse(raw.strip())
+    except ValueError as exc:
+        raise SystemExit(f"{setting.env}: {exc}") from None
+    if setting.check is not None and not setting.check(value):
+        raise SystemExit(f"{setting.env}={raw!r}: {setting.hint}")
+    return value
+
+
+_config: Config | None = None
+
+
+def load_config(reload: bool = False) -> Config:
+    global _config
+    if _config is not None and not reload:
+        return _config
+
+    values = {s.attr: _read_setting(s) for s in SCHEMA}
     api_key = os.getenv("SARVAM_API_KEY", "").strip()
-    if not api_key:
+    if not api_key and values["stt_engine"] != "local":
         raise SystemExit("SARVAM_API_KEY is required")
+    if values["stt_engine"] == "local" and not values["stt_local_model"]:
+        raise SystemExit("CLAUDE_AUDIO_STT_ENGINE=local needs CLAUDE_AUDIO_LOCAL_STT_MODEL")
+    if values["dsp_stages"]:
+        # Build the chain once here so bad stage parameters fail at load,
+        # not later inside the DSP worker.
+        from .dsp import build_chain, parse_stages
+
+        try:
+            build_chain(parse_stages(values["dsp_stages"]), values["stt_sample_rate"])
+        except ValueError as exc:
+            raise SystemExit(f"CLAUDE_AUDIO_DSP: {exc}") from None
 
     from .runtime import socket_path
 
-    return Config(
-        api_key=api_key,
-        stt_model=_env_str("SARVAM_STT_MODEL", "saaras:v3"),
-        stt_language=_env_str("SARVAM_STT_LANGUAGE", "en-IN"),
-        stt_sample_rate=_env_int("SARVAM_STT_SAMPLE_RATE", 16000),
-        stt_codec=_env_str("SARVAM_STT_CODEC", "pcm_s16le").lower(),
-        stt_input_device=os.getenv("SARVAM_INPUT_DEVICE") or None,
-        stt_high_vad=_env_bool("SARVAM_STT_HIGH_VAD", True),
-        audio_blocksize=_env_int("AUDIO_BLOCKSIZE", 320),
-        socket_path=socket_path(),
-        cartesia_api_key=_env_str("CARTESIA_API_KEY", ""),
-        cartesia_voice_id=_env_str("CARTESIA_VOICE_ID", "e07c00bc-4134-4eae-9ea4-1a55fb45746b"),
-        tts_speed=_env_str("TTS_SPEED", "fast"),
-        tts_sample_rate=_env_int("TTS_SAMPLE_RATE", 24000),
-    )
+    _config = Config(api_key=api_key, socket_path=socket_path(), **values)
+    return _config
+
+
+def default_config(socket_path: str, **overrides: Any) -> Config:
+    """Schema defaults without reading the environment, for stand-in runs."""
+    values = {s.attr: s.default for s in SCHEMA}
+    values.update(overrides)
+    values.setdefault("api_key", "")
+    return Config(socket_path=socket_path, **values)
+
+
+def tunable_changes(old: Config, new: Config) -> tuple[dict[str, Any], list[str]]:
+    """Split the differences between two configs into (applied, needs_restart)."""
+    applied: dict[str, Any] = {}
+    restart: list[str] = []
+    for f in fields(Config):
+        before, after = getattr(old, f.name), getattr(new, f.name)
+        if before == after:
+            continue
+        if f.name in TUNABLES:
+            applied[f.name] = after
+        else:
+            restart.append(f.name)
+    return applied, restart
@@ -1,173 +1,313 @@
 import asyncio
-import base64
-import io
+import dataclasses
 import os
-import re
+import queue
 import signal
 import sys
-import wave
+import time
 import warnings
-
-import sounddevice as sd
-from sarvamai import AsyncSarvamAI
+from typing import Callable
 
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
-from .audio_utils import resolve_device
-from .config import load_config, load_env_from_args
+from .audio_utils import DeviceError, DeviceRegistry, MicStream
+from .bridge import AudioBridge, StatusWriter
+from .config import (
+    Config,
+    load_config,
+    load_env_from_args,
+    reload_env,
+    tunable_changes,
+)
+from .dsp import DspWorker, InlineDsp, parse_stages
 from .ipc import IpcServer
+from .journal import Journal
+from .metrics import REGISTRY, LoopMonitor, serve as serve_metrics
+from .profiling import TRACER
 from .runtime import runtime_path
-
-WAKE_RE = re.compile(
-    r"^(?:hey|a|ok|okay)\s+(?:claude|cloud|claud|klaud|lord|clod|klaude|clade)[,.:!?\s]*",
-    re.IGNORECASE,
-)
-STOP_PHRASES = {"stop listening", "no audio", "stop audio", "exit audio"}
+from .stt_engine import END_SPEECH, START_SPEECH, TRANSCRIPT, EngineSelector, SttEngine, build_selector
+from .transcript import Pipeline, Result, Rules
+from .tts import speak_clauses
 
 PID_PATH = runtime_path("pid")
 STATUS_PATH = runtime_path("status")
 
-BATCH_INTERVAL = 0.15
+# Longest wait between attempts to open a missing input device.
+MAX_DEVICE_BACKOFF_SEC = 30.0
+
+# Tunables that only take effect on a fresh STT websocket.
+_STT_CONNECT_FIELDS = frozenset({"stt_model", "stt_language", "stt_high_vad"})
+
+# Written only from the event loop thread.
+BYTES_UPLOADED = REGISTRY.counter("claude_audio_stt_uploaded_bytes", "PCM bytes sent to the STT websocket.")
+RECONNECTS = REGISTRY.counter("claude_audio_stt_reconnects", "STT websocket reconnects.")
+BACKOFF = REGISTRY.gauge("claude_audio_stt_backoff_seconds", "Current reconnect backoff, 0 when connected.")
+CONNECTED = REGISTRY.gauge("claude_audio_stt_connected", "1 while the STT websocket is open.")
+STT_LATENCY = REGISTRY.histogram(
+    "claude_audio_stt_latency_seconds", "END_SPEECH to final transcript.",
+)
+TTS_LATENCY = REGISTRY.histogram(
+    "claude_audio_tts_first_audio_seconds", "SPEAK request to first chunk of audio played.",
+)
+
+
+_status_writer: StatusWriter | None = None
 
 
 def set_status(status: str) -> None:
+    # File I/O happens on the writer thread, never on the event loop.
+    if _status_writer is not None:
+        _status_writer.set(status)
+
+
+def _rules_key(path: str | None) -> tuple | None:
+    """Identifies one version of the rules file, so RELOAD notices edits."""
+    if not path:
+        return None
     try:
-        with open(STATUS_PATH, "w") as f:
-            f.write(status)
+        st = os.stat(os.path.expanduser(path))
     except OSError:
-        pass
+        return path, None
+    return path, st.st_mtime_ns, st.st_size
 
 
-def _pcm_to_wav_b64(pcm: bytes, sample_rate: int) -> str:
-    buf = io.BytesIO()
-    with wave.open(buf, "wb") as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(sample_rate)
-        wf.writeframes(pcm)
-    return base64.b64encode(buf.getvalue()).decode()
+class LiveConfig:
+    """Config of a running daemon. RELOAD swaps tunables in without touching audio."""
 
+    def __init__(self, cfg: Config) -> None:
+        self.cfg = cfg
+        self.reconnect = asyncio.Event()
+        self._rules_key = _rules_key(cfg.transcript_rules)
+        self.pipeline = Pipeline(Rules.load(cfg.transcript_rules))
 
-def _play_tts_sync(text: str, cfg) -> None:
-    from cartesia import Cartesia
+    def reload(self) -> str:
+        reload_env()
+        try:
+            new = load_config(reload=True)
+        except SystemExit as exc:
+            return f"ERR {exc}"
+        applied, restart = tunable_changes(self.cfg, new)
+        rules_key = _rules_key(new.transcript_rules)
+        if rules_key != self._rules_key:
+            # On error nothing is applied and the old pipeline stays.
+            try:
+                self.pipeline = Pipeline(Rules.load(new.transcript_rules))
+            except (OSError, ValueError) as exc:
+                return f"ERR transcript rules: {exc}"
+            self._rules_key = rules_key
+            applied["transcript_rules"] = new.transcript_rules
+        if applied:
+            self.cfg = dataclasses.replace(self.cfg, **applied)
+        if _STT_CONNECT_FIELDS & applied.keys():
+            self.reconnect.set()
+        return f"OK applied={','.join(sorted(applied))} restart={','.join(sorted(restart))}"
+
+
+async def _send_audio_loop(
+    session, source: Callable[[], list[bytes]], live: LiveConfig, stop_event: asyncio.Event,
+    journal: Journal | None,
+) -> None:
+    drained_ns = 0
+    while not stop_event.is_set():
+        await asyncio.sleep(live.cfg.stt_batch_interval)
+        frames = source()
+        if not frames:
+            continue
+        pcm = b"".join(frames)
+        BYTES_UPLOADED.inc(len(pcm))
+        if journal is not None:
+            journal.pcm(pcm)
+        if not TRACER.on:
+            await session.send(pcm)
+            continue
+        start = time.perf_counter_ns()
+        TRACER.span("capture", "capture", drained_ns or start, start, blocks=len(frames))
+        await session.send(pcm)
+        drained_ns = time.perf_counter_ns()
+        TRACER.span("stt", "batch send", start, drained_ns, bytes=len(pcm))
 
-    if not cfg.cartesia_api_key:
-        return
 
-    speed_map = {"slowest": -1.0, "slow": -0.5, "normal": 0.0, "fast": 0.25, "fastest": 0.5}
-    client = Cartesia(api_key=cfg.cartesia_api_key)
+async def _pump_dsp(bridge: AudioBridge, dsp, period: float, stop_event: asyncio.Event) -> None:
+    """Move captured blocks into the DSP stage at roughly the block rate."""
+    while not stop_event.is_set():
+        await asyncio.sleep(period)
+        dsp.ensure_alive()
+        for frame in bridge.drain():
+            dsp.submit(frame)
 
-    with sd.RawOutputStream(samplerate=cfg.tts_sample_rate, channels=1, dtype="int16") as stream:
-        for chunk in client.tts.bytes(
-            model_id="sonic-2",
-            transcript=text,
-            voice={"mode": "id", "id": cfg.cartesia_voice_id},
-            output_format={"container": "raw", "encoding": "pcm_s16le", "sample_rate": cfg.tts_sample_rate},
-            speed=speed_map.get(cfg.tts_speed, 0.25),
-            language="en",
-        ):
-            stream.write(chunk)
 
+async def _watch_mic(mic: MicStream, poll_sec: float, stop_event: asyncio.Event) -> None:
+    """Reopen the input stream when the device set changes or the stream dies.
 
-async def _send_audio_loop(ws, buf: list, sr: int, stop_event: asyncio.Event) -> None:
+    Runs independently of the STT websocket so a headset swap only costs the
+    audio captured while PortAudio re-enumerates. While no input device can
+    be opened, retries back off up to MAX_DEVICE_BACKOFF_SEC unless the
+    device set changes in the meantime.
+    """
+    loop = asyncio.get_running_loop()
+    backoff = poll_sec
+    retry_at = 0.0
     while not stop_event.is_set():
-        await asyncio.sleep(BATCH_INTERVAL)
-        if not buf:
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=poll_sec)
+        except asyncio.TimeoutError:
+            pass
+        if stop_event.is_set() or not mic.needs_migration():
+            continue
+        if loop.time() < retry_at and not mic.devices_changed():
             continue
-        frames = buf[:]
-        buf.clear()
         try:
-            await ws.transcribe(
-                audio=_pcm_to_wav_b64(b"".join(frames), sr),
-                encoding="audio/wav",
-                sample_rate=sr,
-            )
-        except Exception:
+            await loop.run_in_executor(None, mic.migrate)
+            backoff, retry_at = poll_sec, 0.0
+        except DeviceError:
+            mic.close()
+            retry_at = loop.time() + backoff
+            backoff = min(backoff * 2, MAX_DEVICE_BACKOFF_SEC)
+
+
+async def _deliver(ipc: IpcServer, text: str, session: str | None) -> None:
+    if not TRACER.on:
+        await ipc.send(text, session)
+        return
+    start = time.perf_counter_ns()
+    sent = await ipc.send(text, session)
+    TRACER.span("ipc", "ipc send", start, session=session or "", sent=sent)
+
+
+async def _receive_loop(
+    session, live: LiveConfig, ipc: IpcServer, stop_event: asyncio.Event, journal: Journal | None,
+    on_event: Callable[[], None] | None = None,
+) -> None:
+    pending_wake = False
+    pending_session: str | None = None
+    speech_end: float | None = None
+    speech_end_ns = 0
+
+    async for event in session:
+        if stop_event.is_set():
             return
+        if on_event is not None:
+            on_event()
+
+        if event.kind != TRANSCRIPT:
+            if journal is not None:
+                journal.event(event.kind)
+            if event.kind == START_SPEECH:
+                set_status("recording")
+            elif event.kind == END_SPEECH:
+                speech_end = time.monotonic()
+                set_status("processing")
+            if TRACER.on:
+                TRACER.instant("stt", event.kind)
+                speech_end_ns = time.perf_counter_ns() if event.kind == END_SPEECH else speech_end_ns
+
+        else:
+            text = event.text
+            if journal is not None:
+                journal.transcript(text)
+            if speech_end is not None:
+                STT_LATENCY.observe(time.monotonic() - speech_end)
+                speech_end = None
+                if TRACER.on and speech_end_ns:
+                    TRACER.span("stt", "transcript", speech_end_ns, chars=len(text))
+            speech_end_ns = 0
+            if not text or text == "<nospeech>":
+                set_status("idle")
+                continue
+
+            if not ipc.has_waiter:
+                pending_wake, pending_session = False, None
+                set_status("idle")
+                continue
+
+            result = live.pipeline.process(text, awake=pending_wake)
+            target = pending_session
+            if result.kind == "prompt":
+                # "hey claude, backend, ..." routes to the session named backend.
+                addressed, rest = ipc.address(result.text)
+                if addressed is not None:
+                    target = addressed
+                    result = live.pipeline.process(rest, awake=True) if rest else Result("wake")
+
+            if result.kind == "stop":
+                await _deliver(ipc, "STOP_LISTENING", target)
+                return
+
+            if result.kind == "wake":
+                pending_wake, pending_session = True, target
+                set_status("idle")
+                continue
+
+            if result.kind == "prompt":
+                set_status(f"heard:{result.text}")
+                await _deliver(ipc, result.text, target)
+
+            pending_wake, pending_session = False, None
+            set_status("idle")
 
 
-async def _streaming_loop(client: AsyncSarvamAI, cfg, ipc: IpcServer, stop_event: asyncio.Event) -> None:
-    loop = asyncio.get_running_loop()
-    buf: list[bytes] = []
-    sr = cfg.stt_sample_rate
-    dev_id = resolve_device(cfg.stt_input_device)
-
-    def mic_cb(indata, frames, time_info, status):
-        loop.call_soon_threadsafe(buf.append, bytes(indata))
-
-    async with client.speech_to_text_streaming.connect(
-        model=cfg.stt_model,
-        mode="transcribe",
-        language_code=cfg.stt_language,
-        high_vad_sensitivity="false",
-        vad_signals="true",
-    ) as ws:
-        with sd.RawInputStream(
-            samplerate=sr, channels=1, dtype="int16",
-            blocksize=cfg.audio_blocksize, callback=mic_cb, device=dev_id,
-        ):
-            sender = asyncio.create_task(_send_audio_loop(ws, buf, sr, stop_event))
-            pending_wake = False
+async def _streaming_loop(
+    engine: SttEngine,
+    live: LiveConfig,
+    ipc: IpcServer,
+    bridge: AudioBridge,
+    stop_event: asyncio.Event,
+    journal: Journal | None = None,
+    dsp: DspWorker | InlineDsp | None = None,
+    on_connected: Callable[[], None] | None = None,
+    on_event: Callable[[], None] | None = None,
+) -> None:
+    async with engine.connect(live.cfg) as session:
+        # Audio captured while disconnected was already discarded.
+        bridge.resume()
+        if dsp is not None:
+            dsp.collect()
+        live.reconnect.clear()
+        CONNECTED.set(1)
+        BACKOFF.set(0)
+        if on_connected is not None:
+            on_connected()
+        sender = asyncio.create_task(_send_audio_loop(
+            session, dsp.collect if dsp is not None else bridge.drain, live, stop_event, journal,
+        ))
+        receiver = asyncio.create_task(_receive_loop(session, live, ipc, stop_event, journal, on_event))
+        reconnect = asyncio.create_task(live.reconnect.wait())
 
-            try:
-                async for msg in ws:
-                    if stop_event.is_set():
-                        return
-
-                    msg_type = str(getattr(msg, "type", ""))
-                    data = getattr(msg, "data", None)
-
-                    if msg_type == "events":
-                        sig = getattr(data, "signal_type", "") if data else ""
-                        if sig == "START_SPEECH":
-                            set_status("recording")
-                        elif sig == "END_SPEECH":
-                            set_status("processing")
-
-                    elif msg_type == "data":
-                        text = (getattr(data, "transcript", "") or "").strip()
-                        if not text or text == "<nospeech>":
-                            set_status("idle")
-                            continue
-
-                        if not ipc.has_waiter:
-                            pending_wake = False
-                            set_status("idle")
-                            continue
-
-                        if text.lower().strip() in STOP_PHRASES:
-                            await ipc.send("STOP_LISTENING")
-                            return
-
-                        if pending_wake:
-                            set_status(f"heard:{text}")
-                            await ipc.send(text)
-                            pending_wake = False
-                            set_status("idle")
-                            continue
-
-                        match = WAKE_RE.match(text)
-                        if match:
-                            prompt = text[match.end():].strip()
-                            if prompt:
-                                set_status(f"heard:{prompt}")
-                                await ipc.send(prompt)
-                            else:
-                                pending_wake = True
-                                set_status("idle")
-                                continue
-
-                        set_status("idle")
-            finally:
-                sender.cancel()
-                try:
-                    await sender
-                except asyncio.CancelledError:
-                    pass
-
-
-async def run_daemon(cfg) -> None:
-    stop_event = asyncio.Event()
+        try:
+            await asyncio.wait({sender, receiver, reconnect}, return_when=asyncio.FIRST_COMPLETED)
+            # A send error ends the session just like a dropped receive.
+            for task in (sender, receiver):
+                if task.done():
+                    task.result()
+        finally:
+            bridge.pause()
+            CONNECTED.set(0)
+            for task in (sender, receiver, reconnect):
+                task.cancel()
+            # Wait for every task even if one failed, or the receiver is
+            # left pending mid-iteration and its session generator leaks.
+            await asyncio.gather(sender, receiver, reconnect, return_exceptions=True)
+
+
+async def run_daemon(
+    cfg,
+    *,
+    stop_event: asyncio.Event | None = None,
+    engines: EngineSelector | None = None,
+    mic_factory: Callable[[Callable], MicStream] | None = None,
+    speak: Callable = speak_clauses,
+    pid_path: str = PID_PATH,
+    status_path: str = STATUS_PATH,
+) -> None:
+    """Run until SIGTERM/SIGINT or stop_event.
+
+    engines, mic_factory and speak replace the real STT engines, microphone
+    and TTS; the soak test uses them, with its own pid_path and status_path,
+    to run headless next to a real daemon.
+    """
+    global _status_writer
+    _status_writer = StatusWriter(status_path)
+    stop_event = stop_event or asyncio.Event()
     loop = asyncio.get_running_loop()
 
     for sig in (signal.SIGTERM, signal.SIGINT):
@@ -176,31 +316,157 @@ async def run_daemon(cfg) -> None:
         except NotImplementedError:
             signal.signal(sig, lambda *_: stop_event.set())
 
+    live = LiveConfig(cfg)
+
+    def first_audio(latency: float) -> None:
+        TTS_LATENCY.observe(latency)
+        if TRACER.on:
+            TRACER.instant("tts", "first audio", latency=latency)
+
+    async def traced_tts(clauses, name: str) -> None:
+        if not TRACER.on:
+            await loop.run_in_executor(None, speak, clauses, live.cfg, first_audio)
+            return
+        start = time.perf_counter_ns()
+        await loop.run_in_executor(None, speak, clauses, live.cfg, first_audio)
+        TRACER.span("tts", name, start)
+
     async def tts_fn(text: str) -> None:
-        await loop.run_in_executor(None, _play_tts_sync, text, cfg)
+        await traced_tts([text], "speak")
 
-    ipc = IpcServer(cfg.socket_path, tts_fn=tts_fn)
-    await ipc.start()
+    async def tts_stream_fn(clauses: queue.Queue) -> None:
+        # Blocks on the queue until IpcServer posts the None sentinel.
+        await traced_tts(iter(clauses.get, None), "speak stream")
 
-    with open(PID_PATH, "w") as f:
-        f.write(str(os.getpid()))
+    async def reload_fn() -> str:
+        return live.reload()
 
-    client = AsyncSarvamAI(api_subscription_key=cfg.api_key)
-    backoff = 0.5
+    ipc = IpcServer(cfg.socket_path, tts_fn=tts_fn, reload_fn=reload_fn, tts_stream_fn=tts_stream_fn)
+    await ipc.start()
 
+    # Everything started from here on is undone in the finally below, even
+    # if a later step (the DSP worker, the metrics listener) fails to start.
+    mic = watcher = journal = dsp = pump = lag = metrics_server = health = None
     try:
+        with open(pid_path, "w") as f:
+            f.write(str(os.getpid()))
+
+        bridge = AudioBridge(cfg.audio_queue_ms * cfg.stt_sample_rate // 1000 // cfg.audio_blocksize)
+        if mic_factory is None:
+            mic = MicStream(
+                DeviceRegistry(), cfg.stt_input_device,
+                samplerate=cfg.stt_sample_rate, blocksize=cfg.audio_blocksize, callback=bridge.callback,
+            )
+        else:
+            mic = mic_factory(bridge.callback)
+        try:
+            mic.open()
+        except DeviceError:
+            pass
+        watcher = asyncio.create_task(_watch_mic(mic, cfg.audio_device_poll_sec, stop_event))
+
+        if cfg.journal_dir:
+            journal = Journal(
+                cfg.journal_dir, cfg.stt_sample_rate,
+                segment_bytes=cfg.journal_segment_mb << 20, max_segments=cfg.journal_max_segments,
+            )
+            journal.start()
+
+        if cfg.dsp_stages:
+            stages = parse_stages(cfg.dsp_stages)
+            dsp = (DspWorker if cfg.dsp_offload else InlineDsp)(stages, cfg.stt_sample_rate)
+            dsp.start()
+            pump = asyncio.create_task(
+                _pump_dsp(bridge, dsp, cfg.audio_blocksize / cfg.stt_sample_rate, stop_event),
+            )
+            if isinstance(dsp, DspWorker):
+                REGISTRY.counter("claude_audio_dsp_dropped", "Blocks the DSP inbox had no room for.",
+                                 lambda: dsp.dropped)
+                REGISTRY.gauge("claude_audio_dsp_worker_up", "1 while the DSP process is alive.",
+                               lambda: int(dsp.alive))
+                REGISTRY.counter("claude_audio_dsp_restarts", "DSP processes restarted after dying.",
+                                 lambda: dsp.restarts)
+                REGISTRY.gauge("claude_audio_dsp_inline", "1 once DSP has fallen back to the main process.",
+                               lambda: int(dsp.inline))
+
+        monitor = LoopMonitor()
+        REGISTRY.counter("claude_audio_frames_captured", "Audio frames delivered by PortAudio.",
+                         lambda: bridge.frames)
+        REGISTRY.counter("claude_audio_input_overflows", "Callbacks flagged input_overflow by PortAudio.",
+                         lambda: bridge.input_overflows)
+        REGISTRY.counter("claude_audio_input_underflows", "Callbacks flagged input_underflow by PortAudio.",
+                         lambda: bridge.input_underflows)
+        REGISTRY.counter("claude_audio_bridge_overruns", "Blocks dropped because the loop fell behind.",
+                         lambda: bridge.overruns)
+        REGISTRY.counter("claude_audio_frames_discarded", "Frames captured while disconnected from STT.",
+                         lambda: bridge.discarded)
+        REGISTRY.gauge("claude_audio_audio_queue_blocks", "Captured blocks waiting for upload.",
+                       lambda: len(bridge))
+        monitor.export(REGISTRY)
+        REGISTRY.gauge("claude_audio_ipc_sessions", "Registered sessions.", lambda: ipc.session_count)
+        REGISTRY.gauge("claude_audio_ipc_waiting_sessions", "Sessions with an open WAIT.", lambda: ipc.waiter_count)
+        if journal is not None:
+            REGISTRY.counter("claude_audio_journal_dropped", "Journal records dropped.", lambda: journal.dropped)
+            REGISTRY.gauge("claude_audio_journal_ok", "0 while journal segments cannot be allocated.",
+                           lambda: int(journal.error is None))
+        lag = asyncio.create_task(monitor.run(stop_event))
+        metrics_server = await serve_metrics(cfg.metrics_endpoint) if cfg.metrics_endpoint else None
+
+        engines = engines or build_selector(cfg)
+        REGISTRY.gauge("claude_audio_stt_degraded", "1 while running on the fallback STT engine.",
+                       lambda: int(engines.degraded))
+        REGISTRY.counter("claude_audio_stt_failovers", "Switches to the other STT engine after repeated failures.",
+                         lambda: engines.failovers)
+        if engines.fallback:
+            health = asyncio.create_task(engines.watch(live, stop_event))
+        backoff = 0.5
+        attempts = 0
         while not stop_event.is_set():
             set_status("idle")
+            if attempts:
+                RECONNECTS.inc()
+            attempts += 1
             try:
-                await _streaming_loop(client, cfg, ipc, stop_event)
+                await _streaming_loop(
+                    engines.current, live, ipc, bridge, stop_event, journal, dsp,
+                    engines.connected, engines.healthy,
+                )
                 backoff = 0.5
             except Exception:
+                if engines.failed():
+                    # Try the other engine straight away.
+                    backoff = 0.5
+                    continue
                 set_status("error")
+                BACKOFF.set(backoff)
                 await asyncio.sleep(backoff)
                 backoff = min(backoff * 2, 15)
     finally:
+        for task in (watcher, lag, pump, health):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if metrics_server is not None:
+            metrics_server.close()
+            await metrics_server.wait_closed()
+        if mic is not None:
+            mic.close()
+        if engines is not None:
+            engines.close()
+        if TRACER.on:
+            TRACER.stop()
+        if dsp is not None:
+            dsp.close()
+        if journal is not None:
+            journal.close()
         await ipc.close()
-        for path in (PID_PATH, STATUS_PATH):
+        # Flush pending status writes before removing the file they target.
+        _status_writer.close()
+        for path in (pid_path, status_path):
             try:
                 os.remove(path)
             except OSError:
@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import math
+import multiprocessing as mp
+import struct
+import sys
+from array import array
+from multiprocessing import shared_memory
+from typing import Callable
+
+# Ring layout: producer index and consumer index on separate cache lines,
+# then the data area. Indices count bytes ever written/read, so free space is
+# capacity - (head - tail) and no wrap flag is needed.
+_INDEX = struct.Struct("<Q")
+_LEN = struct.Struct("<I")
+_HEAD = 0
+_TAIL = 64
+_DATA = 128
+
+_CTX = mp.get_context("spawn")
+# Worker deaths tolerated before DspWorker gives up and runs the chain inline.
+MAX_RESTARTS = 3
+
+
+class RingBuffer:
+    """Single-producer single-consumer frame ring in shared memory.
+
+    Index loads and stores go through a process-shared lock. Taking and
+    releasing it are full memory barriers, so on weakly ordered CPUs (ARM)
+    the consumer never sees a new head before the frame bytes behind it.
+    Frame copies stay outside the lock. A peer attaching by name must be
+    given the creator's lock.
+    """
+
+    def __init__(self, name: str | None = None, capacity: int = 1 << 20, lock=None) -> None:
+        if name is not None and lock is None:
+            raise TypeError("attaching to a ring needs the creator's lock")
+        self.lock = lock if lock is not None else _CTX.Lock()
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=_DATA + capacity)
+            self._shm.buf[:_DATA] = bytes(_DATA)
+            self._owner = True
+        else:
+            self._shm = _attach(name)
+            self._owner = False
+        self._buf = self._shm.buf
+        self.capacity = self._shm.size - _DATA
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def _indices(self) -> tuple[int, int]:
+        with self.lock:
+            return _INDEX.unpack_from(self._buf, _HEAD)[0], _INDEX.unpack_from(self._buf, _TAIL)[0]
+
+    def _publish(self, offset: int, value: int) -> None:
+        with self.lock:
+            _INDEX.pack_into(self._buf, offset, value)
+
+    def _copy_in(self, pos: int, data) -> None:
+        start = pos % self.capacity
+        first = min(len(data), self.capacity - start)
+        self._buf[_DATA + start:_DATA + start + first] = data[:first]
+        if first < len(data):
+            self._buf[_DATA:_DATA + len(data) - first] = data[first:]
+
+    def _copy_out(self, pos: int, size: int) -> bytes:
+        start = pos % self.capacity
+        first = min(size, self.capacity - start)
+        out = bytes(self._buf[_DATA + start:_DATA + start + first])
+        if first < size:
+            out += bytes(self._buf[_DATA:_DATA + size - first])
+        return out
+
+    def write(self, frame: bytes) -> bool:
+        head, tail = self._indices()
+        need = _LEN.size + len(frame)
+        if need > self.capacity - (head - tail):
+            return False
+        self._copy_in(head, _LEN.pack(len(frame)))
+        self._copy_in(head + _LEN.size, memoryview(frame))
+        self._publish(_HEAD, head + need)
+        return True
+
+    def read(self) -> bytes | None:
+        head, tail = self._indices()
+        if tail == head:
+            return None
+        size = _LEN.unpack(self._copy_out(tail, _LEN.size))[0]
+        frame = self._copy_out(tail + _LEN.size, size)
+        self._publish(_TAIL, tail + _LEN.size + size)
+        return frame
+
+    def close(self) -> None:
+        self._buf.release()
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # Workers are spawned from the creating process and share its resource
+    # tracker, so attaching again only re-adds an existing entry; the creator
+    # still owns unlinking.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+# Every stage is built as Stage(sample_rate, **params from the spec).
+
+
+class Gain:
+    def __init__(self, sample_rate: int, db: str = "0") -> None:
+        self._factor = 10 ** (float(db) / 20)
+
+    def __call__(self, pcm: bytes) -> bytes:
+        samples = array("h", pcm)
+        f = self._factor
+        return array("h", [max(-32768, min(32767, int(s * f))) for s in samples]).tobytes()
+
+
+class HighPass:
+    """One-pole high-pass filter; removes DC offset and low rumble."""
+
+    def __init__(self, sample_rate: int, hz: str = "80") -> None:
+        cutoff = float(hz)
+        if not 0 < cutoff < sample_rate / 2:
+            raise ValueError(f"hz must be between 0 and {sample_rate // 2} (half the sample rate)")
+        rc = 1 / (2 * math.pi * cutoff)
+        dt = 1 / sample_rate
+        self._alpha = rc / (rc + dt)
+        self._prev_in = 0.0
+        self._prev_out = 0.0
+
+    def __call__(self, pcm: bytes) -> bytes:
+        a, x_prev, y_prev = self._alpha, self._prev_in, self._prev_out
+        out = array("h")
+        for x in array("h", pcm):
+            y_prev = a * (y_prev + x - x_prev)
+            x_prev = x
+            out.append(max(-32768, min(32767, int(y_prev))))
+        self._prev_in, self._prev_out = x_prev, y_prev
+        return out.tobytes()
+
+
+class NoiseGate:
+    """Silences blocks whose RMS is below threshold (int16 units)."""
+
+    def __init__(self, sample_rate: int, threshold: str = "300") -> None:
+        self._threshold = float(threshold)
+        if self._threshold < 0:
+            raise ValueError("threshold must be >= 0")
+
+    def __call__(self, pcm: bytes) -> bytes:
+        samples = array("h", pcm)
+        if not samples:
+            return pcm
+        rms = math.sqrt(sum(s * s for s in samples) / len(samples))
+        return pcm if rms >= self._threshold else bytes(len(pcm))
+
+
+STAGES: dict[str, Callable[..., Callable[[bytes], bytes]]] = {
+    "gain": Gain,
+    "highpass": HighPass,
+    "gate": NoiseGate,
+}
+
+
+def parse_stages(spec: str) -> list[tuple[str, dict[str, str]]]:
+    """Parse "highpass:hz=100,gain:db=6" (stages run left to right)."""
+    stages = []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, args = part.partition(":")
+        if name not in STAGES:
+            raise ValueError(f"unknown DSP stage {name!r}; have {sorted(STAGES)}")
+        params = {}
+        for item in filter(None, args.split(";")):
+            key, _, value = item.partition("=")
+            params[key.strip()] = value.strip()
+        stages.append((name, params))
+    return stages
+
+
+def build_chain(stages: list[tuple[str, dict[str, str]]], sample_rate: int) -> Callable[[bytes], bytes]:
+    """Instantiate every stage; bad or unknown parameters raise ValueError."""
+    chain = []
+    for name, params in stages:
+        try:
+            chain.append(STAGES[name](sample_rate, **params))
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"DSP stage {name!r}: {exc}") from None
+
+    def run(pcm: bytes) -> bytes:
+        for stage in chain:
+            pcm = stage(pcm)
+        return pcm
+
+    return run
+
+
+class InlineDsp:
+    """Runs the chain on the calling thread; same interface as DspWorker."""
+
+    def __init__(self, stages: list[tuple[str, dict[str, str]]], sample_rate: int) -> None:
+        self._run = build_chain(stages, sample_rate)
+        self._out: list[bytes] = []
+
+    def start(self) -> None:
+        pass
+
+    def ensure_alive(self) -> None:
+        pass
+
+    def submit(self, frame: bytes) -> bool:
+        self._out.append(self._run(frame))
+        return True
+
+    def collect(self) -> list[bytes]:
+        out, self._out = self._out, []
+        return out
+
+    def close(self) -> None:
+        pass
+
+
+def _worker_main(in_ring: tuple, out_ring: tuple, stages, sample_rate: int, ready, stop) -> None:
+    # Each ring arrives as (name, lock).
+    inbox = RingBuffer(in_ring[0], lock=in_ring[1])
+    outbox = RingBuffer(out_ring[0], lock=out_ring[1])
+    run = build_chain(stages, sample_rate)
+    try:
+        while not stop.is_set():
+            if not ready.acquire(timeout=0.1):
+                continue
+            frame = inbox.read()
+            if frame is None:
+                continue
+            result = run(frame)
+            while not outbox.write(result) and not stop.is_set():
+                stop.wait(0.001)
+    finally:
+        inbox.close()
+        outbox.close()
+
+
+class DspWorker:
+    """Runs the DSP chain in a separate process fed through shared memory.
+
+    PCM never goes through pickling: frames are copied into a shared ring,
+    and a semaphore only carries the "frame available" wakeup. If the
+    process dies, ensure_alive() starts a new one on fresh rings; after
+    MAX_RESTARTS deaths the chain runs inline in this process instead.
+    """
+
+    def __init__(
+        self, stages: list[tuple[str, dict[str, str]]], sample_rate: int, ring_bytes: int = 1 << 20,
+    ) -> None:
+        self._stages = stages
+        self._sample_rate = sample_rate
+        self._ring_bytes = ring_bytes
+        self._ctx = _CTX
+        self._inbox: RingBuffer | None = None
+        self._outbox: RingBuffer | None = None
+        self._ready = None
+        self._stop = None
+        self._proc = None
+        self._inline: InlineDsp | None = None
+        self.dropped = 0
+        self.restarts = 0
+
+    def start(self) -> None:
+        self._inbox = RingBuffer(capacity=self._ring_bytes)
+        self._outbox = RingBuffer(capacity=self._ring_bytes)
+        self._ready = self._ctx.Semaphore(0)
+        self._stop = self._ctx.Event()
+        proc = self._ctx.Process(
+            target=_worker_main,
+            args=(
+                (self._inbox.name, self._inbox.lock), (self._outbox.name, self._outbox.lock),
+                self._stages, self._sample_rate, self._ready, self._stop,
+            ),
+            name="claude-audio-dsp",
+            daemon=True,
+        )
+        proc.start()
+        self._proc = proc
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.is_alive()
+
+    @property
+    def inline(self) -> bool:
+        return self._inline is not None
+
+    def ensure_alive(self) -> None:
+        """Replace a dead worker; call periodically from the feeding loop."""
+        if self._proc is None or self._proc.is_alive():
+            return
+        # Frames in flight are dropped with the old rings: the dead process
+        # may have died holding a ring lock, so nothing here touches them.
+        self._shutdown()
+        if self.restarts < MAX_RESTARTS:
+            self.restarts += 1
+            self.start()
+        else:
+            self._inline = InlineDsp(self._stages, self._sample_rate)
+
+    def submit(self, frame: bytes) -> bool:
+        if self._inline is not None:
+            return self._inline.submit(frame)
+        if self._inbox is None or not self._inbox.write(frame):
+            self.dropped += 1
+            return False
+        self._ready.release()
+        return True
+
+    def collect(self) -> list[bytes]:
+        if self._inline is not None:
+            return self._inline.collect()
+        out = []
+        if self._outbox is None:
+            return out
+        while (frame := self._outbox.read()) is not None:
+            out.append(frame)
+        return out
+
+    def close(self) -> None:
+        self._shutdown()
+        self._inline = None
+
+    def _shutdown(self) -> None:
+        if self._proc is not None:
+            self._stop.set()
+            self._proc.join(timeout=2)
+            if self._proc.is_alive():
+                self._proc.kill()
+                self._proc.join()
+            self._proc = None
+        for ring in (self._inbox, self._outbox):
+            if ring is not None:
+                ring.close()
+        self._inbox = self._outbox = None
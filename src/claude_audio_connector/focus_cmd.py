@@ -0,0 +1,54 @@
+import argparse
+import asyncio
+import sys
+
+from .config import load_env_from_args
+from .ipc import focus_via_daemon, sessions_via_daemon
+from .runtime import session_label, session_name, socket_path
+
+
+def _resolve(name: str, sessions: list[tuple[str, bool, bool]]) -> str:
+    """Accept a full session id or the directory part of exactly one."""
+    names = [n for n, _, _ in sessions]
+    if name in names:
+        return name
+    matches = [n for n in names if session_label(n) == name]
+    if len(matches) == 1:
+        return matches[0]
+    if matches:
+        raise SystemExit(f"{name!r} is ambiguous: {', '.join(matches)}")
+    raise SystemExit(f"no session {name!r}; have {', '.join(names) or 'none'}")
+
+
+def main() -> None:
+    argv = sys.argv[1:]
+    load_env_from_args(argv)
+    parser = argparse.ArgumentParser(description="Choose which session gets prompts that name no session.")
+    parser.add_argument("session", nargs="?", help="session id or directory name (default: this session)")
+    parser.add_argument("--config", help="env file (see claude-audio-daemon)")
+    parser.add_argument("--clear", action="store_true", help="go back to the most recently active session")
+    parser.add_argument("--list", action="store_true", help="show registered sessions")
+    args = parser.parse_args(argv)
+
+    sock = socket_path()
+    sessions = asyncio.run(sessions_via_daemon(sock))
+    if sessions is None:
+        print("Voice daemon not running.")
+        sys.exit(1)
+
+    if args.list:
+        for name, focused, waiting in sessions:
+            marks = ", ".join(m for m, on in (("focus", focused), ("waiting", waiting)) if on)
+            print(f"{name} ({marks})" if marks else name)
+        return
+
+    target = None if args.clear else _resolve(args.session, sessions) if args.session else session_name()
+    reply = asyncio.run(focus_via_daemon(target, sock))
+    if reply != "OK":
+        print(reply or "Voice daemon not running.")
+        sys.exit(1)
+    print(f"Focus: {target}." if target else "Focus cleared.")
+
+
+if __name__ == "__main__":
+    main()
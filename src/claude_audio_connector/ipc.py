@@ -1,20 +1,64 @@
 from __future__ import annotations
 
 import asyncio
+import codecs
 import os
-from typing import Callable, Awaitable, Optional
+import queue
+import re
+import time
+from typing import AsyncIterator, Awaitable, Callable
 
-from .runtime import socket_path
+from .metrics import REGISTRY
+from .profiling import TRACER, profile
+from .runtime import session_label, socket_path
+from .tts import ClauseSplitter
+
+DEFAULT_SESSION = "default"
+SEND_TIMEOUT = 2.0
+CLOSE_TIMEOUT = 1.0
+# Registered sessions kept; the least recently active idle ones go first.
+MAX_SESSIONS = 64
+# A session with no WAIT open and no contact for this long is treated as
+# gone (crashed, or closed without claude-audio-stop).
+SESSION_TTL = 1800.0
+MAX_PROFILE_SEC = 300.0
+# A SPEAK_STREAM producer silent for this long is treated as finished.
+STREAM_IDLE_TIMEOUT = 15.0
+# Sent to a WAIT that a newer WAIT for the same session took over. The
+# control character keeps it apart from any transcript.
+REPLACED = "\x15REPLACED"
+
+_NAME_SPLIT = re.compile(r"[\s_\-.]+")
+_EDGE_PUNCT = ".,:;!?\"'()"
+
+
+def _name_words(name: str) -> list[str]:
+    return [w for w in _NAME_SPLIT.split(name.lower()) if w]
 
 
 class IpcServer:
-    def __init__(self, path: str | None = None, tts_fn: Callable[[str], Awaitable[None]] | None = None) -> None:
+    def __init__(
+        self,
+        path: str | None = None,
+        tts_fn: Callable[[str], Awaitable[None]] | None = None,
+        reload_fn: Callable[[], Awaitable[str]] | None = None,
+        tts_stream_fn: Callable[[queue.Queue], Awaitable[None]] | None = None,
+    ) -> None:
         self._path = path or socket_path()
         self._tts_fn = tts_fn
+        self._reload_fn = reload_fn
+        self._tts_stream_fn = tts_stream_fn
         self._server: asyncio.AbstractServer | None = None
-        self._waiter: Optional[asyncio.StreamWriter] = None
+        # Open WAIT connection per session, and when each session was last
+        # registered, focused or delivered to (monotonic seconds).
+        self._waiters: dict[str, asyncio.StreamWriter] = {}
+        self._sessions: dict[str, float] = {}
+        # Last contact from each session: WAIT, REGISTER, FOCUS or PING.
+        self._seen: dict[str, float] = {}
+        self._focus: str | None = None
         self._waiter_ready = asyncio.Event()
         self._lock = asyncio.Lock()
+        self._profiling = False
 
     async def start(self) -> None:
         try:
@@ -27,11 +71,14 @@ class IpcServer:
     async def close(self) -> None:
         if self._server:
             self._server.close()
-            await self._server.wait_closed()
         async with self._lock:
-            if self._waiter:
-                self._waiter.close()
-                self._waiter = None
+            waiters = list(self._waiters.values())
+            self._waiters.clear()
+        # Waiters first: the server only finishes closing once they are gone.
+        for writer in waiters:
+            await _close_writer(writer)
+        if self._server:
+            await self._server.wait_closed()
         try:
             if os.path.exists(self._path):
                 os.remove(self._path)
@@ -42,17 +89,24 @@ class IpcServer:
         try:
             line = await asyncio.wait_for(reader.readline(), timeout=5)
         except (OSError, asyncio.TimeoutError):
-            writer.close()
+            await _close_writer(writer)
             return
 
         cmd = line.decode("utf-8", errors="replace").strip()
+        verb, _, arg = cmd.partition(" ")
+        name = arg.strip() or DEFAULT_SESSION
 
-        if cmd == "WAIT":
+        if verb == "WAIT":
             async with self._lock:
-                if self._waiter:
-                    self._waiter.close()
-                self._waiter = writer
+                old = self._waiters.pop(name, None)
+                self._waiters[name] = writer
+                self._sessions.setdefault(name, time.monotonic())
+                self._seen[name] = time.monotonic()
+                self._trim_sessions()
                 self._waiter_ready.set()
+            if old:
+                await self._reply(old, REPLACED)
+            await self._hold_waiter(name, reader, writer)
 
         elif cmd.startswith("SPEAK:"):
             text = cmd[6:]
@@ -61,19 +115,240 @@ class IpcServer:
                     await self._tts_fn(text)
                 except Exception:
                     pass
+            await self._reply(writer, "OK")
+
+        elif cmd == "SPEAK_STREAM":
+            await self._speak_stream(reader)
+            await self._reply(writer, "OK")
+
+        elif verb == "REGISTER":
+            async with self._lock:
+                self._sessions[name] = self._seen[name] = time.monotonic()
+                self._trim_sessions()
+                count = len(self._sessions)
+            await self._reply(writer, f"OK {count}")
+
+        elif verb == "UNREGISTER":
+            async with self._lock:
+                self._drop_session(name)
+                old = self._waiters.pop(name, None)
+                self._expire_sessions()
+                others = list(self._sessions)
+            if old:
+                await _close_writer(old)
+            # "OK <count> <name>,<name>" so stop can say who is still listening.
+            await self._reply(writer, f"OK {len(others)} {','.join(others)}".rstrip())
+
+        elif verb == "FOCUS":
+            async with self._lock:
+                self._focus = arg.strip() or None
+                if self._focus:
+                    self._sessions[self._focus] = self._seen[self._focus] = time.monotonic()
+                    self._trim_sessions()
+            await self._reply(writer, "OK")
+
+        elif verb == "SESSIONS":
+            async with self._lock:
+                self._expire_sessions()
+                names = [
+                    f"{n}{'*' if n == self._focus else ''}{'+' if n in self._waiters else ''}"
+                    for n in self._sessions
+                ]
+            await self._reply(writer, "OK " + ",".join(names))
+
+        elif cmd == "METRICS":
+            # Multi-line; OpenMetrics already terminates with "# EOF".
             try:
-                writer.write(b"OK\n")
+                writer.write(REGISTRY.render().encode("utf-8"))
                 await writer.drain()
             except OSError:
                 pass
-            writer.close()
+            await _close_writer(writer)
+
+        elif verb == "PING":
+            # "PING <session>" also marks that session as still alive.
+            if arg.strip():
+                async with self._lock:
+                    if name in self._sessions:
+                        self._seen[name] = time.monotonic()
+            await self._reply(writer, "PONG")
+
+        elif verb == "PROFILE":
+            await self._reply(writer, await self._profile(arg.strip()))
+
+        elif verb == "TRACE":
+            mode = arg.strip().lower()
+            if mode == "on":
+                TRACER.start()
+                reply = "OK tracing"
+            elif mode == "off":
+                path = await asyncio.get_running_loop().run_in_executor(None, TRACER.stop)
+                reply = f"OK {path}" if path else "ERR tracing is off"
+            else:
+                reply = "ERR usage: TRACE on|off"
+            await self._reply(writer, reply)
+
+        elif cmd == "RELOAD":
+            reply = "ERR reload not supported"
+            if self._reload_fn:
+                try:
+                    reply = await self._reload_fn()
+                except Exception as exc:
+                    reply = f"ERR {exc}"
+            await self._reply(writer, reply)
 
         else:
-            writer.close()
+            await _close_writer(writer)
+
+    async def _profile(self, arg: str) -> str:
+        try:
+            seconds = float(arg or 10)
+        except ValueError:
+            return "ERR usage: PROFILE <seconds>"
+        if not 0 < seconds <= MAX_PROFILE_SEC:
+            return f"ERR seconds must be in (0, {MAX_PROFILE_SEC:g}]"
+        if self._profiling:
+            return "ERR a profile is already running"
+        self._profiling = True
+        try:
+            scope, folded = await profile(seconds)
+        except OSError as exc:
+            return f"ERR {exc}"
+        finally:
+            self._profiling = False
+        return f"OK {scope} {folded}"
+
+    async def _hold_waiter(self, name: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Keep the WAIT connection until it is answered, replaced or dropped.
+
+        Clients send nothing after WAIT, so EOF here means either we closed
+        the writer or the client went away; in the latter case forget it.
+        """
+        try:
+            while await reader.read(1024):
+                pass
+        except OSError:
+            pass
+        async with self._lock:
+            mine = self._waiters.get(name) is writer
+            if mine:
+                del self._waiters[name]
+            if name in self._sessions:
+                self._seen[name] = time.monotonic()
+        if mine:
+            await _close_writer(writer)
+
+    def _drop_session(self, name: str) -> None:
+        # Caller holds the lock.
+        self._sessions.pop(name, None)
+        self._seen.pop(name, None)
+        if self._focus == name:
+            self._focus = None
+
+    def _expire_sessions(self) -> None:
+        # Caller holds the lock.
+        cutoff = time.monotonic() - SESSION_TTL
+        for name in [n for n in self._sessions if n not in self._waiters]:
+            if self._seen.get(name, self._sessions[name]) < cutoff:
+                self._drop_session(name)
+
+    def _trim_sessions(self) -> None:
+        # Caller holds the lock.
+        while len(self._sessions) > MAX_SESSIONS:
+            idle = [n for n in self._sessions if n not in self._waiters and n != self._focus]
+            if not idle:
+                return
+            self._drop_session(min(idle, key=self._sessions.__getitem__))
+
+    async def _speak_stream(self, reader: asyncio.StreamReader) -> None:
+        """Feed text arriving until EOF to TTS, starting at the first clause.
+
+        A producer that stalls for STREAM_IDLE_TIMEOUT without closing is
+        cut off: what it sent is flushed and spoken, then the stream ends.
+        """
+        clauses: queue.Queue = queue.Queue()
+        splitter = ClauseSplitter()
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        speaker: asyncio.Task | None = None
+        try:
+            while True:
+                try:
+                    data = await asyncio.wait_for(reader.read(4096), STREAM_IDLE_TIMEOUT)
+                except (OSError, asyncio.TimeoutError):
+                    data = b""
+                text = decoder.decode(data, final=not data)
+                ready = splitter.feed(text)
+                if not data:
+                    ready += splitter.flush()
+                for clause in ready:
+                    clauses.put(clause)
+                if ready and speaker is None and self._tts_stream_fn:
+                    speaker = asyncio.create_task(self._tts_stream_fn(clauses))
+                if not data:
+                    break
+        finally:
+            clauses.put(None)
+            if speaker is not None:
+                try:
+                    await speaker
+                except Exception:
+                    pass
+
+    @staticmethod
+    async def _reply(writer: asyncio.StreamWriter, text: str) -> None:
+        try:
+            writer.write(text.encode("utf-8") + b"\n")
+            await writer.drain()
+        except OSError:
+            pass
+        await _close_writer(writer)
 
     @property
     def has_waiter(self) -> bool:
-        return self._waiter is not None
+        return bool(self._waiters)
+
+    @property
+    def session_count(self) -> int:
+        return len(self._sessions)
+
+    @property
+    def waiter_count(self) -> int:
+        return len(self._waiters)
+
+    def address(self, text: str) -> tuple[str | None, str]:
+        """Split an explicitly addressed session name off text.
+
+        Only with more than one session registered, and only when marked as
+        an address: "session backend run tests", "backend, run tests" or
+        "backend: run tests". A prompt that merely starts with a session's
+        name ("tests are failing") is left alone.
+        """
+        if len(self._sessions) < 2:
+            return None, text
+        tokens = text.split()
+        explicit = bool(tokens) and tokens[0].strip(_EDGE_PUNCT).lower() == "session"
+        if explicit:
+            tokens = tokens[1:]
+        lowered = [t.strip(_EDGE_PUNCT).lower() for t in tokens]
+        best: tuple[str | None, int] = (None, 0)
+        for name in self._sessions:
+            words = _name_words(session_label(name))
+            used = len(words)
+            if used <= best[1] or lowered[:used] != words:
+                continue
+            if explicit or tokens[used - 1].endswith((",", ":")):
+                best = (name, used)
+        name, used = best
+        if name is None:
+            return None, text
+        return name, " ".join(tokens[used:])
+
+    def _target(self) -> str | None:
+        if self._focus in self._waiters:
+            return self._focus
+        if not self._waiters:
+            return None
+        return max(self._waiters, key=lambda n: self._sessions.get(n, 0.0))
 
     async def wait_for_waiter(self, stop_event: asyncio.Event) -> None:
         while not self.has_waiter and not stop_event.is_set():
@@ -83,29 +358,69 @@ class IpcServer:
             except asyncio.TimeoutError:
                 pass
 
-    async def send(self, text: str) -> bool:
+    async def send(self, text: str, session: str | None = None) -> bool:
+        """Deliver text to session, or to the focused / last-active waiting one."""
         async with self._lock:
-            if not self._waiter:
+            name = session if session is not None else self._target()
+            writer = self._waiters.pop(name, None) if name is not None else None
+            if writer is None:
                 return False
-            writer = self._waiter
-            self._waiter = None
+            self._sessions[name] = time.monotonic()
 
         try:
             writer.write(text.encode("utf-8") + b"\n")
-            await writer.drain()
+            # A wedged client must not stall the transcript loop.
+            return await _within(writer.drain(), SEND_TIMEOUT)
+        except OSError:
+            return False
         finally:
-            writer.close()
-        return True
+            await _close_writer(writer)
+
+
+def _consume(future: asyncio.Future) -> None:
+    if not future.cancelled():
+        future.exception()
+
+
+async def _within(aw: Awaitable, timeout: float) -> bool:
+    """Await aw for up to timeout seconds; False if it did not finish.
+
+    Unlike asyncio.wait_for before 3.12, a cancellation of the caller that
+    races with aw completing is never swallowed.
+    """
+    task = asyncio.ensure_future(aw)
+    task.add_done_callback(_consume)
+    try:
+        done, _ = await asyncio.wait({task}, timeout=timeout)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    if not done:
+        task.cancel()
+        return False
+    task.result()
+    return True
 
 
-async def wait_for_message(path: str | None = None) -> str | None:
+async def _close_writer(writer: asyncio.StreamWriter) -> None:
+    """Close and wait for the transport to go, so sockets never pile up."""
+    writer.close()
+    try:
+        if not await _within(writer.wait_closed(), CLOSE_TIMEOUT):
+            # Peer is not reading; drop whatever is still buffered.
+            writer.transport.abort()
+    except OSError:
+        pass
+
+
+async def wait_for_message(path: str | None = None, session: str | None = None) -> str | None:
     sock_path = path or socket_path()
     try:
         reader, writer = await asyncio.open_unix_connection(sock_path)
     except OSError:
         return None
 
-    writer.write(b"WAIT\n")
+    writer.write(f"WAIT {session}\n".encode("utf-8") if session else b"WAIT\n")
     await writer.drain()
 
     try:
@@ -134,3 +449,95 @@ async def speak_via_daemon(text: str, path: str | None = None) -> bool:
 
     writer.close()
     return True
+
+
+async def request_daemon(command: str, path: str | None = None, timeout: float = 10) -> str | None:
+    """Send a one-line command and return the one-line reply, or None."""
+    sock_path = path or socket_path()
+    try:
+        reader, writer = await asyncio.open_unix_connection(sock_path)
+    except OSError:
+        return None
+
+    writer.write(command.encode("utf-8") + b"\n")
+    await writer.drain()
+
+    try:
+        data = await asyncio.wait_for(reader.readline(), timeout=timeout)
+    except (OSError, asyncio.TimeoutError):
+        data = b""
+
+    writer.close()
+    return data.decode("utf-8").strip() if data else None
+
+
+async def speak_stream_via_daemon(chunks: AsyncIterator[str], path: str | None = None) -> bool:
+    """Forward text to the daemon as it is produced; returns after playback."""
+    sock_path = path or socket_path()
+    try:
+        reader, writer = await asyncio.open_unix_connection(sock_path)
+    except OSError:
+        return False
+
+    try:
+        writer.write(b"SPEAK_STREAM\n")
+        async for chunk in chunks:
+            writer.write(chunk.encode("utf-8"))
+            await writer.drain()
+        writer.write_eof()
+        await reader.readline()
+    except OSError:
+        pass
+
+    writer.close()
+    return True
+
+
+async def metrics_via_daemon(path: str | None = None) -> str | None:
+    sock_path = path or socket_path()
+    try:
+        reader, writer = await asyncio.open_unix_connection(sock_path)
+    except OSError:
+        return None
+
+    writer.write(b"METRICS\n")
+    await writer.drain()
+
+    try:
+        data = await asyncio.wait_for(reader.read(), timeout=10)
+    except (OSError, asyncio.TimeoutError):
+        data = b""
+
+    writer.close()
+    return data.decode("utf-8") if data else None
+
+
+async def reload_via_daemon(path: str | None = None) -> str | None:
+    return await request_daemon("RELOAD", path)
+
+
+async def profile_via_daemon(seconds: float, path: str | None = None) -> str | None:
+    return await request_daemon(f"PROFILE {seconds:g}", path, timeout=seconds + 30)
+
+
+async def trace_via_daemon(on: bool, path: str | None = None) -> str | None:
+    return await request_daemon(f"TRACE {'on' if on else 'off'}", path, timeout=30)
+
+
+async def focus_via_daemon(session: str | None, path: str | None = None) -> str | None:
+    """Route unaddressed prompts to session; None clears the focus."""
+    return await request_daemon(f"FOCUS {session}" if session else "FOCUS", path)
+
+
+async def sessions_via_daemon(path: str | None = None) -> list[tuple[str, bool, bool]] | None:
+    """Registered sessions as (name, focused, waiting), or None if no daemon."""
+    reply = await request_daemon("SESSIONS", path)
+    if reply is None or not reply.startswith("OK"):
+        return None
+    sessions = []
+    for item in filter(None, reply[3:].split(",")):
+        waiting = item.endswith("+")
+        item = item.rstrip("+")
+        focused = item.endswith("*")
+        sessions.append((item.rstrip("*"), focused, waiting))
+    return sessions
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import errno
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Iterator
+
+# Segment layout: a 16-byte header followed by back-to-back records. Every
+# block of a segment is allocated when it is created and reads as zero, so a
+# zero kind byte marks the end of the data, a crash never leaves a torn length
+# field pointing past the file, and a full disk fails segment creation instead
+# of a store into the mapping (which would be SIGBUS).
+_MAGIC = b"CAJ1"
+_SEG_HEADER = struct.Struct("<4sIq")  # magic, sample_rate, created_ns
+_REC_HEADER = struct.Struct("<BxxxIq")  # kind, payload length, wall clock ns
+_IDX_ENTRY = struct.Struct("<QqB")  # record offset, wall clock ns, kind
+
+PCM = 1
+EVENT = 2
+TRANSCRIPT = 3
+
+
+def _reserve(fd: int, size: int) -> None:
+    """Allocate size bytes of real (not sparse) zeroed blocks."""
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(fd, 0, size)
+            return
+        except OSError as exc:
+            if exc.errno not in (errno.EINVAL, errno.EOPNOTSUPP):
+                raise
+    # No fallocate here (macOS) or on this filesystem: write the zeros.
+    chunk = bytes(1 << 20)
+    for offset in range(0, size, len(chunk)):
+        os.write(fd, chunk[: min(len(chunk), size - offset)])
+
+
+class _Segment:
+    def __init__(self, path: Path, size: int, sample_rate: int) -> None:
+        self.path = path
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            _reserve(fd, size)
+            self.mm = mmap.mmap(fd, size)
+        except OSError:
+            path.unlink()
+            raise
+        finally:
+            os.close(fd)
+        self.mm[: _SEG_HEADER.size] = _SEG_HEADER.pack(_MAGIC, sample_rate, time.time_ns())
+        self.pos = _SEG_HEADER.size
+        self.flushed = 0
+        self.index: list[bytes] = []
+        # write() runs on the caller's thread, _flush() on the flusher; this
+        # guards pos and index between them.
+        self.lock = threading.Lock()
+
+    def fits(self, length: int) -> bool:
+        return self.pos + _REC_HEADER.size + length <= len(self.mm)
+
+    def write(self, kind: int, payload: bytes, ts_ns: int) -> None:
+        pos = self.pos
+        end = pos + _REC_HEADER.size
+        self.mm[pos:end] = _REC_HEADER.pack(kind, len(payload), ts_ns)
+        self.mm[end:end + len(payload)] = payload
+        with self.lock:
+            self.index.append(_IDX_ENTRY.pack(pos, ts_ns, kind))
+            self.pos = end + len(payload)
+
+    def close(self) -> None:
+        self.mm.flush()
+        self.mm.close()
+
+
+class Journal:
+    """Append-only, memory-mapped journal of audio, VAD events and transcripts.
+
+    append() only copies into the current mapping; msync, index writes,
+    pre-allocating the next segment and pruning old ones all happen on a
+    background flusher thread. When a segment cannot be allocated (full
+    disk) records are dropped and `error` says why; the flusher keeps
+    trying on each tick.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        sample_rate: int,
+        segment_bytes: int = 64 << 20,
+        max_segments: int = 8,
+        flush_interval: float = 1.0,
+    ) -> None:
+        self._dir = Path(directory).expanduser()
+        self._sample_rate = sample_rate
+        self._segment_bytes = segment_bytes
+        self._max_segments = max_segments
+        self._flush_interval = flush_interval
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._current: _Segment | None = None
+        self._spare: _Segment | None = None
+        self._retired: list[_Segment] = []
+        self._thread: threading.Thread | None = None
+        self.dropped = 0
+        self.error: str | None = None
+
+    def _new_segment(self) -> _Segment | None:
+        self._seq += 1
+        name = f"journal-{time.time_ns()}-{self._seq:06d}.seg"
+        try:
+            seg = _Segment(self._dir / name, self._segment_bytes, self._sample_rate)
+        except OSError as exc:
+            self.error = f"{name}: {exc}"
+            return None
+        self.error = None
+        return seg
+
+    def start(self) -> None:
+        try:
+            self._dir.mkdir(parents=True, exist_ok=True)
+        except OSError as exc:
+            self.error = str(exc)
+        else:
+            # Without a first segment append() drops everything until the
+            # flusher manages to allocate a spare.
+            self._current = self._new_segment()
+        self._thread = threading.Thread(target=self._run, name="journal-flusher", daemon=True)
+        self._thread.start()
+
+    def append(self, kind: int, payload: bytes, ts_ns: int | None = None) -> None:
+        seg = self._current
+        ts_ns = time.time_ns() if ts_ns is None else ts_ns
+        if seg is None or not seg.fits(len(payload)):
+            with self._lock:
+                spare, self._spare = self._spare, None
+                if spare is None or not spare.fits(len(payload)):
+                    # Flusher has not caught up (or the record is larger than
+                    # a segment); drop rather than block the caller.
+                    self._spare = spare
+                    self.dropped += 1
+                    self._wake.set()
+                    return
+                if seg is not None:
+                    self._retired.append(seg)
+                self._current = seg = spare
+            self._wake.set()
+        seg.write(kind, payload, ts_ns)
+
+    def pcm(self, data: bytes) -> None:
+        self.append(PCM, data)
+
+    def event(self, signal: str) -> None:
+        self.append(EVENT, signal.encode("utf-8"))
+
+    def transcript(self, text: str) -> None:
+        self.append(TRANSCRIPT, text.encode("utf-8"))
+
+    def _flush(self, seg: _Segment) -> None:
+        with seg.lock:
+            pos, entries = seg.pos, seg.index
+            seg.index = []
+        if pos > seg.flushed:
+            # msync works on whole pages.
+            start = seg.flushed - seg.flushed % mmap.ALLOCATIONGRANULARITY
+            seg.mm.flush(start, pos - start)
+            seg.flushed = pos
+        if entries:
+            with open(seg.path.with_suffix(".idx"), "ab") as f:
+                f.write(b"".join(entries))
+
+    def _prune(self) -> None:
+        segments = sorted(self._dir.glob("journal-*.seg"))
+        active = {s.path for s in (self._current, self._spare) if s is not None}
+        finished = [p for p in segments if p not in active]
+        for path in finished[: max(0, len(finished) - (self._max_segments - 1))]:
+            for victim in (path, path.with_suffix(".idx")):
+                try:
+                    victim.unlink()
+                except OSError:
+                    pass
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            self._tick()
+
+    def _tick(self) -> None:
+        with self._lock:
+            retired, self._retired = self._retired, []
+            need_spare = self._spare is None
+        for seg in retired:
+            self._flush(seg)
+            seg.close()
+        if self._current is not None:
+            self._flush(self._current)
+        if need_spare:
+            spare = self._new_segment()
+            with self._lock:
+                self._spare = spare
+        if retired:
+            self._prune()
+
+    def close(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            segments = self._retired + [self._current]
+            spare = self._spare
+            self._retired, self._current, self._spare = [], None, None
+        for seg in segments:
+            if seg is not None:
+                self._flush(seg)
+                seg.close()
+        if spare is not None:
+            spare.close()
+            for path in (spare.path, spare.path.with_suffix(".idx")):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+        self._prune()
+
+
+def segments(directory: str) -> list[Path]:
+    return sorted(Path(directory).expanduser().glob("journal-*.seg"))
+
+
+def read_segment(path: Path) -> tuple[int, Iterator[tuple[int, int, bytes]]]:
+    """Return (sample_rate, records) where records yields (kind, ts_ns, payload).
+
+    Records are read lazily from a read-only mapping, so only the used part
+    of a pre-sized segment is ever paged in.
+    """
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file: nothing to map.
+            raise ValueError(f"{path}: not a journal segment") from None
+    if len(mm) < _SEG_HEADER.size or mm[:4] != _MAGIC:
+        mm.close()
+        raise ValueError(f"{path}: not a journal segment")
+    _, sample_rate, _ = _SEG_HEADER.unpack_from(mm, 0)
+
+    def records() -> Iterator[tuple[int, int, bytes]]:
+        try:
+            pos = _SEG_HEADER.size
+            while pos + _REC_HEADER.size <= len(mm):
+                kind, length, ts_ns = _REC_HEADER.unpack_from(mm, pos)
+                start = pos + _REC_HEADER.size
+                if kind == 0 or start + length > len(mm):
+                    return
+                yield kind, ts_ns, mm[start:start + length]
+                pos = start + length
+        finally:
+            mm.close()
+
+    return sample_rate, records()
+
+
+def read_index(path: Path) -> list[tuple[int, int, int]]:
+    """(offset, ts_ns, kind) for each record flushed to the segment's index."""
+    try:
+        raw = path.with_suffix(".idx").read_bytes()
+    except OSError:
+        return []
+    usable = len(raw) - len(raw) % _IDX_ENTRY.size
+    return list(_IDX_ENTRY.iter_unpack(raw[:usable]))
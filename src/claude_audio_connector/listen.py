@@ -1,16 +1,10 @@
 import asyncio
-import re
 import sys
 
 from .audio_utils import CaptureConfig, VadConfig, record_utterance
 from .config import load_config, load_env_from_args
 from .stt import StreamingTranscriber, streaming_supported, transcribe_chunks
-
-WAKE_RE = re.compile(
-    r"^(?:hey|a|ok|okay)\s+(?:claude|cloud|claud|klaud|lord|clod|klaude|clade)[,.:!?\s]*",
-    re.IGNORECASE,
-)
-STOP_PHRASES = {"stop listening", "no audio", "stop audio", "exit audio"}
+from .transcript import Pipeline, Rules
 
 
 async def listen_once(cfg) -> str | None:
@@ -37,6 +31,7 @@ async def listen_once(cfg) -> str | None:
     )
 
     streaming_ok = streaming_supported(cfg)
+    pipeline = Pipeline(Rules.load(cfg.transcript_rules))
 
     while True:
         if streaming_ok:
@@ -66,14 +61,12 @@ async def listen_once(cfg) -> str | None:
         sys.stderr.write(f"  heard: \"{text}\"\n")
         sys.stderr.flush()
 
-        if text.lower().strip() in STOP_PHRASES:
+        result = pipeline.process(text)
+        if result.kind == "stop":
             return ""
-
-        match = WAKE_RE.match(text)
-        if match:
-            prompt = text[match.end() :].strip()
-            if prompt:
-                return prompt
+        if result.kind == "prompt":
+            return result.text
+        if result.kind == "wake":
             sys.stderr.write("  (wake word only, waiting for more)\n")
             sys.stderr.flush()
 
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import os
+import resource
+import sys
+import threading
+import time
+from typing import Any, Callable
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.5, 5.0, 10.0)
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonic counter.
+
+    inc() takes no lock: each counter must have a single writer thread. fn
+    reads a count owned by someone else (e.g. the audio bridge) at scrape time.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, fn: Callable[[], float] | None = None) -> None:
+        self.name = name
+        self.help = help
+        self.value = 0
+        self._fn = fn
+
+    def inc(self, amount: int | float = 1) -> None:
+        self.value += amount
+
+    def samples(self) -> list[str]:
+        value = self._fn() if self._fn is not None else self.value
+        return [f"{self.name}_total {_fmt(value)}"]
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, fn: Callable[[], float] | None = None) -> None:
+        self.name = name
+        self.help = help
+        self.value: float = 0
+        self._fn = fn
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def samples(self) -> list[str]:
+        value = self._fn() if self._fn is not None else self.value
+        return [f"{self.name} {_fmt(value)}"]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help = help
+        self._bounds = tuple(sorted(buckets))
+        self._counts = [0] * (len(self._bounds) + 1)
+        self._sum = 0.0
+        # Observations come from executor threads (TTS) as well as the loop.
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        idx = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._sum += value
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            counts, total = list(self._counts), self._sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self._bounds + (float("inf"),), counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{_fmt(bound)}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {_fmt(total)}")
+        lines.append(f"{self.name}_count {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Gauge | Histogram] = {}
+
+    def _add(self, metric):
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, fn: Callable[[], float] | None = None) -> Counter:
+        counter = self._add(Counter(name, help))
+        if fn is not None:
+            counter._fn = fn
+        return counter
+
+    def gauge(self, name: str, help: str, fn: Callable[[], float] | None = None) -> Gauge:
+        gauge = self._add(Gauge(name, help))
+        if fn is not None:
+            gauge._fn = fn
+        return gauge
+
+    def histogram(self, name: str, help: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.extend(metric.samples())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+class LoopMonitor:
+    """Monotonic heartbeat measuring how late the event loop wakes up."""
+
+    def __init__(self, interval: float = 0.05, stall_threshold: float = 0.1) -> None:
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+
+    async def run(self, stop_event: asyncio.Event) -> None:
+        while not stop_event.is_set():
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - start - self.interval)
+            self.lag = lag
+            if lag > self.max_lag:
+                self.max_lag = lag
+            if lag >= self.stall_threshold:
+                self.stalls += 1
+
+    def export(self, registry: Registry) -> None:
+        registry.gauge("claude_audio_event_loop_lag_seconds", "Latest event loop wake-up delay.",
+                       lambda: self.lag)
+        registry.gauge("claude_audio_event_loop_max_lag_seconds", "Worst event loop wake-up delay.",
+                       lambda: self.max_lag)
+        registry.counter("claude_audio_event_loop_stalls", "Heartbeats late by more than the stall threshold.",
+                         lambda: self.stalls)
+
+
+def rss_bytes() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # Peak rather than current, but better than nothing off Linux.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and KiB elsewhere.
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+REGISTRY = Registry()
+REGISTRY.gauge("claude_audio_process_resident_memory_bytes", "Resident set size.", rss_bytes)
+
+
+async def serve(endpoint: str, registry: Registry = REGISTRY) -> asyncio.AbstractServer:
+    """Serve registry over minimal HTTP on "tcp:HOST:PORT" or "unix:PATH"."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            # Drain the request head; any path returns the metrics.
+            while (await asyncio.wait_for(reader.readline(), timeout=5)).strip():
+                pass
+            body = registry.render().encode("utf-8")
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                + f"Content-Type: {CONTENT_TYPE}\r\n".encode()
+                + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except (OSError, asyncio.TimeoutError):
+            pass
+        finally:
+            writer.close()
+
+    scheme, host, target = parse_endpoint(endpoint)
+    if scheme == "unix":
+        try:
+            os.remove(target)
+        except OSError:
+            pass
+        return await asyncio.start_unix_server(handle, path=target)
+    return await asyncio.start_server(handle, host, target)
+
+
+def parse_endpoint(endpoint: str) -> tuple[str, str, Any]:
+    """("tcp", host, port) or ("unix", "", path); ValueError if malformed."""
+    scheme, _, target = endpoint.partition(":")
+    if scheme == "unix" and target:
+        return scheme, "", target
+    if scheme == "tcp":
+        host, _, port = target.rpartition(":")
+        if not port.isdigit() or int(port) > 65535:
+            raise ValueError(f"expected tcp:HOST:PORT with a port number, got {endpoint!r}")
+        return scheme, host or "127.0.0.1", int(port)
+    raise ValueError(f"expected tcp:HOST:PORT or unix:PATH, got {endpoint!r}")
@@ -0,0 +1,19 @@
+import asyncio
+import sys
+
+from .config import load_env_from_args
+from .ipc import metrics_via_daemon
+from .runtime import socket_path
+
+
+def main() -> None:
+    load_env_from_args(sys.argv[1:])
+    text = asyncio.run(metrics_via_daemon(socket_path()))
+    if text is None:
+        sys.stderr.write("(voice daemon not running)\n")
+        sys.exit(1)
+    sys.stdout.write(text)
+
+
+if __name__ == "__main__":
+    main()
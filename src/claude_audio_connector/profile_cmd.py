@@ -0,0 +1,33 @@
+import argparse
+import asyncio
+import sys
+
+from .config import load_env_from_args
+from .ipc import profile_via_daemon, trace_via_daemon
+from .runtime import socket_path
+
+
+def main() -> None:
+    argv = sys.argv[1:]
+    load_env_from_args(argv)
+    parser = argparse.ArgumentParser(description="Profile or trace the running voice daemon.")
+    parser.add_argument("seconds", nargs="?", type=float, default=10.0, help="sampling profile length")
+    parser.add_argument("--trace", choices=("on", "off"), help="start or stop the pipeline trace instead")
+    parser.add_argument("--config", help="env file (see claude-audio-daemon)")
+    args = parser.parse_args(argv)
+
+    if args.trace:
+        reply = asyncio.run(trace_via_daemon(args.trace == "on", socket_path()))
+    else:
+        sys.stderr.write(f"Profiling voice daemon for {args.seconds:g}s...\n")
+        reply = asyncio.run(profile_via_daemon(args.seconds, socket_path()))
+    if reply is None:
+        print("Voice daemon not running.")
+        sys.exit(1)
+    print(reply)
+    if reply.startswith("ERR"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from .runtime import runtime_path
+
+# Trace lanes: one Chrome-trace row per pipeline stage.
+LANES = {"capture": 1, "stt": 2, "ipc": 3, "tts": 4, "loop": 5}
+MAX_TRACE_EVENTS = 200_000
+# Callbacks shorter than this are not worth a span.
+SLOW_CALLBACK_NS = 1_000_000
+
+
+def _output_path(kind: str, suffix: str) -> Path:
+    return Path(runtime_path(f"{kind}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}{suffix}"))
+
+
+class SamplingProfiler:
+    """Samples every thread's Python stack at a fixed interval.
+
+    Runs on its own thread and only reads sys._current_frames(), so the
+    profiled code is never instrumented; cost is one stack walk per thread
+    per interval while running and nothing otherwise.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.stacks: Counter[tuple[str, ...]] = Counter()
+        self.samples = 0
+
+    def _sample(self, names: dict[int, str], skip: int) -> None:
+        for ident, frame in sys._current_frames().items():
+            if ident == skip:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            self.stacks[tuple(reversed(stack))] += 1
+        self.samples += 1
+
+    def run(self, seconds: float) -> None:
+        """Sample for `seconds` on the calling thread."""
+        me = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        next_at = time.monotonic()
+        while next_at < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            self._sample(names, me)
+            next_at += self.interval
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format; speedscope and flamegraph.pl read it."""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def speedscope(self, name: str = "claude-audio") -> dict:
+        frames: dict[str, int] = {}
+        by_thread: dict[str, tuple[list[list[int]], list[float]]] = {}
+        for stack, count in self.stacks.items():
+            thread, calls = stack[0], stack[1:]
+            samples, weights = by_thread.setdefault(thread, ([], []))
+            samples.append([frames.setdefault(call, len(frames)) for call in calls])
+            weights.append(count * self.interval)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "shared": {"frames": [{"name": f} for f in frames]},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": thread,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+                for thread, (samples, weights) in by_thread.items()
+            ],
+        }
+
+    def write(self) -> tuple[Path, Path]:
+        scope = _output_path("profile", ".speedscope.json")
+        folded = scope.with_name(scope.name.replace(".speedscope.json", ".folded"))
+        scope.write_text(json.dumps(self.speedscope()))
+        folded.write_text(self.collapsed())
+        return scope, folded
+
+
+async def profile(seconds: float, interval: float = 0.005) -> tuple[Path, Path]:
+    """Profile the whole process for `seconds` and write speedscope + folded files."""
+    profiler = SamplingProfiler(interval)
+    loop = asyncio.get_running_loop()
+    thread_done = loop.create_future()
+
+    def work() -> None:
+        try:
+            profiler.run(seconds)
+            loop.call_soon_threadsafe(thread_done.set_result, None)
+        except BaseException as exc:
+            loop.call_soon_threadsafe(thread_done.set_exception, exc)
+
+    # A dedicated thread rather than the default executor, so the profile
+    # does not take a slot TTS needs.
+    threading.Thread(target=work, name="profiler", daemon=True).start()
+    await thread_done
+    return await loop.run_in_executor(None, profiler.write)
+
+
+class Tracer:
+    """Chrome-trace spans for the voice pipeline, recorded only while on.
+
+    Call sites check `TRACER.on` before doing any work, so a disabled
+    tracer costs one attribute read. While on, every event-loop callback
+    slower than SLOW_CALLBACK_NS is recorded on the "loop" lane too.
+    """
+
+    def __init__(self) -> None:
+        self.on = False
+        self._events: list[dict] = []
+        self._started_ns = 0
+        self._lock = threading.Lock()
+        self._orig_run = None
+        self.dropped = 0
+
+    def start(self) -> None:
+        with self._lock:
+            if self.on:
+                return
+            self._events = []
+            self.dropped = 0
+            self._started_ns = time.perf_counter_ns()
+            self.on = True
+        self._hook_loop()
+
+    def stop(self) -> Path | None:
+        with self._lock:
+            if not self.on:
+                return None
+            self.on = False
+            events, self._events = self._events, []
+        self._unhook_loop()
+        meta = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": lane}}
+            for lane, tid in LANES.items()
+        ]
+        path = _output_path("trace", ".json")
+        path.write_text(json.dumps({
+            "traceEvents": meta + events,
+            "displayTimeUnit": "ms",
+            "otherData": {"dropped": self.dropped},
+        }))
+        return path
+
+    def _add(self, event: dict) -> None:
+        with self._lock:
+            if not self.on:
+                return
+            if len(self._events) >= MAX_TRACE_EVENTS:
+                self.dropped += 1
+                return
+            self._events.append(event)
+
+    def span(self, lane: str, name: str, start_ns: int, end_ns: int | None = None, **args) -> None:
+        """Record a completed span; times are time.perf_counter_ns() values."""
+        end_ns = time.perf_counter_ns() if end_ns is None else end_ns
+        self._add({
+            "name": name, "cat": lane, "ph": "X", "pid": os.getpid(), "tid": LANES[lane],
+            "ts": (start_ns - self._started_ns) / 1000, "dur": (end_ns - start_ns) / 1000,
+            "args": args,
+        })
+
+    def instant(self, lane: str, name: str, **args) -> None:
+        self._add({
+            "name": name, "cat": lane, "ph": "i", "s": "t", "pid": os.getpid(), "tid": LANES[lane],
+            "ts": (time.perf_counter_ns() - self._started_ns) / 1000, "args": args,
+        })
+
+    def _hook_loop(self) -> None:
+        # Wrap Handle._run only while tracing; restoring it leaves no trace.
+        handle_cls = asyncio.events.Handle
+        orig = handle_cls._run
+        self._orig_run = orig
+        tracer = self
+
+        def _run(handle) -> None:
+            # Read before running: a handle cancelled by its own callback drops it.
+            callback = handle._callback
+            start = time.perf_counter_ns()
+            orig(handle)
+            end = time.perf_counter_ns()
+            if end - start >= SLOW_CALLBACK_NS:
+                tracer.span("loop", _callback_name(callback), start, end)
+
+        handle_cls._run = _run
+
+    def _unhook_loop(self) -> None:
+        if self._orig_run is not None:
+            asyncio.events.Handle._run = self._orig_run
+            self._orig_run = None
+
+
+def _callback_name(callback) -> str:
+    task = getattr(callback, "__self__", None)
+    if isinstance(task, asyncio.Task):
+        coro = task.get_coro()
+        return getattr(coro, "__qualname__", None) or task.get_name()
+    return getattr(callback, "__qualname__", None) or repr(callback)
+
+
+TRACER = Tracer()
@@ -0,0 +1,21 @@
+import asyncio
+import sys
+
+from .config import load_env_from_args
+from .ipc import reload_via_daemon
+from .runtime import socket_path
+
+
+def main() -> None:
+    load_env_from_args(sys.argv[1:])
+    reply = asyncio.run(reload_via_daemon(socket_path()))
+    if reply is None:
+        print("Voice daemon not running.")
+        sys.exit(1)
+    print(reply)
+    if reply.startswith("ERR"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
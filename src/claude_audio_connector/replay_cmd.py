@@ -0,0 +1,88 @@
+import argparse
+import json
+import sys
+import wave
+from collections import deque
+from pathlib import Path
+
+from .journal import EVENT, PCM, TRANSCRIPT, read_segment, segments
+
+# Audio kept before START_SPEECH; server VAD fires after speech has begun.
+PREROLL_NS = 500_000_000
+# Upper bound on audio kept while nobody is speaking.
+MAX_PENDING_NS = 30_000_000_000
+
+
+def iter_utterances(directory: str, preroll_ns: int = PREROLL_NS):
+    """Yield (sample_rate, pcm, transcript, events) for each journaled utterance.
+
+    State carries across segments, so an utterance cut by a rollover is
+    still whole; it only resets where the sample rate changes.
+    """
+    pcm: deque[tuple[int, bytes]] = deque()
+    events: list[tuple[int, str]] = []
+    speech_ns: int | None = None
+    current_rate: int | None = None
+    for path in segments(directory):
+        sample_rate, records = read_segment(path)
+        if sample_rate != current_rate:
+            pcm.clear()
+            events = []
+            speech_ns = None
+            current_rate = sample_rate
+        for kind, ts_ns, payload in records:
+            if kind == PCM:
+                pcm.append((ts_ns, payload))
+                if speech_ns is None:
+                    while pcm and pcm[0][0] < ts_ns - MAX_PENDING_NS:
+                        pcm.popleft()
+            elif kind == EVENT:
+                signal = payload.decode("utf-8", errors="replace")
+                events.append((ts_ns, signal))
+                if signal == "START_SPEECH" and speech_ns is None:
+                    speech_ns = ts_ns
+            elif kind == TRANSCRIPT:
+                start = (speech_ns if speech_ns is not None else ts_ns - MAX_PENDING_NS) - preroll_ns
+                audio = b"".join(chunk for t, chunk in pcm if t >= start)
+                text = payload.decode("utf-8", errors="replace")
+                if audio:
+                    yield sample_rate, audio, text, events
+                pcm = deque((t, chunk) for t, chunk in pcm if t >= ts_ns - preroll_ns)
+                events = []
+                speech_ns = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Turn a daemon journal into a benchmark corpus.")
+    parser.add_argument("journal", help="journal directory (CLAUDE_AUDIO_JOURNAL)")
+    parser.add_argument("out", help="output directory for WAV files and manifest.jsonl")
+    parser.add_argument("--preroll-ms", type=int, default=PREROLL_NS // 1_000_000)
+    parser.add_argument("--include-empty", action="store_true", help="keep <nospeech>/empty results")
+    args = parser.parse_args()
+
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with open(out / "manifest.jsonl", "w") as manifest:
+        for sample_rate, audio, text, events in iter_utterances(args.journal, args.preroll_ms * 1_000_000):
+            if not args.include_empty and (not text or text == "<nospeech>"):
+                continue
+            count += 1
+            name = f"{count:05d}.wav"
+            with wave.open(str(out / name), "wb") as wf:
+                wf.setnchannels(1)
+                wf.setsampwidth(2)
+                wf.setframerate(sample_rate)
+                wf.writeframes(audio)
+            manifest.write(json.dumps({
+                "audio": name,
+                "text": text,
+                "duration": len(audio) / 2 / sample_rate,
+                "events": [{"t_ns": t, "signal": s} for t, s in events],
+            }) + "\n")
+
+    sys.stderr.write(f"wrote {count} utterances to {out}\n")
+
+
+if __name__ == "__main__":
+    main()
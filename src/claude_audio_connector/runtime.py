@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import subprocess
 from pathlib import Path
 
 
@@ -18,3 +19,51 @@ def runtime_path(suffix: str) -> str:
 
 def socket_path() -> str:
     return os.getenv("CLAUDE_AUDIO_SOCKET") or runtime_path("sock")
+
+
+def _is_claude(args: str) -> bool:
+    argv = args.split()[:2]
+    return any(os.path.basename(a) == "claude" for a in argv) or "/claude-code/" in args
+
+
+def claude_pid() -> int | None:
+    """PID of the Claude Code process this command runs under, if any."""
+    try:
+        out = subprocess.run(
+            ["ps", "-A", "-o", "pid=,ppid=,args="], capture_output=True, text=True, check=False,
+        ).stdout
+    except OSError:
+        return None
+    procs: dict[int, tuple[int, str]] = {}
+    for line in out.splitlines():
+        parts = line.split(None, 2)
+        if len(parts) >= 2 and parts[0].isdigit() and parts[1].isdigit():
+            procs[int(parts[0])] = (int(parts[1]), parts[2] if len(parts) > 2 else "")
+    pid = os.getppid()
+    while pid > 1 and pid in procs:
+        ppid, args = procs[pid]
+        if _is_claude(args):
+            return pid
+        pid = ppid
+    return None
+
+
+def session_name() -> str:
+    """The project directory plus the owning Claude PID: "api@4242".
+
+    start, wait and stop all run under the same Claude process, so they
+    agree on the name, while two sessions in one project (or in two
+    same-named directories) do not collide. Outside Claude it is just the
+    directory name.
+    """
+    name = os.getenv("CLAUDE_AUDIO_SESSION")
+    if name:
+        return name
+    base = Path.cwd().name or "default"
+    pid = claude_pid()
+    return f"{base}@{pid}" if pid is not None else base
+
+
+def session_label(name: str) -> str:
+    """The part of a session name people say: "api@4242" -> "api"."""
+    return name.partition("@")[0]
@@ -0,0 +1,388 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from array import array
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import AsyncIterator, Callable
+
+from .metrics import rss_bytes
+
+STATUS_OK = SimpleNamespace(input_overflow=False, input_underflow=False)
+
+
+class SyntheticMic:
+    """Calls the capture callback like PortAudio, speedup times faster than real time."""
+
+    def __init__(self, callback: Callable, sample_rate: int, blocksize: int, speedup: float,
+                 speech_sec: float = 2.0, silence_sec: float = 1.5) -> None:
+        self._callback = callback
+        self._sample_rate = sample_rate
+        self._blocksize = blocksize
+        self._speedup = speedup
+        self._speech_blocks = int(speech_sec * sample_rate / blocksize)
+        self._cycle = self._speech_blocks + int(silence_sec * sample_rate / blocksize)
+        self._loud = array("h", [3000 if i % 2 else -3000 for i in range(blocksize)]).tobytes()
+        self._quiet = bytes(blocksize * 2)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.frames = 0
+
+    @property
+    def seconds(self) -> float:
+        return self.frames / self._sample_rate
+
+    def open(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="soak-mic", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        block_sec = self._blocksize / self._sample_rate / self._speedup
+        # Sleep per batch of blocks; per-block sleeps are too short to be accurate.
+        batch = max(1, math.ceil(0.005 / block_sec))
+        n = 0
+        start = time.monotonic()
+        while not self._stop.is_set():
+            for _ in range(batch):
+                data = self._loud if n % self._cycle < self._speech_blocks else self._quiet
+                self._callback(data, self._blocksize, None, STATUS_OK)
+                self.frames += self._blocksize
+                n += 1
+            delay = start + n * block_sec - time.monotonic()
+            if delay > 0:
+                self._stop.wait(delay)
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def needs_migration(self) -> bool:
+        return False
+
+    def devices_changed(self) -> bool:
+        return False
+
+    def migrate(self) -> None:
+        pass
+
+
+class _ScriptedSession:
+    def __init__(self, engine: "ScriptedEngine") -> None:
+        self._engine = engine
+        self._events: asyncio.Queue = asyncio.Queue()
+        self._speaking = False
+        self._quiet_bytes = 0
+
+    async def send(self, pcm: bytes) -> None:
+        from .stt_engine import END_SPEECH, START_SPEECH, TRANSCRIPT, SttEvent
+
+        engine = self._engine
+        loud = any(pcm[i] for i in range(0, len(pcm), 64))
+        if loud:
+            self._quiet_bytes = 0
+            if not self._speaking:
+                self._speaking = True
+                self._events.put_nowait(SttEvent(START_SPEECH))
+            return
+        self._quiet_bytes += len(pcm)
+        if self._speaking and self._quiet_bytes >= engine.end_bytes:
+            self._speaking = False
+            engine.utterances += 1
+            self._events.put_nowait(SttEvent(END_SPEECH))
+            self._events.put_nowait(SttEvent(TRANSCRIPT, f"hey claude soak utterance {engine.utterances}"))
+            if engine.drop_every and engine.utterances % engine.drop_every == 0:
+                raise ConnectionError("scripted drop")
+
+    async def __aiter__(self) -> AsyncIterator:
+        while True:
+            yield await self._events.get()
+
+
+class ScriptedEngine:
+    """STT stand-in: any non-silent audio is speech, 300 ms of silence ends it."""
+
+    name = "scripted"
+
+    def __init__(self, sample_rate: int, drop_every: int = 25) -> None:
+        self.end_bytes = int(0.3 * sample_rate) * 2
+        self.drop_every = drop_every
+        self.utterances = 0
+        self.sessions = 0
+
+    @asynccontextmanager
+    async def connect(self, cfg) -> AsyncIterator[_ScriptedSession]:
+        self.sessions += 1
+        yield _ScriptedSession(self)
+
+    async def probe(self, cfg) -> bool:
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+def fake_speak(clauses, cfg, on_first_audio=None) -> None:
+    start = time.monotonic()
+    first = True
+    for _ in clauses:
+        time.sleep(0.002)
+        if first and on_first_audio is not None:
+            on_first_audio(time.monotonic() - start)
+        first = False
+
+
+async def _clients(sock: str, stop: asyncio.Event) -> dict[str, int]:
+    """IPC traffic: waits (some abandoned or replaced), speaks, registrations."""
+    from .ipc import request_daemon, speak_stream_via_daemon, speak_via_daemon, wait_for_message
+
+    counts = {"delivered": 0, "spoken": 0, "abandoned": 0}
+    names = [f"soak-{i}" for i in range(4)]
+
+    async def waiter(name: str) -> None:
+        while not stop.is_set():
+            msg = await wait_for_message(sock, name)
+            if msg:
+                counts["delivered"] += 1
+            else:
+                await asyncio.sleep(0.05)
+
+    async def churn() -> None:
+        n = 0
+        while not stop.is_set():
+            n += 1
+            await request_daemon(f"REGISTER churn-{n % 200}", sock)
+            if n % 3 == 0:
+                await request_daemon(f"UNREGISTER churn-{(n - 1) % 200}", sock)
+            if n % 5 == 0:
+                # WAIT then hang up without reading: the server must notice.
+                try:
+                    _, writer = await asyncio.open_unix_connection(sock)
+                    writer.write(f"WAIT ghost-{n % 7}\n".encode())
+                    await writer.drain()
+                    await asyncio.sleep(0.01)
+                    writer.close()
+                    await writer.wait_closed()
+                    counts["abandoned"] += 1
+                except OSError:
+                    pass
+            if n % 4 == 0:
+                await speak_via_daemon("Soak test says hello.", sock)
+                counts["spoken"] += 1
+
+            async def text() -> AsyncIterator[str]:
+                yield "First clause, "
+                yield "then the second. And a third"
+
+            if n % 6 == 0:
+                await speak_stream_via_daemon(text(), sock)
+                counts["spoken"] += 1
+            await request_daemon("METRICS", sock)
+            await asyncio.sleep(0.02)
+
+    tasks = [asyncio.create_task(waiter(n)) for n in names] + [asyncio.create_task(churn())]
+    await stop.wait()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return counts
+
+
+def _open_fds() -> int:
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return -1
+
+
+def slope(xs: list[float], ys: list[float]) -> float:
+    """Least-squares slope of ys over xs."""
+    n = len(xs)
+    if n < 2:
+        return 0.0
+    mx, my = sum(xs) / n, sum(ys) / n
+    var = sum((x - mx) ** 2 for x in xs)
+    if var == 0:
+        return 0.0
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / var
+
+
+@dataclass
+class SoakResult:
+    simulated_hours: float
+    wall_sec: float
+    samples: list[dict] = field(default_factory=list)
+    rss_slope_mb_per_hour: float = 0.0
+    traced_slope_mb_per_hour: float = 0.0
+    fd_growth: int = 0
+    task_growth: int = 0
+    top_allocators: list[str] = field(default_factory=list)
+    clients: dict[str, int] = field(default_factory=dict)
+    failures: list[str] = field(default_factory=list)
+
+
+async def soak(
+    hours: float,
+    speedup: float,
+    runtime_dir: str,
+    max_slope_mb: float = 5.0,
+    sample_sec: float = 1.0,
+    warmup: float = 0.2,
+    drop_every: int = 25,
+    on_sample: Callable[[dict], None] | None = None,
+) -> SoakResult:
+    """Run the real daemon for `hours` of simulated audio against stand-ins.
+
+    A synthetic mic, a scripted STT engine that drops its session every
+    drop_every utterances, a sleeping TTS and a set of IPC clients (waits,
+    abandoned waits, speaks, registration churn) keep every path busy while
+    RSS, FDs, tasks and tracemalloc usage are sampled. Growth is measured
+    after the warmup fraction of the run.
+
+    The daemon runs on schema defaults with its socket, PID and status files
+    in runtime_dir, so it never touches a real daemon or the user's config.
+    """
+    from . import daemon
+    from .config import default_config
+    from .stt_engine import EngineSelector
+
+    cfg = default_config(os.path.join(runtime_dir, "soak.sock"))
+    engine = ScriptedEngine(cfg.stt_sample_rate, drop_every)
+    mic: SyntheticMic | None = None
+
+    def make_mic(callback: Callable) -> SyntheticMic:
+        nonlocal mic
+        mic = SyntheticMic(callback, cfg.stt_sample_rate, cfg.audio_blocksize, speedup)
+        return mic
+
+    # Batch as often, in simulated time, as the real daemon would.
+    cfg = dataclasses.replace(cfg, stt_batch_interval=cfg.stt_batch_interval / speedup)
+    stop = asyncio.Event()
+    clients_stop = asyncio.Event()
+    runner = asyncio.create_task(daemon.run_daemon(
+        cfg, stop_event=stop, engines=EngineSelector(engine), mic_factory=make_mic, speak=fake_speak,
+        pid_path=os.path.join(runtime_dir, "soak.pid"), status_path=os.path.join(runtime_dir, "soak.status"),
+    ))
+    while not os.path.exists(cfg.socket_path):
+        if runner.done():
+            runner.result()
+        await asyncio.sleep(0.01)
+    clients = asyncio.create_task(_clients(cfg.socket_path, clients_stop))
+
+    tracemalloc.start(10)
+    result = SoakResult(simulated_hours=hours, wall_sec=0.0)
+    started = time.monotonic()
+    baseline = None
+    try:
+        while mic is None or mic.seconds < hours * 3600:
+            await asyncio.sleep(sample_sec)
+            if runner.done():
+                runner.result()
+            sim_hours = (mic.seconds if mic else 0.0) / 3600
+            traced, _ = tracemalloc.get_traced_memory()
+            sample = {
+                "sim_hours": round(sim_hours, 4),
+                "wall_sec": round(time.monotonic() - started, 1),
+                "rss_mb": round(rss_bytes() / 2**20, 2),
+                "traced_mb": round(traced / 2**20, 3),
+                "fds": _open_fds(),
+                "tasks": len(asyncio.all_tasks()),
+                "utterances": engine.utterances,
+                "sessions": engine.sessions,
+            }
+            result.samples.append(sample)
+            if on_sample is not None:
+                on_sample(sample)
+            if baseline is None and sim_hours >= hours * warmup:
+                baseline = (sample, tracemalloc.take_snapshot())
+    finally:
+        clients_stop.set()
+        result.clients = await clients
+        stop.set()
+        await runner
+        if baseline is not None:
+            end = tracemalloc.take_snapshot()
+            result.top_allocators = [str(s) for s in end.compare_to(baseline[1], "lineno")[:10]]
+        tracemalloc.stop()
+
+    result.wall_sec = round(time.monotonic() - started, 1)
+    steady = [s for s in result.samples if baseline is not None and s["sim_hours"] >= baseline[0]["sim_hours"]]
+    if len(steady) >= 2:
+        xs = [s["sim_hours"] for s in steady]
+        result.rss_slope_mb_per_hour = round(slope(xs, [s["rss_mb"] for s in steady]), 3)
+        result.traced_slope_mb_per_hour = round(slope(xs, [s["traced_mb"] for s in steady]), 3)
+        result.fd_growth = steady[-1]["fds"] - steady[0]["fds"]
+        result.task_growth = steady[-1]["tasks"] - steady[0]["tasks"]
+    else:
+        result.failures.append("too few samples after warmup; lengthen the run or sample more often")
+    for name, value in (("rss", result.rss_slope_mb_per_hour), ("traced", result.traced_slope_mb_per_hour)):
+        if value > max_slope_mb:
+            result.failures.append(f"{name} memory grows {value} MB/hour (limit {max_slope_mb})")
+    # A handful of in-flight client connections is noise; steady growth is not.
+    if result.fd_growth > 8:
+        result.failures.append(f"open FDs grew by {result.fd_growth}")
+    if result.task_growth > 8:
+        result.failures.append(f"asyncio tasks grew by {result.task_growth}")
+    if engine.utterances == 0:
+        result.failures.append("no utterances were transcribed")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Soak-test the daemon against local stand-ins.")
+    parser.add_argument("--hours", type=float, default=4.0, help="simulated audio hours")
+    parser.add_argument("--speedup", type=float, default=60.0, help="simulated seconds per wall second")
+    parser.add_argument("--max-slope-mb", type=float, default=5.0, help="allowed MB growth per simulated hour")
+    parser.add_argument("--sample-sec", type=float, default=1.0, help="wall seconds between samples")
+    parser.add_argument("--drop-every", type=int, default=25, help="drop the STT session every N utterances")
+    parser.add_argument("--json", action="store_true", help="print samples and result as JSON lines")
+    args = parser.parse_args()
+
+    def show(sample: dict) -> None:
+        if args.json:
+            print(json.dumps(sample), flush=True)
+        else:
+            sys.stderr.write(
+                f"  {sample['sim_hours']:7.3f}h  rss={sample['rss_mb']:7.1f}MB  "
+                f"traced={sample['traced_mb']:7.2f}MB  fds={sample['fds']}  tasks={sample['tasks']}\n"
+            )
+
+    with tempfile.TemporaryDirectory(prefix="claude-audio-soak-") as tmp:
+        result = asyncio.run(soak(
+            args.hours, args.speedup, tmp, args.max_slope_mb, args.sample_sec,
+            drop_every=args.drop_every, on_sample=show,
+        ))
+
+    summary = {k: v for k, v in vars(result).items() if k != "samples"}
+    if args.json:
+        print(json.dumps({"result": summary}))
+    else:
+        for line in result.top_allocators:
+            sys.stderr.write(f"  {line}\n")
+        sys.stderr.write(
+            f"{result.simulated_hours}h simulated in {result.wall_sec}s: "
+            f"rss {result.rss_slope_mb_per_hour} MB/h, traced {result.traced_slope_mb_per_hour} MB/h, "
+            f"fds {result.fd_growth:+d}, tasks {result.task_growth:+d}, clients {result.clients}\n"
+        )
+    for failure in result.failures:
+        sys.stderr.write(f"FAIL: {failure}\n")
+    if result.failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
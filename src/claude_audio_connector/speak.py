@@ -1,50 +1,87 @@
 import asyncio
+import codecs
+import os
 import sys
+from typing import AsyncIterator, Iterable, Iterator
 
 from .config import load_env_from_args
-from .ipc import speak_via_daemon
+from .ipc import speak_stream_via_daemon, speak_via_daemon
 from .runtime import socket_path
 
+READ_SIZE = 4096
 
-def _play_direct(text: str) -> None:
+
+def _play_direct(clauses: Iterable[str]) -> None:
     import warnings
     warnings.filterwarnings("ignore", category=DeprecationWarning)
 
-    import sounddevice as sd
-    from cartesia import Cartesia
-
     from .config import load_config
+    from .tts import speak_clauses
 
-    cfg = load_config()
-    if not cfg.cartesia_api_key:
-        return
+    speak_clauses(clauses, load_config())
+
+
+def _text_args(argv: list[str]) -> list[str]:
+    words = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg == "--config":
+            skip = True
+        elif arg != "--no-stream":
+            words.append(arg)
+    return words
 
-    speed_map = {"slowest": -1.0, "slow": -0.5, "normal": 0.0, "fast": 0.25, "fastest": 0.5}
-    client = Cartesia(api_key=cfg.cartesia_api_key)
 
-    with sd.RawOutputStream(samplerate=cfg.tts_sample_rate, channels=1, dtype="int16") as stream:
-        for chunk in client.tts.bytes(
-            model_id="sonic-2",
-            transcript=text,
-            voice={"mode": "id", "id": cfg.cartesia_voice_id},
-            output_format={"container": "raw", "encoding": "pcm_s16le", "sample_rate": cfg.tts_sample_rate},
-            speed=speed_map.get(cfg.tts_speed, 0.25),
-            language="en",
-        ):
-            stream.write(chunk)
+def _stdin_chunks() -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    fd = sys.stdin.fileno()
+    while True:
+        data = os.read(fd, READ_SIZE)
+        text = decoder.decode(data, final=not data)
+        if text:
+            yield text
+        if not data:
+            return
+
+
+async def _stdin_chunks_async() -> AsyncIterator[str]:
+    # os.read returns as soon as the writer flushes, unlike sys.stdin.read().
+    loop = asyncio.get_running_loop()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    fd = sys.stdin.fileno()
+    while True:
+        data = await loop.run_in_executor(None, os.read, fd, READ_SIZE)
+        text = decoder.decode(data, final=not data)
+        if text:
+            yield text
+        if not data:
+            return
 
 
 def main() -> None:
-    load_env_from_args(sys.argv[1:])
-    text = " ".join(sys.argv[1:]).strip()
-    if not text:
+    argv = sys.argv[1:]
+    load_env_from_args(argv)
+    text = " ".join(_text_args(argv)).strip()
+
+    if not text and "--no-stream" in argv:
         text = sys.stdin.read().strip()
-    if not text:
+        if not text:
+            return
+
+    if text:
+        sent = asyncio.run(speak_via_daemon(text, socket_path()))
+        if not sent:
+            _play_direct([text])
         return
 
-    sent = asyncio.run(speak_via_daemon(text, socket_path()))
+    # Stream stdin so synthesis starts at the first clause, not at EOF.
+    sent = asyncio.run(speak_stream_via_daemon(_stdin_chunks_async(), socket_path()))
     if not sent:
-        _play_direct(text)
+        from .tts import iter_clauses
+
+        _play_direct(iter_clauses(_stdin_chunks()))
 
 
 if __name__ == "__main__":
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import signal
 import subprocess
@@ -5,7 +6,8 @@ import sys
 import time
 
 from .config import load_env_from_args
-from .runtime import runtime_path, socket_path
+from .ipc import request_daemon
+from .runtime import runtime_path, session_name, socket_path
 
 PID_PATH = runtime_path("pid")
 STATUS_PATH = runtime_path("status")
@@ -29,8 +31,20 @@ def _kill_all_daemons() -> None:
             pass
 
 
+def _request(command: str) -> str | None:
+    return asyncio.run(request_daemon(command, socket_path(), timeout=2))
+
+
 def main() -> None:
     load_env_from_args(sys.argv[1:])
+    session = session_name()
+
+    # One daemon serves every session; join it instead of restarting it.
+    if "--restart" not in sys.argv[1:] and _request("PING") == "PONG":
+        _request(f"REGISTER {session}")
+        print(f"Voice mode on ({session}).")
+        return
+
     _kill_all_daemons()
     time.sleep(0.3)
 
@@ -49,7 +63,8 @@ def main() -> None:
 
     for _ in range(30):
         if os.path.exists(PID_PATH):
-            print("Voice mode on.")
+            _request(f"REGISTER {session}")
+            print(f"Voice mode on ({session}).")
             return
         time.sleep(0.2)
 
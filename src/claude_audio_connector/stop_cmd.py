@@ -1,9 +1,12 @@
+import asyncio
 import os
 import signal
 import subprocess
+import sys
 import time
 
-from .runtime import runtime_path, socket_path
+from .ipc import request_daemon
+from .runtime import runtime_path, session_name, socket_path
 
 FILES = (
     runtime_path("pid"),
@@ -34,6 +37,17 @@ def _kill_all(sig: int = signal.SIGTERM) -> list[int]:
 
 
 def main() -> None:
+    if "--all" not in sys.argv[1:]:
+        session = session_name()
+        reply = asyncio.run(request_daemon(f"UNREGISTER {session}", socket_path(), timeout=2))
+        # Leave the daemon running while other live sessions still use it;
+        # the daemon has already expired ones that went away without stop.
+        parts = (reply or "").split(" ", 2)
+        if len(parts) == 3 and parts[0] == "OK" and parts[1].isdigit() and int(parts[1]) > 0:
+            print(f"Voice mode off ({session}); still listening for: {parts[2]}.")
+            print("Run claude-audio-stop --all to shut the daemon down anyway.")
+            return
+
     pids = _kill_all(signal.SIGTERM)
     if pids:
         time.sleep(0.5)
@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import io
+import json
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncContextManager, AsyncIterator, Protocol
+
+START_SPEECH = "START_SPEECH"
+END_SPEECH = "END_SPEECH"
+TRANSCRIPT = "TRANSCRIPT"
+
+# A session must deliver an event or stay up this long before its engine's
+# failure streak is forgiven; on a flaky network the handshake alone keeps
+# succeeding while sessions drop seconds later.
+HEALTHY_AFTER_SEC = 30.0
+
+
+@dataclass(frozen=True)
+class SttEvent:
+    """kind is START_SPEECH, END_SPEECH (the engine's VAD) or TRANSCRIPT."""
+
+    kind: str
+    text: str = ""
+
+
+class SttSession(Protocol):
+    async def send(self, pcm: bytes) -> None: ...
+
+    def __aiter__(self) -> AsyncIterator[SttEvent]: ...
+
+
+class SttEngine(Protocol):
+    name: str
+
+    def connect(self, cfg) -> AsyncContextManager[SttSession]: ...
+
+    async def probe(self, cfg) -> bool: ...
+
+    def close(self) -> None: ...
+
+
+def pcm_to_wav_b64(pcm: bytes, sample_rate: int) -> str:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(pcm)
+    return base64.b64encode(buf.getvalue()).decode()
+
+
+class _SarvamSession:
+    def __init__(self, ws, sample_rate: int) -> None:
+        self._ws = ws
+        self._sample_rate = sample_rate
+
+    async def send(self, pcm: bytes) -> None:
+        await self._ws.transcribe(
+            audio=pcm_to_wav_b64(pcm, self._sample_rate),
+            encoding="audio/wav",
+            sample_rate=self._sample_rate,
+        )
+
+    async def __aiter__(self) -> AsyncIterator[SttEvent]:
+        async for msg in self._ws:
+            msg_type = str(getattr(msg, "type", ""))
+            data = getattr(msg, "data", None)
+            if msg_type == "events":
+                sig = getattr(data, "signal_type", "") if data else ""
+                if sig:
+                    yield SttEvent(sig)
+            elif msg_type == "data":
+                yield SttEvent(TRANSCRIPT, (getattr(data, "transcript", "") or "").strip())
+
+
+class SarvamEngine:
+    """Sarvam streaming STT over one websocket per connection."""
+
+    name = "sarvam"
+
+    def __init__(self, api_key: str, probe_timeout: float = 5.0) -> None:
+        from sarvamai import AsyncSarvamAI
+
+        self._client = AsyncSarvamAI(api_subscription_key=api_key)
+        self._probe_timeout = probe_timeout
+
+    def _open(self, cfg):
+        return self._client.speech_to_text_streaming.connect(
+            model=cfg.stt_model,
+            mode="transcribe",
+            language_code=cfg.stt_language,
+            high_vad_sensitivity=str(cfg.stt_high_vad).lower(),
+            vad_signals="true",
+        )
+
+    @asynccontextmanager
+    async def connect(self, cfg) -> AsyncIterator[SttSession]:
+        async with self._open(cfg) as ws:
+            yield _SarvamSession(ws, cfg.stt_sample_rate)
+
+    async def probe(self, cfg) -> bool:
+        async def handshake() -> None:
+            async with self._open(cfg):
+                pass
+
+        try:
+            await asyncio.wait_for(handshake(), self._probe_timeout)
+        except Exception:
+            return False
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+class _LocalSession:
+    def __init__(self, recognizer, executor: ThreadPoolExecutor) -> None:
+        self._rec = recognizer
+        self._executor = executor
+        self._events: asyncio.Queue[SttEvent] = asyncio.Queue()
+        self._speaking = False
+
+    def _accept(self, pcm: bytes) -> list[SttEvent]:
+        # Runs on the engine thread; the recognizer is not thread-safe.
+        if self._rec.AcceptWaveform(pcm):
+            text = json.loads(self._rec.Result()).get("text", "").strip()
+            # A short word can be finalised in the block that started it, with
+            # no partial in between; still report a complete utterance.
+            out = []
+            if text and not self._speaking:
+                out.append(SttEvent(START_SPEECH))
+            if text or self._speaking:
+                out += [SttEvent(END_SPEECH), SttEvent(TRANSCRIPT, text)]
+            self._speaking = False
+            return out
+        if not self._speaking and json.loads(self._rec.PartialResult()).get("partial"):
+            self._speaking = True
+            return [SttEvent(START_SPEECH)]
+        return []
+
+    async def send(self, pcm: bytes) -> None:
+        loop = asyncio.get_running_loop()
+        for event in await loop.run_in_executor(self._executor, self._accept, pcm):
+            self._events.put_nowait(event)
+
+    async def __aiter__(self) -> AsyncIterator[SttEvent]:
+        while True:
+            yield await self._events.get()
+
+
+class LocalEngine:
+    """CPU-only offline recognizer (Vosk), loaded on first use.
+
+    Decoding runs on one dedicated thread so the event loop only ever waits
+    on a future. The model stays loaded for the life of the daemon, so
+    failing over again later costs nothing.
+    """
+
+    name = "local"
+
+    def __init__(self, model_path: str) -> None:
+        self._model_path = model_path
+        self._model = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="local-stt")
+
+    def _load(self):
+        with self._lock:
+            if self._model is None:
+                try:
+                    from vosk import Model, SetLogLevel
+                except ImportError:
+                    raise RuntimeError("local STT needs the optional 'vosk' package") from None
+                SetLogLevel(-1)
+                self._model = Model(self._model_path)
+            return self._model
+
+    @asynccontextmanager
+    async def connect(self, cfg) -> AsyncIterator[SttSession]:
+        loop = asyncio.get_running_loop()
+        model = await loop.run_in_executor(self._executor, self._load)
+        from vosk import KaldiRecognizer
+
+        yield _LocalSession(KaldiRecognizer(model, cfg.stt_sample_rate), self._executor)
+
+    async def probe(self, cfg) -> bool:
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._load)
+        except Exception:
+            return False
+        return True
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+class EngineSelector:
+    """Picks the engine to connect with; fails over and back.
+
+    After `fail_after` consecutive failed sessions on the current engine it
+    switches to the other one. A session that connected but failed before
+    delivering an event or lasting `healthy_after` seconds still counts as
+    failed. While on the fallback, watch() probes the primary and asks for
+    a reconnect once it answers again.
+    """
+
+    def __init__(
+        self,
+        primary: SttEngine,
+        fallback: SttEngine | None = None,
+        fail_after: int = 3,
+        healthy_after: float = HEALTHY_AFTER_SEC,
+    ) -> None:
+        self.primary = primary
+        self.fallback = fallback
+        self.current = primary
+        self.fail_after = fail_after
+        self.healthy_after = healthy_after
+        self.failures = 0
+        self.failovers = 0
+        self._connected_at: float | None = None
+
+    @property
+    def degraded(self) -> bool:
+        return self.current is not self.primary
+
+    def connected(self) -> None:
+        """A session opened; see healthy() for what clears failures."""
+        self._connected_at = time.monotonic()
+
+    def healthy(self) -> None:
+        """The current session delivered an event."""
+        self.failures = 0
+
+    def failed(self) -> bool:
+        """Record a failed session; True if this switched engines."""
+        up_since, self._connected_at = self._connected_at, None
+        if up_since is not None and time.monotonic() - up_since >= self.healthy_after:
+            self.failures = 0
+        self.failures += 1
+        if self.fallback is None or self.failures < self.fail_after:
+            return False
+        self.current = self.fallback if self.current is self.primary else self.primary
+        self.failures = 0
+        self.failovers += 1
+        return True
+
+    async def watch(self, live, stop_event: asyncio.Event) -> None:
+        while not stop_event.is_set():
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=live.cfg.stt_health_interval)
+            except asyncio.TimeoutError:
+                pass
+            if stop_event.is_set() or not self.degraded:
+                continue
+            if await self.primary.probe(live.cfg):
+                self.current = self.primary
+                self.failures = 0
+                live.reconnect.set()
+
+    def close(self) -> None:
+        self.primary.close()
+        if self.fallback is not None:
+            self.fallback.close()
+
+
+def build_selector(cfg) -> EngineSelector:
+    engines: dict[str, SttEngine] = {}
+    if cfg.api_key:
+        engines["sarvam"] = SarvamEngine(cfg.api_key)
+    if cfg.stt_local_model:
+        engines["local"] = LocalEngine(cfg.stt_local_model)
+    primary = engines.pop(cfg.stt_engine)
+    fallback = next(iter(engines.values()), None)
+    return EngineSelector(primary, fallback, cfg.stt_failover_after)
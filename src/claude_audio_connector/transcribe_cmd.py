@@ -0,0 +1,326 @@
+import argparse
+import asyncio
+import json
+import math
+import mmap
+import random
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from .config import load_config, load_env_from_args
+from .journal import PCM, read_segment
+
+SUFFIXES = (".wav", ".pcm", ".seg")
+
+# Energy VAD used only to pick cut points, not to drop audio.
+FRAME_MS = 30
+MIN_SILENCE_MS = 300
+NOISE_MULTIPLIER = 3.0
+MIN_THRESHOLD = 200.0
+
+Transcriber = Callable[[bytes, int], Awaitable[str]]
+
+
+class Audio:
+    """Mono int16 PCM for one input file, memory-mapped where possible."""
+
+    def __init__(self, path: Path, sample_rate: int, pcm, mm: mmap.mmap | None = None) -> None:
+        self.path = path
+        self.sample_rate = sample_rate
+        self.pcm = pcm
+        self._mm = mm
+
+    @property
+    def seconds(self) -> float:
+        return len(self.pcm) / 2 / self.sample_rate
+
+    def close(self) -> None:
+        if isinstance(self.pcm, memoryview):
+            self.pcm.release()
+        if self._mm is not None:
+            self._mm.close()
+
+
+def iter_inputs(paths: list[str]) -> list[Path]:
+    out = []
+    for arg in paths:
+        path = Path(arg).expanduser()
+        if path.is_dir():
+            out.extend(p for p in sorted(path.rglob("*")) if p.suffix.lower() in SUFFIXES)
+        else:
+            out.append(path)
+    return out
+
+
+def _wav_data(mm: mmap.mmap) -> tuple[int, int, int]:
+    """Return (sample_rate, data offset, data length) from a RIFF header."""
+    if mm[:4] != b"RIFF" or mm[8:12] != b"WAVE":
+        raise ValueError("not a RIFF/WAVE file")
+    pos, rate = 12, None
+    while pos + 8 <= len(mm):
+        chunk_id, size = mm[pos:pos + 4], struct.unpack_from("<I", mm, pos + 4)[0]
+        body = pos + 8
+        if chunk_id == b"fmt ":
+            fmt, channels, rate = struct.unpack_from("<HHI", mm, body)
+            bits = struct.unpack_from("<H", mm, body + 14)[0]
+            if fmt != 1 or channels != 1 or bits != 16:
+                raise ValueError("only mono 16-bit PCM WAV is supported")
+        elif chunk_id == b"data":
+            if rate is None:
+                raise ValueError("data chunk before fmt chunk")
+            return rate, body, min(size, len(mm) - body)
+        pos = body + size + (size & 1)
+    raise ValueError("no data chunk")
+
+
+def open_audio(path: Path, raw_rate: int) -> Audio:
+    if path.suffix.lower() == ".seg":
+        sample_rate, records = read_segment(path)
+        pcm = b"".join(payload for kind, _, payload in records if kind == PCM)
+        return Audio(path, sample_rate, pcm)
+    with open(path, "rb") as f:
+        if path.stat().st_size == 0:
+            return Audio(path, raw_rate, b"")
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        if path.suffix.lower() == ".wav":
+            rate, offset, length = _wav_data(mm)
+        else:
+            rate, offset, length = raw_rate, 0, len(mm)
+    except (ValueError, struct.error):
+        mm.close()
+        raise
+    length -= length % 2
+    return Audio(path, rate, memoryview(mm)[offset:offset + length], mm)
+
+
+def _frame_rms(pcm, start: int, end: int) -> float:
+    samples = array("h")
+    samples.frombytes(pcm[start:end])
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+def split_points(pcm, sample_rate: int, max_sec: float) -> list[tuple[int, int]]:
+    """Cut PCM into pieces of at most max_sec, preferring silence.
+
+    Each piece ends in the middle of the last silent stretch before the
+    limit; with no silence in range it is cut hard at max_sec.
+    """
+    total = len(pcm)
+    limit = int(max_sec * sample_rate) * 2
+    if total <= limit:
+        return [(0, total)] if total else []
+    frame = sample_rate * FRAME_MS // 1000 * 2
+    min_silent = max(1, MIN_SILENCE_MS // FRAME_MS)
+
+    # Threshold from the file's own energy spread: a few times the quiet
+    # floor, but never above half the loud level, so steady hum counts as
+    # silence and wall-to-wall speech does not.
+    energies = [_frame_rms(pcm, pos, min(total, pos + frame)) for pos in range(0, total, frame)]
+    ranked = sorted(energies)
+    floor = ranked[len(ranked) // 10]
+    loud = ranked[len(ranked) * 9 // 10]
+    threshold = max(MIN_THRESHOLD, min(floor * NOISE_MULTIPLIER, loud * 0.5))
+    silent = [e < threshold for e in energies]
+
+    pieces = []
+    start = 0
+    while total - start > limit:
+        first, last = start // frame, (start + limit) // frame
+        cut = None
+        run = 0
+        for idx in range(first, last):
+            run = run + 1 if silent[idx] else 0
+            if run >= min_silent:
+                cut = (idx - run // 2) * frame
+        if cut is None or cut <= start:
+            cut = start + limit
+        pieces.append((start, cut))
+        start = cut
+    pieces.append((start, total))
+    return pieces
+
+
+def _wav_bytes(pcm, sample_rate: int) -> bytes:
+    header = struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + len(pcm), b"WAVE", b"fmt ", 16, 1, 1,
+        sample_rate, sample_rate * 2, 2, 16, b"data", len(pcm),
+    )
+    return header + bytes(pcm)
+
+
+def sarvam_transcriber(cfg) -> Transcriber:
+    """One AsyncSarvamAI client (and its HTTP connection pool) for every request."""
+    from sarvamai import AsyncSarvamAI
+
+    client = AsyncSarvamAI(api_subscription_key=cfg.api_key)
+
+    async def transcribe(pcm, sample_rate: int) -> str:
+        response = await client.speech_to_text.transcribe(
+            file=("audio.wav", _wav_bytes(pcm, sample_rate), "audio/wav"),
+            model=cfg.stt_model,
+            language_code=cfg.stt_language,
+        )
+        return (getattr(response, "transcript", "") or "").strip()
+
+    return transcribe
+
+
+def _retryable(exc: Exception) -> bool:
+    """Transient failures only: network trouble, timeouts, 429 and 5xx."""
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    if isinstance(exc, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return True
+    try:
+        import httpx
+    except ImportError:
+        return False
+    return isinstance(exc, httpx.TransportError)
+
+
+async def _with_retry(
+    fn: Callable[[], Awaitable[str]], retries: int, backoff: float,
+) -> tuple[str, int, Exception | None]:
+    """Return (text, attempts, error); error is set once retrying stops."""
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return await fn(), attempt, None
+        except Exception as exc:
+            if attempt > retries or not _retryable(exc):
+                return "", attempt, exc
+            delay = backoff * 2 ** (attempt - 1)
+            await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+
+async def transcribe_files(
+    paths: list[Path],
+    transcribe: Transcriber,
+    out,
+    concurrency: int = 8,
+    max_sec: float = 30.0,
+    raw_rate: int = 16000,
+    retries: int = 3,
+    backoff: float = 0.5,
+) -> dict:
+    """Transcribe every piece of every file, at most `concurrency` at a time.
+
+    Writes one JSONL record per file as it finishes, then a summary record.
+    """
+    sem = asyncio.Semaphore(max(1, concurrency))
+    # Bounds open mappings too, not just requests in flight.
+    open_files = asyncio.Semaphore(max(1, concurrency))
+    started = time.monotonic()
+    totals = {"files": 0, "failed": 0, "segments": 0, "audio_sec": 0.0}
+
+    async def piece(audio: Audio, start: int, end: int) -> dict:
+        async with sem:
+            t0 = time.monotonic()
+            # Copy only while in flight so the mapping can close cleanly.
+            pcm = bytes(audio.pcm[start:end])
+            text, attempts, exc = await _with_retry(
+                lambda: transcribe(pcm, audio.sample_rate), retries, backoff,
+            )
+            record = {
+                "start": round(start / 2 / audio.sample_rate, 3),
+                "end": round(end / 2 / audio.sample_rate, 3),
+                "text": text,
+                "latency": round(time.monotonic() - t0, 3),
+                "attempts": attempts,
+            }
+            if exc is not None:
+                record["error"] = f"{type(exc).__name__}: {exc}"
+            return record
+
+    async def one_file(path: Path) -> None:
+        async with open_files:
+            await _one_file(path)
+
+    async def _one_file(path: Path) -> None:
+        t0 = time.monotonic()
+        # Reading a journal segment and finding cut points are CPU-bound;
+        # keep them off the loop so other uploads stay in flight.
+        try:
+            audio = await asyncio.to_thread(open_audio, path, raw_rate)
+        except (OSError, ValueError) as exc:
+            totals["failed"] += 1
+            out.write(json.dumps({"file": str(path), "error": str(exc)}) + "\n")
+            return
+        seconds = audio.seconds
+        try:
+            bounds = await asyncio.to_thread(split_points, audio.pcm, audio.sample_rate, max_sec)
+            pieces = await asyncio.gather(*(piece(audio, s, e) for s, e in bounds))
+        finally:
+            audio.close()
+        failed = any("error" in p for p in pieces)
+        totals["files"] += 1
+        totals["failed"] += failed
+        totals["segments"] += len(pieces)
+        totals["audio_sec"] += seconds
+        wall = time.monotonic() - t0
+        out.write(json.dumps({
+            "file": str(path),
+            "text": " ".join(p["text"] for p in pieces if p["text"]),
+            "audio_sec": round(seconds, 3),
+            "wall_sec": round(wall, 3),
+            "segments": pieces,
+        }) + "\n")
+        out.flush()
+
+    await asyncio.gather(*(one_file(p) for p in paths))
+    wall = time.monotonic() - started
+    totals["audio_sec"] = round(totals["audio_sec"], 3)
+    totals["wall_sec"] = round(wall, 3)
+    totals["audio_sec_per_wall_sec"] = round(totals["audio_sec"] / wall, 2) if wall > 0 else 0.0
+    out.write(json.dumps({"summary": totals}) + "\n")
+    out.flush()
+    return totals
+
+
+def main() -> None:
+    argv = sys.argv[1:]
+    load_env_from_args(argv)
+    parser = argparse.ArgumentParser(description="Transcribe WAV/PCM files or journal segments to JSONL.")
+    parser.add_argument("inputs", nargs="+", help="files or directories (*.wav, *.pcm, journal *.seg)")
+    parser.add_argument("--config", help="env file (see claude-audio-daemon)")
+    parser.add_argument("-o", "--output", help="JSONL output file (default stdout)")
+    parser.add_argument("-j", "--concurrency", type=int, default=8, help="requests in flight")
+    parser.add_argument("--max-sec", type=float, default=30.0, help="longest piece sent in one request")
+    parser.add_argument("--rate", type=int, default=16000, help="sample rate of raw .pcm input")
+    parser.add_argument("--retries", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    cfg = load_config()
+    paths = iter_inputs(args.inputs)
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        totals = asyncio.run(transcribe_files(
+            paths, sarvam_transcriber(cfg), out,
+            concurrency=args.concurrency, max_sec=args.max_sec,
+            raw_rate=args.rate, retries=args.retries,
+        ))
+    except KeyboardInterrupt:
+        return
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    sys.stderr.write(
+        f"{totals['files']} files, {totals['audio_sec']:.1f}s audio in {totals['wall_sec']:.1f}s "
+        f"({totals['audio_sec_per_wall_sec']}x realtime), {totals['failed']} failed\n"
+    )
+    if totals["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
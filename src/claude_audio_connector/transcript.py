@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+WAKE_PREFIXES = ("hey", "a", "ok", "okay")
+WAKE_NAMES = ("claude", "cloud", "claud", "klaud", "lord", "clod", "klaude", "clade")
+STOP_PHRASES = ("stop listening", "no audio", "stop audio", "exit audio")
+
+_TOKEN_RE = re.compile(r"\S+")
+_EDGE_PUNCT = ".,:;!?\"'()[]{}…-"
+
+STOP = "stop"
+WAKE = "wake"
+SHORTCUT = "shortcut"
+CORRECTION = "correction"
+
+
+@dataclass
+class Rules:
+    wake_prefixes: list[str] = field(default_factory=lambda: list(WAKE_PREFIXES))
+    wake_names: list[str] = field(default_factory=lambda: list(WAKE_NAMES))
+    stop_phrases: list[str] = field(default_factory=lambda: list(STOP_PHRASES))
+    shortcuts: dict[str, str] = field(default_factory=dict)
+    corrections: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str | None) -> "Rules":
+        """Built-in defaults, extended by an optional JSON rules file.
+
+        Raises ValueError if the file is not JSON of the expected shape.
+        """
+        rules = cls()
+        if not path:
+            return rules
+        data = json.loads(Path(path).expanduser().read_text())
+        if not isinstance(data, dict):
+            raise ValueError("rules file must hold a JSON object")
+        for key in ("wake_prefixes", "wake_names", "stop_phrases"):
+            items = data.get(key, [])
+            if not isinstance(items, list) or not all(isinstance(i, str) for i in items):
+                raise ValueError(f"{key} must be a list of strings")
+            getattr(rules, key).extend(items)
+        for key in ("shortcuts", "corrections"):
+            mapping = data.get(key, {})
+            if not isinstance(mapping, dict) or not all(isinstance(v, str) for v in mapping.values()):
+                raise ValueError(f"{key} must map phrases to strings")
+            getattr(rules, key).update(mapping)
+        return rules
+
+
+@dataclass(frozen=True)
+class Result:
+    """Outcome of running one transcript through the pipeline.
+
+    kind is "empty", "stop", "wake" (wake word with nothing after it),
+    "prompt" (text addressed to Claude) or "ignored" (not addressed).
+    """
+
+    kind: str
+    text: str = ""
+
+
+def _tokenize(text: str) -> list[tuple[str, int, int]]:
+    tokens = []
+    for m in _TOKEN_RE.finditer(text):
+        raw = m.group()
+        norm = raw.strip(_EDGE_PUNCT)
+        if not norm:
+            continue
+        lead = raw.index(norm[0])
+        start = m.start() + lead
+        tokens.append((norm.lower(), start, start + len(norm)))
+    return tokens
+
+
+def _phrase(text: str) -> tuple[str, ...]:
+    return tuple(tok for tok, _, _ in _tokenize(text))
+
+
+class _Automaton:
+    """Word-level Aho-Corasick automaton over every configured phrase."""
+
+    def __init__(self) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[int]] = [[]]
+        # Nearest proper suffix state that has outputs, so reporting matches
+        # costs O(matches) instead of walking the whole fail chain.
+        self._link: list[int] = [0]
+
+    def add(self, words: tuple[str, ...], rule: int) -> None:
+        state = 0
+        for word in words:
+            nxt = self._goto[state].get(word)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._link.append(0)
+                self._goto[state][word] = nxt
+            state = nxt
+        self._out[state].append(rule)
+
+    def build(self) -> None:
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for word, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and word not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(word, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                fs = self._fail[nxt]
+                self._link[nxt] = fs if self._out[fs] else self._link[fs]
+
+    def scan(self, words: list[str]):
+        goto, fail, out, link = self._goto, self._fail, self._out, self._link
+        state = 0
+        for end, word in enumerate(words):
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            s = state if out[state] else link[state]
+            while s:
+                for rule in out[s]:
+                    yield end, rule
+                s = link[s]
+
+
+class Pipeline:
+    """Normalise, classify and rewrite transcripts in a single pass.
+
+    Stop phrases, wake-word variants, command shortcuts and misrecognition
+    corrections all compile into one automaton, so the cost per transcript
+    depends on its length rather than the number of configured phrases.
+    """
+
+    def __init__(self, rules: Rules | None = None) -> None:
+        rules = rules or Rules()
+        self._rules: list[tuple[str, int, str]] = []
+        self._ac = _Automaton()
+        for phrase in rules.stop_phrases:
+            self._add(STOP, phrase, "")
+        for prefix in rules.wake_prefixes:
+            for name in rules.wake_names:
+                self._add(WAKE, f"{prefix} {name}", "")
+        for phrase, expansion in rules.shortcuts.items():
+            self._add(SHORTCUT, phrase, expansion)
+        for wrong, right in rules.corrections.items():
+            self._add(CORRECTION, wrong, right)
+        self._ac.build()
+
+    def _add(self, kind: str, phrase: str, payload: str) -> None:
+        words = _phrase(phrase)
+        if not words:
+            return
+        self._ac.add(words, len(self._rules))
+        self._rules.append((kind, len(words), payload))
+
+    def process(self, text: str, awake: bool = False) -> Result:
+        """Classify text. awake means a bare wake word was heard just before."""
+        tokens = _tokenize(text)
+        if not tokens:
+            return Result("empty")
+
+        n = len(tokens)
+        stop = False
+        wake_end = 0
+        # Longest shortcut starting at a given token index.
+        shortcuts: dict[int, tuple[int, str]] = {}
+        corrections: list[tuple[int, int, str]] = []
+        for end, idx in self._ac.scan([tok for tok, _, _ in tokens]):
+            kind, length, payload = self._rules[idx]
+            start = end - length + 1
+            if kind == STOP:
+                stop = stop or (start == 0 and end == n - 1)
+            elif kind == WAKE:
+                if start == 0:
+                    wake_end = max(wake_end, end + 1)
+            elif kind == SHORTCUT:
+                if length > shortcuts.get(start, (0, ""))[0]:
+                    shortcuts[start] = (length, payload)
+            else:
+                corrections.append((start, end + 1, payload))
+
+        if stop:
+            return Result(STOP)
+        if not wake_end and not awake:
+            return Result("ignored")
+        if wake_end == n:
+            return Result(WAKE)
+
+        first = wake_end
+        prefix = ""
+        if first in shortcuts:
+            length, prefix = shortcuts[first]
+            first += length
+            if first == n:
+                return Result("prompt", prefix)
+
+        body = self._rewrite(text, tokens, first, corrections)
+        return Result("prompt", f"{prefix} {body}" if prefix else body)
+
+    @staticmethod
+    def _rewrite(text: str, tokens, first: int, corrections) -> str:
+        pieces = []
+        pos = tokens[first][1]
+        last = first
+        # Leftmost-longest, non-overlapping.
+        for start, stop, repl in sorted(corrections, key=lambda c: (c[0], c[0] - c[1])):
+            if start < last:
+                continue
+            pieces.append(text[pos:tokens[start][1]])
+            pieces.append(repl)
+            pos = tokens[stop - 1][2]
+            last = stop
+        pieces.append(text[pos:])
+        return "".join(pieces).strip()
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import queue
+import re
+import threading
+import time
+from typing import Callable, Iterable, Iterator
+
+from .audio_utils import PORTAUDIO_LOCK
+from .config import TTS_SPEEDS
+
+# Serializes whole utterances, so overlapping SPEAKs play one after another.
+# PORTAUDIO_LOCK itself is only held while there is audio to play.
+_SPEAK_LOCK = threading.Lock()
+
+# A clause ends at sentence punctuation followed by whitespace, or a newline.
+_CLAUSE_END = re.compile(r"[.!?;:](?=\s)|\n")
+_SOFT_END = re.compile(r",(?=\s)")
+
+
+class ClauseSplitter:
+    """Cuts incrementally arriving text into speakable clauses.
+
+    Commas only split once a clause is long enough to be worth a pause, and
+    anything longer than max_chars is cut at the last space so synthesis can
+    start before the writer reaches a full stop.
+    """
+
+    def __init__(self, soft_chars: int = 80, max_chars: int = 240) -> None:
+        self._buf = ""
+        self._soft_chars = soft_chars
+        self._max_chars = max_chars
+
+    def feed(self, text: str) -> list[str]:
+        self._buf += text
+        out = []
+        while True:
+            cut = self._next_cut()
+            if cut is None:
+                return out
+            clause, self._buf = self._buf[:cut].strip(), self._buf[cut:]
+            if clause:
+                out.append(clause)
+
+    def _next_cut(self) -> int | None:
+        m = _CLAUSE_END.search(self._buf)
+        if m:
+            return m.end()
+        if len(self._buf) >= self._soft_chars:
+            soft = _SOFT_END.search(self._buf, self._soft_chars // 2)
+            if soft:
+                return soft.end()
+        if len(self._buf) >= self._max_chars:
+            space = self._buf.rfind(" ", 0, self._max_chars)
+            return space + 1 if space > 0 else self._max_chars
+        return None
+
+    def flush(self) -> list[str]:
+        clause, self._buf = self._buf.strip(), ""
+        return [clause] if clause else []
+
+
+def iter_clauses(chunks: Iterable[str], splitter: ClauseSplitter | None = None) -> Iterator[str]:
+    splitter = splitter or ClauseSplitter()
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    yield from splitter.flush()
+
+
+def play(
+    clauses: Iterable[str],
+    synth: Callable[[str], Iterable[bytes]],
+    write: Callable[[bytes], None],
+    on_first_audio: Callable[[], None] | None = None,
+    max_chunks: int = 256,
+    on_idle: Callable[[], None] | None = None,
+) -> None:
+    """Synthesize clauses on a worker thread while earlier audio plays.
+
+    clauses may block (e.g. a queue still being filled); synthesis of clause
+    N+1 overlaps with playback of clause N. on_idle runs whenever a clause
+    has been written and the next one has no audio yet.
+    """
+    chunks: queue.Queue = queue.Queue(maxsize=max_chunks)
+    abort = threading.Event()
+    errors: list[BaseException] = []
+    done = object()
+    clause_end = object()
+
+    def put(item) -> bool:
+        while not abort.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for clause in clauses:
+                for chunk in synth(clause):
+                    if not put(chunk):
+                        return
+                if not put(clause_end):
+                    return
+        except BaseException as exc:
+            errors.append(exc)
+        finally:
+            put(done)
+
+    worker = threading.Thread(target=produce, name="tts-synth", daemon=True)
+    worker.start()
+    try:
+        first = True
+        while (chunk := chunks.get()) is not done:
+            if chunk is clause_end:
+                if on_idle is not None and chunks.empty():
+                    on_idle()
+                continue
+            if first and on_first_audio is not None:
+                on_first_audio()
+            first = False
+            write(chunk)
+    finally:
+        abort.set()
+        worker.join()
+    if errors:
+        raise errors[0]
+
+
+def cartesia_synth(cfg) -> Callable[[str], Iterable[bytes]]:
+    from cartesia import Cartesia
+
+    client = Cartesia(api_key=cfg.cartesia_api_key)
+
+    def synth(text: str) -> Iterable[bytes]:
+        return client.tts.bytes(
+            model_id="sonic-2",
+            transcript=text,
+            voice={"mode": "id", "id": cfg.cartesia_voice_id},
+            output_format={"container": "raw", "encoding": "pcm_s16le", "sample_rate": cfg.tts_sample_rate},
+            speed=TTS_SPEEDS.get(cfg.tts_speed, 0.25),
+            language="en",
+        )
+
+    return synth
+
+
+class _Output:
+    """Output stream opened on the first audio and closed when playback runs dry.
+
+    PORTAUDIO_LOCK is held exactly while the stream is open, so a device
+    refresh waits for audio that is playing, but never for a clause that
+    has not been written yet.
+    """
+
+    def __init__(self, samplerate: int) -> None:
+        self._samplerate = samplerate
+        self._stream = None
+
+    def write(self, chunk: bytes) -> None:
+        if self._stream is None:
+            import sounddevice as sd
+
+            PORTAUDIO_LOCK.acquire()
+            try:
+                stream = sd.RawOutputStream(samplerate=self._samplerate, channels=1, dtype="int16")
+                stream.start()
+            except BaseException:
+                PORTAUDIO_LOCK.release()
+                raise
+            self._stream = stream
+        self._stream.write(chunk)
+
+    def close(self) -> None:
+        stream, self._stream = self._stream, None
+        if stream is None:
+            return
+        try:
+            # stop() returns once the buffered audio has played.
+            stream.stop()
+            stream.close()
+        finally:
+            PORTAUDIO_LOCK.release()
+
+
+def speak_clauses(clauses: Iterable[str], cfg, on_first_audio: Callable[[float], None] | None = None) -> None:
+    """Play clauses through Cartesia on the default output device.
+
+    Overlapping requests play one after another. The output device is only
+    held while audio is queued, so a stream waiting on slow text does not
+    block a device refresh.
+    """
+    if not cfg.cartesia_api_key:
+        for _ in clauses:
+            pass
+        return
+
+    started = time.monotonic()
+    synth = cartesia_synth(cfg)
+    first = None if on_first_audio is None else (lambda: on_first_audio(time.monotonic() - started))
+    out = _Output(cfg.tts_sample_rate)
+    with _SPEAK_LOCK:
+        try:
+            play(clauses, synth, out.write, on_first_audio=first, on_idle=out.close)
+        finally:
+            out.close()
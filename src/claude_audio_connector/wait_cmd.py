@@ -3,8 +3,8 @@ import os
 import sys
 import time
 
-from .ipc import wait_for_message
-from .runtime import runtime_path, socket_path
+from .ipc import REPLACED, wait_for_message
+from .runtime import runtime_path, session_name, socket_path
 
 PID_PATH = runtime_path("pid")
 STATUS_PATH = runtime_path("status")
@@ -18,8 +18,9 @@ def main() -> None:
         sys.exit(1)
 
     sock = socket_path()
+    session = session_name()
     loop = asyncio.new_event_loop()
-    task = loop.create_task(wait_for_message(sock))
+    task = loop.create_task(wait_for_message(sock, session))
     last_shown = ""
 
     try:
@@ -28,7 +29,12 @@ def main() -> None:
             if task.done():
                 text = task.result()
                 if text is None:
-                    task = loop.create_task(wait_for_message(sock))
+                    task = loop.create_task(wait_for_message(sock, session))
+                elif text == REPLACED:
+                    # Another wait for this session took over; retrying
+                    # would just take it back.
+                    sys.stderr.write(f"\r\033[K(another wait took over session {session})\n")
+                    sys.exit(1)
                 else:
                     if text:
                         sys.stdout.write(text + "\n")
@@ -0,0 +1,122 @@
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from claude_audio_connector import audio_utils
+from claude_audio_connector.audio_utils import DeviceRegistry, MicStream
+
+
+def device(name: str, inputs: int = 1) -> dict:
+    return {"name": name, "max_input_channels": inputs}
+
+
+class FakeSoundDevice:
+    """Just enough of sounddevice for DeviceRegistry and MicStream."""
+
+    class PortAudioError(Exception):
+        pass
+
+    def __init__(self, devices: list[dict]) -> None:
+        self.devices = devices
+        self.queries = 0
+        self.reinits = 0
+        self.opened: list[int | None] = []
+
+    def query_devices(self) -> list[dict]:
+        self.queries += 1
+        return list(self.devices)
+
+    def _terminate(self) -> None:
+        pass
+
+    def _initialize(self) -> None:
+        self.reinits += 1
+
+    def RawInputStream(self, device=None, **kwargs):
+        self.opened.append(device)
+        return SimpleNamespace(start=lambda: None, stop=lambda: None, close=lambda: None, active=True)
+
+
+class AudioTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.sd = FakeSoundDevice([device("Built-in Output", 0), device("Built-in Mic"), device("USB Headset")])
+        self.fingerprint = ("cards-1", ())
+        for patcher in (
+            mock.patch.dict(sys.modules, {"sounddevice": self.sd}),
+            mock.patch.object(audio_utils, "_hotplug_fingerprint", lambda: self.fingerprint),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def replug(self, devices: list[dict]) -> None:
+        self.sd.devices = devices
+        self.fingerprint = (f"cards-{len(devices)}-{devices[-1]['name']}", ())
+
+
+class TestDeviceRegistry(AudioTestCase):
+    def test_pinned_index_follows_its_device(self) -> None:
+        registry = DeviceRegistry()
+        self.assertEqual(registry.resolve("2"), 2)
+        self.replug([device("USB Headset"), device("Built-in Output", 0), device("Built-in Mic")])
+        registry.refresh()
+        self.assertEqual(registry.resolve("2"), 0)
+
+    def test_pinned_device_gone_falls_back_to_default(self) -> None:
+        registry = DeviceRegistry()
+        self.assertEqual(registry.resolve("2"), 2)
+        self.replug([device("Built-in Output", 0), device("Built-in Mic"), device("HDMI", 0)])
+        registry.refresh()
+        # Index 2 now names a different device; do not guess.
+        self.assertIsNone(registry.resolve("2"))
+
+    def test_substring_rematches_after_refresh(self) -> None:
+        registry = DeviceRegistry()
+        self.assertEqual(registry.resolve("usb"), 2)
+        self.replug([device("USB Headset"), device("Built-in Mic")])
+        registry.refresh()
+        self.assertEqual(registry.resolve("usb"), 0)
+        self.replug([device("Built-in Mic"), device("USB Mic")])
+        registry.refresh()
+        self.assertEqual(registry.resolve("usb"), 1)
+        self.assertEqual(registry.name_of(1), "USB Mic")
+
+    def test_device_list_is_cached_until_refresh(self) -> None:
+        registry = DeviceRegistry()
+        registry.resolve("usb")
+        registry.resolve("mic")
+        self.assertEqual(self.sd.queries, 1)
+        registry.refresh()
+        registry.resolve("usb")
+        self.assertEqual(self.sd.queries, 2)
+
+
+class TestMigrate(AudioTestCase):
+    def mic(self) -> MicStream:
+        mic = MicStream(DeviceRegistry(), "usb", samplerate=16000, blocksize=320, callback=lambda *a: None)
+        mic.open()
+        return mic
+
+    def test_unchanged_devices_reopen_without_reinit(self) -> None:
+        mic = self.mic()
+        self.assertFalse(mic.devices_changed())
+        mic.migrate()
+        self.assertEqual(self.sd.reinits, 0)
+        self.assertEqual(self.sd.opened, [2, 2])
+
+    def test_changed_devices_reinit_and_reresolve(self) -> None:
+        mic = self.mic()
+        self.replug([device("USB Headset"), device("Built-in Mic")])
+        self.assertTrue(mic.needs_migration())
+        mic.migrate()
+        self.assertEqual(self.sd.reinits, 1)
+        self.assertEqual(self.sd.opened, [2, 0])
+        self.assertEqual(mic.device_name, "USB Headset")
+        self.assertFalse(mic.devices_changed())
+
+    def test_without_hotplug_fingerprint_every_migration_reinits(self) -> None:
+        self.fingerprint = None
+        mic = self.mic()
+        self.assertFalse(mic._registry.watches_hotplug)
+        mic.migrate()
+        self.assertEqual(self.sd.reinits, 1)
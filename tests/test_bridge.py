@@ -0,0 +1,44 @@
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from claude_audio_connector.bridge import AudioBridge, StatusWriter
+
+OK = SimpleNamespace(input_overflow=False, input_underflow=False)
+OVERFLOW = SimpleNamespace(input_overflow=True, input_underflow=False)
+
+
+class TestAudioBridge(unittest.TestCase):
+    def test_paused_discards(self) -> None:
+        bridge = AudioBridge(max_blocks=4)
+        bridge.callback(b"\x00" * 640, 320, None, OK)
+        self.assertEqual(len(bridge), 0)
+        self.assertEqual(bridge.discarded, 320)
+
+        bridge.resume()
+        bridge.callback(b"\x01" * 640, 320, None, OVERFLOW)
+        self.assertEqual(bridge.drain(), [b"\x01" * 640])
+        self.assertEqual(bridge.frames, 640)
+        self.assertEqual(bridge.input_overflows, 1)
+
+    def test_overrun_keeps_newest(self) -> None:
+        bridge = AudioBridge(max_blocks=2)
+        bridge.resume()
+        for i in range(5):
+            bridge.callback(bytes([i]), 1, None, OK)
+        self.assertEqual(bridge.drain(), [b"\x03", b"\x04"])
+        self.assertEqual(bridge.overruns, 3)
+
+
+class TestStatusWriter(unittest.TestCase):
+    def test_latest_status_wins(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "status"
+            writer = StatusWriter(str(path))
+            for status in ("recording", "processing", "heard:hi", "idle"):
+                writer.set(status)
+            writer.close()
+            self.assertEqual(path.read_text(), "idle")
+            writer.set("late")
+            self.assertEqual(path.read_text(), "idle")
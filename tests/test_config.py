@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+from dataclasses import replace
+from pathlib import Path
+from unittest import mock
+
+from claude_audio_connector import config
+
+
+class TestConfig(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        env = {"CLAUDE_AUDIO_RUNTIME_DIR": str(self.tmp), "SARVAM_API_KEY": "key"}
+        patcher = mock.patch.dict(os.environ, env, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self._tmp.cleanup)
+        config._file_keys.clear()
+
+    def test_defaults_cover_all_fields(self) -> None:
+        cfg = config.load_config(reload=True)
+        self.assertEqual(cfg.stt_sample_rate, 16000)
+        self.assertEqual(cfg.local_vad_mode, 2)
+        self.assertIs(config.load_config(), cfg)
+
+    def test_validation(self) -> None:
+        os.environ["TTS_SPEED"] = "warp"
+        with self.assertRaises(SystemExit):
+            config.load_config(reload=True)
+        os.environ["TTS_SPEED"] = "slow"
+        os.environ["LOCAL_VAD_MODE"] = "nine"
+        with self.assertRaises(SystemExit):
+            config.load_config(reload=True)
+        del os.environ["LOCAL_VAD_MODE"]
+        os.environ["CLAUDE_AUDIO_METRICS"] = "tcp:localhost"
+        with self.assertRaisesRegex(SystemExit, "CLAUDE_AUDIO_METRICS: expected tcp:HOST:PORT"):
+            config.load_config(reload=True)
+        del os.environ["CLAUDE_AUDIO_METRICS"]
+        os.environ["CLAUDE_AUDIO_DSP"] = "gain:db=loud"
+        with self.assertRaisesRegex(SystemExit, "CLAUDE_AUDIO_DSP: DSP stage 'gain'"):
+            config.load_config(reload=True)
+        os.environ["CLAUDE_AUDIO_DSP"] = "highpass:hz=9000"
+        with self.assertRaisesRegex(SystemExit, "CLAUDE_AUDIO_DSP: DSP stage 'highpass'"):
+            config.load_config(reload=True)
+        del os.environ["CLAUDE_AUDIO_DSP"]
+        rules = self.tmp / "rules.json"
+        os.environ["CLAUDE_AUDIO_RULES"] = str(rules)
+        with self.assertRaisesRegex(SystemExit, "CLAUDE_AUDIO_RULES: cannot read"):
+            config.load_config(reload=True)
+        rules.write_text('{"shortcuts": ')
+        with self.assertRaisesRegex(SystemExit, "CLAUDE_AUDIO_RULES: "):
+            config.load_config(reload=True)
+        rules.write_text('{"shortcuts": {"ship it": 1}}')
+        with self.assertRaisesRegex(SystemExit, "CLAUDE_AUDIO_RULES: shortcuts must map"):
+            config.load_config(reload=True)
+
+    def test_env_file_edits_apply(self) -> None:
+        env_file = self.tmp / "test.env"
+        env_file.write_text("TTS_SPEED=slow\n# comment\nCARTESIA_VOICE_ID='abc'\n")
+        self.assertEqual(config.load_env_file(str(env_file)), ["TTS_SPEED", "CARTESIA_VOICE_ID"])
+        self.assertEqual(os.environ["CARTESIA_VOICE_ID"], "abc")
+
+        env_file.write_text("TTS_SPEED=fastest\n")
+        self.assertEqual(config.load_env_file(str(env_file)), ["TTS_SPEED"])
+        self.assertEqual(os.environ["TTS_SPEED"], "fastest")
+        # Secrets in the .env are never copied to the shared runtime dir.
+        self.assertEqual(list(self.tmp.iterdir()), [env_file])
+
+    def test_env_file_does_not_override_exports(self) -> None:
+        env_file = self.tmp / "test.env"
+        env_file.write_text("TTS_SPEED=slow\n")
+        os.environ["TTS_SPEED"] = "normal"
+        self.assertEqual(config.load_env_file(str(env_file)), [])
+        self.assertEqual(os.environ["TTS_SPEED"], "normal")
+
+    def test_tunable_changes(self) -> None:
+        cfg = config.load_config(reload=True)
+        new = replace(
+            cfg, tts_speed="slow", stt_batch_interval=0.3, stt_sample_rate=8000, local_vad_threshold=0.2,
+        )
+        applied, restart = config.tunable_changes(cfg, new)
+        self.assertEqual(applied, {"tts_speed": "slow", "stt_batch_interval": 0.3})
+        self.assertEqual(restart, ["stt_sample_rate", "local_vad_threshold"])
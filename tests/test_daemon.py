@@ -0,0 +1,111 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from claude_audio_connector import config, daemon
+from claude_audio_connector.audio_utils import DeviceError
+
+
+class MissingMic:
+    def __init__(self) -> None:
+        self.attempts = 0
+        self.changed = False
+
+    def needs_migration(self) -> bool:
+        return True
+
+    def devices_changed(self) -> bool:
+        return self.changed
+
+    def migrate(self) -> None:
+        self.attempts += 1
+        raise DeviceError("no input device")
+
+    def close(self) -> None:
+        pass
+
+
+class TestWatchMic(unittest.IsolatedAsyncioTestCase):
+    async def test_backs_off_without_device(self) -> None:
+        mic = MissingMic()
+        stop = asyncio.Event()
+        watcher = asyncio.create_task(daemon._watch_mic(mic, 0.01, stop))
+        await asyncio.sleep(0.4)
+        # Every poll would be ~40 attempts; doubling from 10 ms is ~6.
+        self.assertLess(mic.attempts, 10)
+        before = mic.attempts
+        mic.changed = True
+        await asyncio.sleep(0.05)
+        self.assertGreater(mic.attempts, before)
+        stop.set()
+        await watcher
+
+
+class TestLiveConfigReload(unittest.TestCase):
+    def test_rules_file_edit_is_picked_up(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            rules = Path(tmp) / "rules.json"
+            rules.write_text(json.dumps({"shortcuts": {"ship it": "Commit and push."}}))
+            env = {"SARVAM_API_KEY": "key", "CLAUDE_AUDIO_RUNTIME_DIR": tmp, "CLAUDE_AUDIO_RULES": str(rules)}
+            with mock.patch.dict(os.environ, env, clear=True):
+                live = daemon.LiveConfig(config.load_config(reload=True))
+                self.assertEqual(live.pipeline.process("hey claude ship it").text, "Commit and push.")
+
+                rules.write_text(json.dumps({"shortcuts": {"ship it": "Open a PR."}}))
+                os.utime(rules, ns=(0, 10**9))
+                self.assertTrue(live.reload().startswith("OK applied=transcript_rules "))
+                self.assertEqual(live.pipeline.process("hey claude ship it").text, "Open a PR.")
+
+                rules.write_text(json.dumps({"shortcuts": ["not", "a", "mapping"]}))
+                self.assertTrue(live.reload().startswith("ERR CLAUDE_AUDIO_RULES: "))
+                self.assertEqual(live.pipeline.process("hey claude ship it").text, "Open a PR.")
+
+
+class FakeMic:
+    def __init__(self) -> None:
+        self.closed = False
+
+    def open(self) -> None:
+        pass
+
+    def needs_migration(self) -> bool:
+        return False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class FakeEngines:
+    fallback = None
+
+    def __init__(self) -> None:
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class TestRunDaemonCleanup(unittest.IsolatedAsyncioTestCase):
+    async def test_failed_startup_releases_everything(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            cfg = config.default_config(os.path.join(tmp, "d.sock"), dsp_stages="gain:db=6")
+            mic, engines = FakeMic(), FakeEngines()
+            pid_path = os.path.join(tmp, "d.pid")
+
+            async def speak(*_args) -> None:
+                pass
+
+            with mock.patch.object(daemon.DspWorker, "start", side_effect=OSError("no shm")):
+                with self.assertRaises(OSError):
+                    await daemon.run_daemon(
+                        cfg, stop_event=asyncio.Event(), engines=engines, mic_factory=lambda _cb: mic,
+                        speak=speak, pid_path=pid_path, status_path=os.path.join(tmp, "d.status"),
+                    )
+            self.assertTrue(mic.closed)
+            self.assertTrue(engines.closed)
+            self.assertFalse(os.path.exists(pid_path))
+            self.assertFalse(os.path.exists(cfg.socket_path))
@@ -0,0 +1,105 @@
+import time
+import unittest
+from array import array
+
+from claude_audio_connector.dsp import MAX_RESTARTS, DspWorker, InlineDsp, RingBuffer, build_chain, parse_stages
+
+
+def pcm(*samples: int) -> bytes:
+    return array("h", samples).tobytes()
+
+
+class TestRingBuffer(unittest.TestCase):
+    def test_wraparound_and_full(self) -> None:
+        ring = RingBuffer(capacity=64)
+        try:
+            peer = RingBuffer(ring.name, lock=ring.lock)
+            for i in range(20):
+                frame = bytes([i]) * (10 + i % 7)
+                self.assertTrue(ring.write(frame))
+                self.assertEqual(peer.read(), frame)
+            self.assertIsNone(peer.read())
+            self.assertTrue(ring.write(b"x" * 40))
+            self.assertFalse(ring.write(b"y" * 40))
+            peer.close()
+        finally:
+            ring.close()
+
+    def test_attach_needs_lock(self) -> None:
+        ring = RingBuffer(capacity=64)
+        try:
+            with self.assertRaises(TypeError):
+                RingBuffer(ring.name)
+        finally:
+            ring.close()
+
+
+class TestStages(unittest.TestCase):
+    def test_parse(self) -> None:
+        self.assertEqual(
+            parse_stages("highpass:hz=100, gain:db=6"),
+            [("highpass", {"hz": "100"}), ("gain", {"db": "6"})],
+        )
+        with self.assertRaises(ValueError):
+            parse_stages("reverb")
+
+    def test_bad_params(self) -> None:
+        for spec in ("gain:db=loud", "gain:volume=6", "highpass:hz=0", "highpass:hz=8000", "gate:threshold=-1"):
+            with self.subTest(spec=spec), self.assertRaisesRegex(ValueError, "DSP stage"):
+                build_chain(parse_stages(spec), 16000)
+
+    def test_highpass_uses_stream_rate(self) -> None:
+        # Same cutoff, lower rate: each sample is a bigger step in time, so
+        # DC decays faster.
+        step = pcm(*[10000] * 8)
+        fast = InlineDsp(parse_stages("highpass:hz=200"), 48000)
+        slow = InlineDsp(parse_stages("highpass:hz=200"), 8000)
+        fast.submit(step)
+        slow.submit(step)
+        self.assertLess(array("h", slow.collect()[0])[-1], array("h", fast.collect()[0])[-1])
+
+    def test_inline_chain(self) -> None:
+        dsp = InlineDsp(parse_stages("gain:db=6,gate:threshold=100"), 16000)
+        dsp.submit(pcm(1000, -1000, 30000))
+        dsp.submit(pcm(10, -10, 10))
+        loud, quiet = dsp.collect()
+        self.assertEqual(array("h", loud).tolist(), [1995, -1995, 32767])
+        self.assertEqual(quiet, bytes(6))
+
+
+class TestDspWorker(unittest.TestCase):
+    def test_process_roundtrip(self) -> None:
+        stages = parse_stages("gain:db=6")
+        worker = DspWorker(stages, 16000, ring_bytes=4096)
+        worker.start()
+        try:
+            frames = [pcm(i, -i, 2 * i) for i in range(1, 50)]
+            for frame in frames:
+                self.assertTrue(worker.submit(frame))
+            out = []
+            deadline = time.monotonic() + 20
+            while len(out) < len(frames) and time.monotonic() < deadline:
+                out += worker.collect()
+                time.sleep(0.005)
+            expected = InlineDsp(stages, 16000)
+            for frame in frames:
+                expected.submit(frame)
+            self.assertEqual(out, expected.collect())
+        finally:
+            worker.close()
+
+    def test_dead_worker_restarts_then_runs_inline(self) -> None:
+        worker = DspWorker(parse_stages("gain:db=6"), 16000, ring_bytes=4096)
+        worker.start()
+        try:
+            for attempt in range(MAX_RESTARTS + 1):
+                worker._proc.kill()
+                worker._proc.join()
+                worker.ensure_alive()
+                self.assertEqual(worker.restarts, min(attempt + 1, MAX_RESTARTS))
+            self.assertTrue(worker.inline)
+            self.assertFalse(worker.alive)
+            self.assertTrue(worker.submit(pcm(1000)))
+            self.assertEqual(array("h", worker.collect()[0]).tolist(), [1995])
+        finally:
+            worker.close()
@@ -1,9 +1,23 @@
 import asyncio
+import os
 import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
 
-from claude_audio_connector.ipc import IpcServer, wait_for_message
+from claude_audio_connector import ipc, runtime
+from claude_audio_connector.ipc import (
+    IpcServer,
+    focus_via_daemon,
+    metrics_via_daemon,
+    profile_via_daemon,
+    reload_via_daemon,
+    speak_stream_via_daemon,
+    request_daemon,
+    sessions_via_daemon,
+    trace_via_daemon,
+    wait_for_message,
+)
 
 
 class TestIpc(unittest.IsolatedAsyncioTestCase):
@@ -37,3 +51,244 @@ class TestIpc(unittest.IsolatedAsyncioTestCase):
             sent = await server.send("noop")
             self.assertFalse(sent)
             await server.close()
+
+    async def test_reload(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            sock = str(Path(tmp) / "ipc.sock")
+
+            async def reload_fn() -> str:
+                return "OK applied=tts_speed restart="
+
+            server = IpcServer(sock, reload_fn=reload_fn)
+            try:
+                await server.start()
+            except PermissionError as exc:
+                self.skipTest(f"unix socket not permitted in sandbox: {exc}")
+            reply = await reload_via_daemon(sock)
+            self.assertEqual(reply, "OK applied=tts_speed restart=")
+            await server.close()
+
+    async def test_session_routing(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            sock = str(Path(tmp) / "ipc.sock")
+            server = IpcServer(sock)
+            try:
+                await server.start()
+            except PermissionError as exc:
+                self.skipTest(f"unix socket not permitted in sandbox: {exc}")
+
+            self.assertEqual(await request_daemon("REGISTER backend-api", sock), "OK 1")
+            # One session: nothing to choose between, so never strip words.
+            self.assertEqual(server.address("Backend API, run tests"), (None, "Backend API, run tests"))
+            self.assertEqual(await request_daemon("REGISTER web", sock), "OK 2")
+            self.assertEqual(server.address("Backend API, run tests"), ("backend-api", "run tests"))
+            self.assertEqual(server.address("web: deploy"), ("web", "deploy"))
+            self.assertEqual(server.address("session web deploy"), ("web", "deploy"))
+            self.assertEqual(server.address("web pages are slow"), (None, "web pages are slow"))
+            self.assertEqual(server.address("run tests"), (None, "run tests"))
+
+            backend = asyncio.create_task(wait_for_message(sock, "backend-api"))
+            web = asyncio.create_task(wait_for_message(sock, "web"))
+            await asyncio.sleep(0.05)
+
+            # Unaddressed text goes to the most recently active session.
+            self.assertTrue(await server.send("one"))
+            self.assertEqual(await web, "one")
+            self.assertFalse(backend.done())
+
+            self.assertEqual(await focus_via_daemon("backend-api", sock), "OK")
+            self.assertEqual(await sessions_via_daemon(sock), [
+                ("backend-api", True, True), ("web", False, False),
+            ])
+            web = asyncio.create_task(wait_for_message(sock, "web"))
+            await asyncio.sleep(0.05)
+            self.assertTrue(await server.send("two"))
+            self.assertEqual(await backend, "two")
+
+            self.assertTrue(await server.send("three", "web"))
+            self.assertEqual(await web, "three")
+
+            self.assertEqual(await request_daemon("UNREGISTER web", sock), "OK 1 backend-api")
+            self.assertEqual(await request_daemon("PING", sock), "PONG")
+            await server.close()
+
+    async def test_metrics(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            sock = str(Path(tmp) / "ipc.sock")
+            server = IpcServer(sock)
+            try:
+                await server.start()
+            except PermissionError as exc:
+                self.skipTest(f"unix socket not permitted in sandbox: {exc}")
+            text = await metrics_via_daemon(sock)
+            self.assertIn("claude_audio_process_resident_memory_bytes ", text)
+            self.assertTrue(text.endswith("# EOF\n"))
+            await server.close()
+
+    async def test_speak_stream_starts_before_eof(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            sock = str(Path(tmp) / "ipc.sock")
+            loop = asyncio.get_running_loop()
+            first_clause = asyncio.Event()
+            spoken = []
+
+            def consume(clauses) -> None:
+                for clause in iter(clauses.get, None):
+                    spoken.append(clause)
+                    loop.call_soon_threadsafe(first_clause.set)
+
+            async def tts_stream_fn(clauses) -> None:
+                await loop.run_in_executor(None, consume, clauses)
+
+            server = IpcServer(sock, tts_stream_fn=tts_stream_fn)
+            try:
+                await server.start()
+            except PermissionError as exc:
+                self.skipTest(f"unix socket not permitted in sandbox: {exc}")
+
+            async def chunks():
+                yield "First clause. Second"
+                await asyncio.wait_for(first_clause.wait(), timeout=2)
+                yield " clause"
+
+            self.assertTrue(await speak_stream_via_daemon(chunks(), sock))
+            self.assertEqual(spoken, ["First clause.", "Second clause"])
+            await server.close()
+
+    async def test_stalled_speak_stream_is_cut_off(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(ipc, "STREAM_IDLE_TIMEOUT", 0.1):
+            sock = str(Path(tmp) / "ipc.sock")
+            loop = asyncio.get_running_loop()
+            spoken = []
+
+            async def tts_stream_fn(clauses) -> None:
+                await loop.run_in_executor(None, lambda: spoken.extend(iter(clauses.get, None)))
+
+            server = IpcServer(sock, tts_stream_fn=tts_stream_fn)
+            try:
+                await server.start()
+            except PermissionError as exc:
+                self.skipTest(f"unix socket not permitted in sandbox: {exc}")
+            reader, writer = await asyncio.open_unix_connection(sock)
+            # Never closes its end: the server gives up, speaks what it has
+            # and answers.
+            writer.write(b"SPEAK_STREAM\nAll done. And then")
+            await writer.drain()
+            self.assertEqual(await asyncio.wait_for(reader.readline(), 2), b"OK\n")
+            self.assertEqual(spoken, ["All done.", "And then"])
+            writer.close()
+            await server.close()
+
+    async def test_replaced_and_abandoned_waiters_are_released(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            sock = str(Path(tmp) / "ipc.sock")
+            server = IpcServer(sock)
+            try:
+                await server.start()
+            except PermissionError as exc:
+                self.skipTest(f"unix socket not permitted in sandbox: {exc}")
+
+            first = asyncio.create_task(wait_for_message(sock, "api"))
+            await asyncio.sleep(0.05)
+            second = asyncio.create_task(wait_for_message(sock, "api"))
+            await asyncio.sleep(0.05)
+            # The replaced WAIT is told so and closed, not left dangling.
+            self.assertEqual(await asyncio.wait_for(first, 1), ipc.REPLACED)
+            self.assertEqual(server.waiter_count, 1)
+
+            _, writer = await asyncio.open_unix_connection(sock)
+            writer.write(b"WAIT ghost\n")
+            await writer.drain()
+            await asyncio.sleep(0.05)
+            self.assertEqual(server.waiter_count, 2)
+            writer.close()
+            await writer.wait_closed()
+            await asyncio.sleep(0.05)
+            self.assertEqual(server.waiter_count, 1)
+
+            self.assertTrue(await server.send("hi", "api"))
+            self.assertEqual(await second, "hi")
+            await server.close()
+
+    async def test_same_project_sessions_keep_their_own_waits(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("CLAUDE_AUDIO_SESSION", None)
+            with mock.patch.object(runtime, "claude_pid", side_effect=[100, 200]):
+                names = [runtime.session_name(), runtime.session_name()]
+            base = Path.cwd().name
+            self.assertEqual(names, [f"{base}@100", f"{base}@200"])
+
+            sock = str(Path(tmp) / "ipc.sock")
+            server = IpcServer(sock)
+            try:
+                await server.start()
+            except PermissionError as exc:
+                self.skipTest(f"unix socket not permitted in sandbox: {exc}")
+            first = asyncio.create_task(wait_for_message(sock, "api@100"))
+            second = asyncio.create_task(wait_for_message(sock, "api@200"))
+            await asyncio.sleep(0.05)
+            self.assertEqual(server.waiter_count, 2)
+            self.assertFalse(first.done() or second.done())
+            # Spoken addresses use the directory part only.
+            self.assertEqual(server.address("api, run tests")[1], "run tests")
+
+            self.assertTrue(await server.send("to first", "api@100"))
+            self.assertTrue(await server.send("to second", "api@200"))
+            self.assertEqual(await first, "to first")
+            self.assertEqual(await second, "to second")
+            await server.close()
+
+    async def test_stale_sessions_expire(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(ipc, "SESSION_TTL", 0.1):
+            sock = str(Path(tmp) / "ipc.sock")
+            server = IpcServer(sock)
+            try:
+                await server.start()
+            except PermissionError as exc:
+                self.skipTest(f"unix socket not permitted in sandbox: {exc}")
+            for name in ("crashed", "waiting", "pinging", "me"):
+                await request_daemon(f"REGISTER {name}", sock)
+            waiter = asyncio.create_task(wait_for_message(sock, "waiting"))
+            for _ in range(3):
+                await asyncio.sleep(0.05)
+                self.assertEqual(await request_daemon("PING pinging", sock), "PONG")
+            # "crashed" never came back; an open WAIT or a recent PING keeps a session.
+            self.assertEqual(await request_daemon("UNREGISTER me", sock), "OK 2 waiting,pinging")
+            await server.close()
+            self.assertIsNone(await waiter)
+
+    async def test_session_table_is_bounded(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            sock = str(Path(tmp) / "ipc.sock")
+            server = IpcServer(sock)
+            try:
+                await server.start()
+            except PermissionError as exc:
+                self.skipTest(f"unix socket not permitted in sandbox: {exc}")
+            for i in range(ipc.MAX_SESSIONS + 10):
+                await request_daemon(f"REGISTER s{i}", sock)
+            self.assertEqual(server.session_count, ipc.MAX_SESSIONS)
+            self.assertEqual(server.address("s0 hello"), (None, "s0 hello"))
+            await server.close()
+
+    async def test_profile_and_trace_commands(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.dict(os.environ, {"CLAUDE_AUDIO_RUNTIME_DIR": tmp}):
+            sock = str(Path(tmp) / "ipc.sock")
+            server = IpcServer(sock)
+            try:
+                await server.start()
+            except PermissionError as exc:
+                self.skipTest(f"unix socket not permitted in sandbox: {exc}")
+
+            reply = await profile_via_daemon(0.05, sock)
+            self.assertTrue(reply.startswith("OK "), reply)
+            scope, folded = reply.split()[1:]
+            self.assertTrue(Path(scope).exists() and Path(folded).exists())
+            self.assertTrue((await request_daemon("PROFILE soon", sock)).startswith("ERR"))
+
+            self.assertEqual(await trace_via_daemon(True, sock), "OK tracing")
+            reply = await trace_via_daemon(False, sock)
+            self.assertTrue(reply.startswith("OK "), reply)
+            self.assertIn("traceEvents", Path(reply[3:]).read_text())
+            self.assertEqual(await trace_via_daemon(False, sock), "ERR tracing is off")
+            await server.close()
@@ -0,0 +1,115 @@
+import errno
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from claude_audio_connector import journal
+from claude_audio_connector.journal import Journal, read_index, read_segment, segments
+from claude_audio_connector.replay_cmd import iter_utterances
+
+
+class TestJournal(unittest.TestCase):
+    def test_roundtrip_and_index(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            j = Journal(tmp, 16000, segment_bytes=1 << 16)
+            j.start()
+            j.pcm(b"\x01\x00" * 100)
+            j.event("START_SPEECH")
+            j.transcript("hey claude hi")
+            j.close()
+
+            (path,) = segments(tmp)
+            sample_rate, records = read_segment(path)
+            self.assertEqual(sample_rate, 16000)
+            kinds = [(k, p) for k, _, p in records]
+            self.assertEqual(kinds, [
+                (journal.PCM, b"\x01\x00" * 100),
+                (journal.EVENT, b"START_SPEECH"),
+                (journal.TRANSCRIPT, b"hey claude hi"),
+            ])
+            self.assertEqual([k for _, _, k in read_index(path)], [1, 2, 3])
+
+    def test_segments_are_not_sparse(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            j = Journal(tmp, 16000, segment_bytes=1 << 16)
+            j.start()
+            (path,) = segments(tmp)
+            if hasattr(os.stat(path), "st_blocks"):
+                self.assertGreaterEqual(os.stat(path).st_blocks * 512, 1 << 16)
+            j.close()
+
+    def test_full_disk_drops_instead_of_crashing(self) -> None:
+        full = OSError(errno.ENOSPC, "No space left on device")
+        with tempfile.TemporaryDirectory() as tmp:
+            j = Journal(tmp, 16000, segment_bytes=4096, flush_interval=0.01)
+            with mock.patch.object(journal, "_reserve", side_effect=full):
+                j.start()
+                self.assertIn("No space left", j.error)
+                j.pcm(b"\x01\x00" * 100)
+                self.assertEqual(j.dropped, 1)
+                self.assertEqual(segments(tmp), [])
+            # Space freed: the flusher allocates a segment and recording resumes.
+            deadline = time.monotonic() + 2
+            while j._spare is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+            j.pcm(b"\x01\x00" * 100)
+            j.close()
+            self.assertIsNone(j.error)
+            self.assertEqual(j.dropped, 1)
+            (path,) = segments(tmp)
+            self.assertEqual(len(list(read_segment(path)[1])), 1)
+
+    def test_rotation_and_pruning(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            j = Journal(tmp, 16000, segment_bytes=4096, max_segments=3, flush_interval=0.01)
+            j.start()
+            for i in range(40):
+                # Give the flusher a chance to pre-allocate the next segment.
+                deadline = time.monotonic() + 2
+                while j._spare is None and time.monotonic() < deadline:
+                    time.sleep(0.001)
+                j.pcm(bytes([i % 256]) * 1000)
+            j.close()
+            paths = segments(tmp)
+            self.assertLessEqual(len(paths), 3)
+            self.assertEqual(j.dropped, 0)
+            self.assertFalse(any(Path(tmp).glob("*.seg.*")))
+
+    def test_replay_utterances(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            j = Journal(tmp, 16000, segment_bytes=1 << 16)
+            j.start()
+            j.append(journal.PCM, b"\x00\x00" * 10, ts_ns=1_000_000_000)
+            j.append(journal.EVENT, b"START_SPEECH", ts_ns=9_000_000_000)
+            j.append(journal.PCM, b"\x02\x00" * 10, ts_ns=9_100_000_000)
+            j.append(journal.TRANSCRIPT, b"hello", ts_ns=9_500_000_000)
+            j.close()
+
+            (item,) = list(iter_utterances(tmp))
+            sample_rate, audio, text, events = item
+            self.assertEqual(text, "hello")
+            self.assertEqual(audio, b"\x02\x00" * 10)
+            self.assertEqual([s for _, s in events], ["START_SPEECH"])
+
+    def test_replay_across_rollover(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            j = Journal(tmp, 16000, segment_bytes=4096, flush_interval=0.01)
+            j.start()
+            j.append(journal.EVENT, b"START_SPEECH", ts_ns=1_000_000_000)
+            j.append(journal.PCM, b"\x01\x00" * 1500, ts_ns=1_100_000_000)
+            deadline = time.monotonic() + 2
+            while j._spare is None and time.monotonic() < deadline:
+                time.sleep(0.001)
+            j.append(journal.PCM, b"\x02\x00" * 1500, ts_ns=1_200_000_000)
+            j.append(journal.TRANSCRIPT, b"spans two segments", ts_ns=1_300_000_000)
+            j.close()
+
+            self.assertEqual(len(segments(tmp)), 2)
+            (item,) = list(iter_utterances(tmp))
+            _, audio, text, events = item
+            self.assertEqual(text, "spans two segments")
+            self.assertEqual(audio, b"\x01\x00" * 1500 + b"\x02\x00" * 1500)
+            self.assertEqual([s for _, s in events], ["START_SPEECH"])
@@ -0,0 +1,70 @@
+import asyncio
+import time
+import unittest
+
+from claude_audio_connector.metrics import LoopMonitor, Registry, parse_endpoint, serve
+
+
+class TestMetrics(unittest.IsolatedAsyncioTestCase):
+    def test_render(self) -> None:
+        registry = Registry()
+        frames = registry.counter("frames", "Frames.")
+        frames.inc(320)
+        frames.inc(320)
+        registry.gauge("depth", "Depth.", lambda: 3)
+        latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 7.0):
+            latency.observe(value)
+
+        text = registry.render()
+        self.assertIn("# TYPE frames counter\n", text)
+        self.assertIn("frames_total 640\n", text)
+        self.assertIn("depth 3\n", text)
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1\n', text)
+        self.assertIn('latency_seconds_bucket{le="1"} 3\n', text)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 4\n', text)
+        self.assertIn("latency_seconds_count 4\n", text)
+        self.assertTrue(text.endswith("# EOF\n"))
+        self.assertIs(registry.counter("frames", "Frames."), frames)
+
+    async def test_http_endpoint(self) -> None:
+        registry = Registry()
+        registry.counter("hits", "Hits.").inc()
+        try:
+            server = await serve("tcp:127.0.0.1:0", registry)
+        except OSError as exc:
+            self.skipTest(f"tcp listen not permitted in sandbox: {exc}")
+        port = server.sockets[0].getsockname()[1]
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: x\r\n\r\n")
+        await writer.drain()
+        response = (await reader.read()).decode()
+        writer.close()
+        server.close()
+        await server.wait_closed()
+
+        self.assertTrue(response.startswith("HTTP/1.1 200 OK"))
+        self.assertIn("application/openmetrics-text", response)
+        self.assertIn("hits_total 1\n", response)
+
+    def test_parse_endpoint(self) -> None:
+        self.assertEqual(parse_endpoint("tcp::9464"), ("tcp", "127.0.0.1", 9464))
+        self.assertEqual(parse_endpoint("unix:/tmp/m.sock"), ("unix", "", "/tmp/m.sock"))
+        for bad in ("tcp:localhost", "tcp:host:", "tcp:host:http", "unix:", "udp:1"):
+            with self.assertRaises(ValueError):
+                parse_endpoint(bad)
+
+
+class TestLoopMonitor(unittest.IsolatedAsyncioTestCase):
+    async def test_detects_stall(self) -> None:
+        monitor = LoopMonitor(interval=0.01, stall_threshold=0.05)
+        stop = asyncio.Event()
+        task = asyncio.create_task(monitor.run(stop))
+        await asyncio.sleep(0.03)
+        time.sleep(0.1)  # block the loop
+        await asyncio.sleep(0.03)
+        stop.set()
+        await task
+        self.assertGreaterEqual(monitor.stalls, 1)
+        self.assertGreaterEqual(monitor.max_lag, 0.05)
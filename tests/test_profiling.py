@@ -0,0 +1,71 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from claude_audio_connector.profiling import SamplingProfiler, Tracer
+
+
+def busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_samples_other_threads(self) -> None:
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_loop, args=(stop,), name="busy")
+        worker.start()
+        profiler = SamplingProfiler(interval=0.002)
+        try:
+            profiler.run(0.1)
+        finally:
+            stop.set()
+            worker.join()
+
+        folded = profiler.collapsed()
+        self.assertIn("busy;", folded)
+        self.assertIn("busy_loop (test_profiling.py", folded)
+        scope = profiler.speedscope()
+        frames = [f["name"] for f in scope["shared"]["frames"]]
+        (busy,) = [p for p in scope["profiles"] if p["name"] == "busy"]
+        self.assertEqual(len(busy["samples"]), len(busy["weights"]))
+        self.assertTrue(all(0 <= i < len(frames) for s in busy["samples"] for i in s))
+
+
+class TestTracer(unittest.TestCase):
+    def test_spans_and_slow_callbacks(self) -> None:
+        orig = asyncio.events.Handle._run
+        tracer = Tracer()
+
+        async def scenario() -> None:
+            tracer.start()
+            start = time.perf_counter_ns()
+            tracer.span("ipc", "ipc send", start, session="api")
+            tracer.instant("stt", "END_SPEECH")
+            await asyncio.sleep(0)
+            time.sleep(0.005)  # this task step is a slow callback on the loop lane
+            await asyncio.sleep(0)
+
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.dict(os.environ, {"CLAUDE_AUDIO_RUNTIME_DIR": tmp}):
+            asyncio.run(scenario())
+            self.assertIsNot(asyncio.events.Handle._run, orig)
+            path = tracer.stop()
+            self.assertIs(asyncio.events.Handle._run, orig)
+            self.assertEqual(str(path.parent), tmp)
+            events = json.loads(path.read_text())["traceEvents"]
+
+        names = {(e["cat"], e["name"]) for e in events if e["ph"] != "M"}
+        self.assertIn(("ipc", "ipc send"), names)
+        self.assertIn(("stt", "END_SPEECH"), names)
+        self.assertIn("loop", {cat for cat, _ in names})
+        self.assertIsNone(tracer.stop())
+
+    def test_off_records_nothing(self) -> None:
+        tracer = Tracer()
+        tracer.span("tts", "speak", time.perf_counter_ns())
+        self.assertEqual(tracer._events, [])
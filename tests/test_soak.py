@@ -0,0 +1,26 @@
+import asyncio
+import tempfile
+import unittest
+
+from claude_audio_connector import soak_cmd
+
+
+class TestSlope(unittest.TestCase):
+    def test_least_squares(self) -> None:
+        self.assertAlmostEqual(soak_cmd.slope([0, 1, 2, 3], [10, 12, 14, 16]), 2.0)
+        self.assertEqual(soak_cmd.slope([1], [5]), 0.0)
+
+
+class TestSoak(unittest.TestCase):
+    def test_short_run_is_clean(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            result = asyncio.run(soak_cmd.soak(
+                hours=0.2, speedup=240, runtime_dir=tmp, sample_sec=0.1, warmup=0.5, drop_every=5,
+            ))
+        # The CLI default limit; a leak of one object per utterance or
+        # reconnect shows up well above it at this rate.
+        self.assertEqual(result.failures, [])
+        self.assertLess(result.rss_slope_mb_per_hour, 5.0)
+        self.assertLess(result.traced_slope_mb_per_hour, 2.0)
+        self.assertGreater(result.clients["delivered"], 0)
+        self.assertLessEqual(result.fd_growth, 8)
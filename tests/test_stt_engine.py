@@ -0,0 +1,156 @@
+import asyncio
+import json
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest import mock
+
+from claude_audio_connector.stt_engine import (
+    END_SPEECH,
+    START_SPEECH,
+    TRANSCRIPT,
+    EngineSelector,
+    SttEvent,
+    _LocalSession,
+)
+
+
+class FakeEngine:
+    def __init__(self, name: str, healthy: bool = True) -> None:
+        self.name = name
+        self.healthy = healthy
+        self.probes = 0
+
+    async def probe(self, cfg) -> bool:
+        self.probes += 1
+        return self.healthy
+
+    def close(self) -> None:
+        pass
+
+
+class FakeRecognizer:
+    """Says "hello" once a loud block is followed by a silent one."""
+
+    def __init__(self) -> None:
+        self.heard = False
+
+    def AcceptWaveform(self, pcm: bytes) -> bool:
+        if any(pcm):
+            self.heard = True
+            return False
+        return self.heard
+
+    def PartialResult(self) -> str:
+        return json.dumps({"partial": "hel" if self.heard else ""})
+
+    def Result(self) -> str:
+        self.heard = False
+        return json.dumps({"text": "hello"})
+
+
+class TestEngineSelector(unittest.TestCase):
+    def test_failover_after_consecutive_failures(self) -> None:
+        primary, fallback = FakeEngine("sarvam"), FakeEngine("local")
+        sel = EngineSelector(primary, fallback, fail_after=2)
+        self.assertFalse(sel.failed())
+        sel.healthy()
+        self.assertFalse(sel.failed())
+        self.assertTrue(sel.failed())
+        self.assertIs(sel.current, fallback)
+        self.assertTrue(sel.degraded)
+        self.assertEqual(sel.failovers, 1)
+
+    def test_sessions_that_connect_then_drop_still_fail_over(self) -> None:
+        primary, fallback = FakeEngine("sarvam"), FakeEngine("local")
+        sel = EngineSelector(primary, fallback, fail_after=3, healthy_after=30)
+        with mock.patch("claude_audio_connector.stt_engine.time.monotonic") as clock:
+            clock.return_value = 100.0
+            for _ in range(2):
+                sel.connected()
+                clock.return_value += 5
+                self.assertFalse(sel.failed())
+            # One session that lasted long enough forgives the streak...
+            sel.connected()
+            clock.return_value += 60
+            self.assertFalse(sel.failed())
+            self.assertEqual(sel.failures, 1)
+            # ...but handshakes followed by quick drops do not.
+            for _ in range(2):
+                sel.connected()
+                clock.return_value += 5
+                switched = sel.failed()
+        self.assertTrue(switched)
+        self.assertIs(sel.current, fallback)
+
+    def test_no_fallback_never_switches(self) -> None:
+        sel = EngineSelector(FakeEngine("sarvam"), None, fail_after=1)
+        self.assertFalse(sel.failed())
+        self.assertFalse(sel.degraded)
+
+    def test_failback_when_primary_recovers(self) -> None:
+        primary, fallback = FakeEngine("sarvam", healthy=False), FakeEngine("local")
+        sel = EngineSelector(primary, fallback, fail_after=1)
+        sel.failed()
+        live = SimpleNamespace(cfg=SimpleNamespace(stt_health_interval=0.01), reconnect=asyncio.Event())
+
+        async def scenario() -> None:
+            stop = asyncio.Event()
+            watcher = asyncio.create_task(sel.watch(live, stop))
+            while primary.probes < 2:
+                await asyncio.sleep(0.005)
+            self.assertTrue(sel.degraded)
+            primary.healthy = True
+            await asyncio.wait_for(live.reconnect.wait(), 1)
+            stop.set()
+            await watcher
+
+        asyncio.run(scenario())
+        self.assertIs(sel.current, primary)
+
+
+class InstantRecognizer:
+    """Finalises every block at once, with no partial: "yes" if loud, else ""."""
+
+    def __init__(self) -> None:
+        self.text = ""
+
+    def AcceptWaveform(self, pcm: bytes) -> bool:
+        self.text = "yes" if any(pcm) else ""
+        return True
+
+    def PartialResult(self) -> str:
+        return json.dumps({"partial": ""})
+
+    def Result(self) -> str:
+        return json.dumps({"text": self.text})
+
+
+def session_events(recognizer, blocks) -> list[SttEvent]:
+    async def scenario() -> list[SttEvent]:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            session = _LocalSession(recognizer, executor)
+            for block in blocks:
+                await session.send(block)
+            events = []
+            async for event in session:
+                events.append(event)
+                if event.kind == TRANSCRIPT:
+                    return events
+        return []
+
+    return asyncio.run(scenario())
+
+
+class TestLocalSession(unittest.TestCase):
+    def test_events_from_recognizer(self) -> None:
+        blocks = (bytes(4), b"\x01\x00" * 2, b"\x01\x00" * 2, bytes(4))
+        self.assertEqual(session_events(FakeRecognizer(), blocks), [
+            SttEvent(START_SPEECH), SttEvent(END_SPEECH), SttEvent(TRANSCRIPT, "hello"),
+        ])
+
+    def test_final_without_partial(self) -> None:
+        # The silent block's empty final must not produce an utterance.
+        self.assertEqual(session_events(InstantRecognizer(), (bytes(4), b"\x01\x00" * 2)), [
+            SttEvent(START_SPEECH), SttEvent(END_SPEECH), SttEvent(TRANSCRIPT, "yes"),
+        ])
@@ -0,0 +1,143 @@
+import asyncio
+import io
+import json
+import tempfile
+import threading
+import unittest
+import wave
+from array import array
+from pathlib import Path
+from unittest import mock
+
+from claude_audio_connector import transcribe_cmd
+from claude_audio_connector.journal import Journal
+from claude_audio_connector.transcribe_cmd import _with_retry, iter_inputs, open_audio, split_points, transcribe_files
+
+
+def tone(seconds: float, amp: int, rate: int = 16000) -> bytes:
+    n = int(seconds * rate)
+    return array("h", [amp if i % 2 else -amp for i in range(n)]).tobytes()
+
+
+def write_wav(path: Path, pcm: bytes, rate: int = 16000) -> None:
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(pcm)
+
+
+class TestSplit(unittest.TestCase):
+    def test_cuts_in_silence(self) -> None:
+        pcm = tone(3, 5000) + tone(1, 0) + tone(3, 5000)
+        pieces = split_points(pcm, 16000, max_sec=5)
+        self.assertEqual(len(pieces), 2)
+        cut_sec = pieces[0][1] / 2 / 16000
+        self.assertTrue(3.0 <= cut_sec <= 4.0, cut_sec)
+        self.assertEqual(pieces[-1][1], len(pcm))
+
+    def test_hard_cut_without_silence(self) -> None:
+        pcm = tone(7, 5000)
+        self.assertEqual(split_points(pcm, 16000, max_sec=3), [(0, 96000), (96000, 192000), (192000, 224000)])
+
+
+class TestTranscribeFiles(unittest.TestCase):
+    def test_concurrency_retry_and_output(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            for i in range(4):
+                write_wav(Path(tmp) / f"{i}.wav", tone(2, 3000) + tone(1, 0) + tone(2, 3000))
+            (Path(tmp) / "raw.pcm").write_bytes(tone(1, 3000, rate=8000))
+            (Path(tmp) / "notes.txt").write_text("skip me")
+            paths = iter_inputs([tmp])
+            self.assertEqual(len(paths), 5)
+
+            audio = open_audio(Path(tmp) / "raw.pcm", 8000)
+            self.assertAlmostEqual(audio.seconds, 1.0)
+            audio.close()
+
+            in_flight = peak = calls = 0
+
+            async def fake(pcm: bytes, rate: int) -> str:
+                nonlocal in_flight, peak, calls
+                calls += 1
+                if calls == 1:
+                    raise ConnectionError("flaky")
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+                return f"{len(pcm) // 2 // rate}s"
+
+            out = io.StringIO()
+            totals = asyncio.run(transcribe_files(
+                paths, fake, out, concurrency=3, max_sec=4, raw_rate=8000, backoff=0.001,
+            ))
+            records = [json.loads(line) for line in out.getvalue().splitlines()]
+
+        self.assertLessEqual(peak, 3)
+        self.assertEqual(totals["failed"], 0)
+        self.assertEqual(totals["segments"], 9)
+        self.assertAlmostEqual(totals["audio_sec"], 21.0)
+        self.assertEqual(records[-1], {"summary": totals})
+        files = {Path(r["file"]).name: r for r in records[:-1]}
+        self.assertEqual(len(files["0.wav"]["segments"]), 2)
+        self.assertEqual(files["raw.pcm"]["text"], "1s")
+        self.assertEqual(sum(s["attempts"] for r in files.values() for s in r["segments"]), 10)
+
+
+class TestJournalInput(unittest.TestCase):
+    def test_segment_is_split_off_the_loop(self) -> None:
+        threads = []
+        real_split = transcribe_cmd.split_points
+
+        def split(*args):
+            threads.append(threading.current_thread())
+            return real_split(*args)
+
+        async def fake(pcm: bytes, rate: int) -> str:
+            return f"{len(pcm) // 2}"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            j = Journal(tmp, 8000, segment_bytes=1 << 16)
+            j.start()
+            j.pcm(tone(0.5, 3000, rate=8000))
+            j.event("START_SPEECH")
+            j.pcm(tone(0.5, 3000, rate=8000))
+            j.close()
+            out = io.StringIO()
+            with mock.patch.object(transcribe_cmd, "split_points", split):
+                totals = asyncio.run(transcribe_files(iter_inputs([tmp]), fake, out))
+
+        self.assertEqual(totals["files"], 1)
+        self.assertAlmostEqual(totals["audio_sec"], 1.0)
+        self.assertEqual(json.loads(out.getvalue().splitlines()[0])["text"], "8000")
+        self.assertNotIn(threading.main_thread(), threads)
+
+
+class ApiError(Exception):
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class TestRetry(unittest.TestCase):
+    def attempts(self, exc: Exception) -> int:
+        calls = 0
+
+        async def fail() -> str:
+            nonlocal calls
+            calls += 1
+            raise exc
+
+        text, attempts, error = asyncio.run(_with_retry(fail, retries=2, backoff=0.001))
+        self.assertIs(error, exc)
+        self.assertEqual(attempts, calls)
+        return attempts
+
+    def test_only_transient_errors_retry(self) -> None:
+        self.assertEqual(self.attempts(ConnectionResetError()), 3)
+        self.assertEqual(self.attempts(asyncio.TimeoutError()), 3)
+        self.assertEqual(self.attempts(ApiError(503)), 3)
+        self.assertEqual(self.attempts(ApiError(429)), 3)
+        self.assertEqual(self.attempts(ApiError(400)), 1)
+        self.assertEqual(self.attempts(ValueError("bad audio")), 1)
@@ -0,0 +1,60 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from claude_audio_connector.transcript import Pipeline, Rules
+
+
+class TestTranscriptPipeline(unittest.TestCase):
+    def setUp(self) -> None:
+        rules = Rules(
+            shortcuts={"run tests": "Run the test suite and fix any failures."},
+            corrections={"cloud code": "Claude Code", "pie test": "pytest"},
+        )
+        self.pipeline = Pipeline(rules)
+
+    def test_wake_and_prompt(self) -> None:
+        result = self.pipeline.process("Hey Claude, open the README.")
+        self.assertEqual(result.kind, "prompt")
+        self.assertEqual(result.text, "open the README.")
+
+    def test_wake_variant_only(self) -> None:
+        self.assertEqual(self.pipeline.process("okay klaud!").kind, "wake")
+        result = self.pipeline.process("list the files", awake=True)
+        self.assertEqual(result.text, "list the files")
+
+    def test_not_addressed(self) -> None:
+        self.assertEqual(self.pipeline.process("what a lovely day").kind, "ignored")
+        self.assertEqual(self.pipeline.process(" ... ").kind, "empty")
+
+    def test_stop_phrase_must_be_whole_utterance(self) -> None:
+        self.assertEqual(self.pipeline.process("Stop listening.").kind, "stop")
+        result = self.pipeline.process("hey claude please stop listening to the queue")
+        self.assertEqual(result.kind, "prompt")
+
+    def test_shortcut_and_corrections(self) -> None:
+        result = self.pipeline.process("hey claude run tests")
+        self.assertEqual(result.text, "Run the test suite and fix any failures.")
+        result = self.pipeline.process("hey cloud run tests with pie test in cloud code")
+        self.assertEqual(
+            result.text,
+            "Run the test suite and fix any failures. with pytest in Claude Code",
+        )
+
+    def test_correction_overlaps_prefer_longest(self) -> None:
+        pipeline = Pipeline(Rules(corrections={"cloud": "Claude", "cloud code": "Claude Code"}))
+        result = pipeline.process("hey claude open cloud code, then cloud.")
+        self.assertEqual(result.text, "open Claude Code, then Claude.")
+
+    def test_load_rejects_wrong_types(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "rules.json"
+            for data in ([], {"wake_names": "claude"}, {"shortcuts": {"go": 1}}, {"stop_phrases": [None]}):
+                path.write_text(json.dumps(data))
+                with self.assertRaises(ValueError):
+                    Rules.load(str(path))
+            path.write_text(json.dumps({"wake_names": ["jarvis"], "shortcuts": {"go": "Go."}}))
+            rules = Rules.load(str(path))
+        self.assertIn("jarvis", rules.wake_names)
+        self.assertEqual(rules.shortcuts, {"go": "Go."})
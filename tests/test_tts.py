@@ -0,0 +1,69 @@
+import threading
+import unittest
+
+from claude_audio_connector.tts import ClauseSplitter, iter_clauses, play
+
+
+class TestClauseSplitter(unittest.TestCase):
+    def test_incremental(self) -> None:
+        splitter = ClauseSplitter()
+        self.assertEqual(splitter.feed("Hello there"), [])
+        self.assertEqual(splitter.feed(". How are"), ["Hello there."])
+        self.assertEqual(splitter.feed(" you"), [])
+        self.assertEqual(splitter.feed("? I am"), ["How are you?"])
+        self.assertEqual(splitter.flush(), ["I am"])
+
+    def test_version_numbers_do_not_split(self) -> None:
+        self.assertEqual(list(iter_clauses(["Use 3.11 now.\nDone"])), ["Use 3.11 now.", "Done"])
+
+    def test_long_text_without_stops(self) -> None:
+        splitter = ClauseSplitter(soft_chars=20, max_chars=30)
+        out = splitter.feed("alpha beta gamma delta epsilon zeta eta")
+        self.assertEqual(out, ["alpha beta gamma delta"])
+        out = splitter.feed(" one two, three four five six")
+        self.assertEqual(out[0], "epsilon zeta eta one two,")
+
+
+class TestPlay(unittest.TestCase):
+    def test_synthesis_overlaps_playback(self) -> None:
+        second_started = threading.Event()
+        written = []
+
+        def synth(clause):
+            if clause == "two":
+                second_started.set()
+            yield clause.encode()
+
+        def write(chunk):
+            if chunk == b"one":
+                # Clause two is synthesized while clause one is still playing.
+                self.assertTrue(second_started.wait(2))
+            written.append(chunk)
+
+        play(["one", "two"], synth, write)
+        self.assertEqual(written, [b"one", b"two"])
+
+    def test_synth_error_propagates(self) -> None:
+        def synth(clause):
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            play(["x"], synth, lambda chunk: None)
+
+    def test_idle_between_clauses(self) -> None:
+        events = []
+        second = threading.Event()
+
+        def clauses():
+            yield "one"
+            # Clause two only arrives after clause one has played out.
+            self.assertTrue(second.wait(2))
+            yield "two"
+
+        def on_idle():
+            events.append("idle")
+            second.set()
+
+        play(clauses(), lambda c: [c.encode()], events.append, on_idle=on_idle)
+        # After the last clause the caller closes the output anyway.
+        self.assertEqual(events[:3], [b"one", "idle", b"two"])